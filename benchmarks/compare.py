@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compares the benchmark results of two git revisions (or two result files)
+and exits with a non-zero status if any benchmark regressed by more than
+the allowed threshold.
+
+The benchmark runner and fixtures from the current checkout are used for
+both revisions; only the ``stix`` package is taken from each revision.
+
+Usage:
+    python benchmarks/compare.py BASE [HEAD] [--threshold 0.10]
+                                 [--memory-threshold 0.10] [--size N]
+                                 [--repeat N] [--filter TEXT]
+
+BASE and HEAD are git revisions or ``.json`` files written by ``run.py``.
+HEAD defaults to the working tree.
+"""
+
+# stdlib
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def _export(revision, dest):
+    """Extracts the ``stix`` package at `revision` into `dest`."""
+    archive = subprocess.check_output(
+        ["git", "archive", "--format=tar", revision, "stix"], cwd=ROOT
+    )
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+
+
+def _results(revision, args):
+    """Returns the benchmark results for `revision`, which is a git
+    revision, a results file, or ``None`` for the working tree.
+
+    """
+    if revision and revision.endswith(".json"):
+        with open(revision) as f:
+            return json.load(f)
+
+    tmp = tempfile.mkdtemp(prefix="stix-bench-")
+
+    try:
+        source = ROOT
+
+        if revision:
+            _export(revision, tmp)
+            source = tmp
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            x for x in (source, env.get("PYTHONPATH")) if x
+        )
+
+        output = os.path.join(tmp, "results.json")
+        command = [
+            sys.executable, os.path.join(HERE, "run.py"),
+            "--size", str(args.size),
+            "--repeat", str(args.repeat),
+            "--output", output,
+        ]
+
+        if args.pattern:
+            command.extend(["--filter", args.pattern])
+
+        sys.stdout.write("== %s\n" % (revision or "working tree"))
+        sys.stdout.flush()
+        subprocess.check_call(command, env=env, cwd=tmp)
+
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare(base, head, threshold, memory_threshold):
+    """Prints a comparison of the `base` and `head` results and returns a
+    list of the names of regressed benchmarks.
+
+    """
+    regressions = []
+    base, head = base["results"], head["results"]
+
+    sys.stdout.write("\n%-40s %10s %10s %8s %8s\n" % (
+        "benchmark", "base", "head", "time", "memory"
+    ))
+
+    for name in sorted(set(base) & set(head)):
+        old, new = base[name], head[name]
+        time_change = new["min"] / old["min"] - 1 if old["min"] else 0.0
+
+        memory_change = None
+        if old.get("peak_memory") and new.get("peak_memory"):
+            memory_change = float(new["peak_memory"]) / old["peak_memory"] - 1
+
+        regressed = time_change > threshold
+        if memory_change is not None and memory_change > memory_threshold:
+            regressed = True
+
+        if regressed:
+            regressions.append(name)
+
+        sys.stdout.write("%-40s %9.4fs %9.4fs %+7.1f%% %8s%s\n" % (
+            name, old["min"], new["min"], time_change * 100,
+            "" if memory_change is None else "%+.1f%%" % (memory_change * 100),
+            "  REGRESSION" if regressed else "",
+        ))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare python-stix benchmarks.")
+    parser.add_argument("base", help="Base git revision or results file.")
+    parser.add_argument("head", nargs="?", default=None,
+                        help="Head git revision or results file. Default is "
+                             "the working tree.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed relative increase in time (default 0.10).")
+    parser.add_argument("--memory-threshold", type=float, default=0.10,
+                        help="Allowed relative increase in peak memory "
+                             "(default 0.10).")
+    parser.add_argument("--size", type=float, default=1.0,
+                        help="Multiplier for the default fixture sizes.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of timed runs per operation.")
+    parser.add_argument("--filter", dest="pattern", default=None,
+                        help="Only run benchmarks whose name contains this text.")
+    args = parser.parse_args()
+
+    base = _results(args.base, args)
+    head = _results(args.head, args)
+
+    regressions = compare(base, head, args.threshold, args.memory_threshold)
+
+    if regressions:
+        sys.stdout.write("\n%d benchmark(s) regressed.\n" % len(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
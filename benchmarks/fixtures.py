@@ -0,0 +1,265 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Representative STIX packages used by the benchmark suite.
+
+Each fixture function accepts a `size` argument which scales the number of
+top-level components and returns a :class:`stix.core.STIXPackage`. Fixtures
+are deterministic: ids are generated from a fixed namespace and an integer
+counter so that two runs (or two git revisions) benchmark identical content.
+"""
+
+# python-cybox
+from cybox.core import Observable
+from cybox.common import Hash
+from cybox.objects.address_object import Address
+from cybox.objects.file_object import File
+
+# python-stix
+from mixbox import idgen
+from mixbox.namespaces import Namespace
+
+from stix.common import InformationSource
+from stix.core import STIXPackage, STIXHeader
+from stix.common import EncodedCDATA
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.simple_marking import SimpleMarkingStructure
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.extensions.test_mechanism.snort_test_mechanism import SnortTestMechanism
+from stix.extensions.test_mechanism.yara_test_mechanism import YaraTestMechanism
+from stix.incident import Incident
+from stix.indicator import Indicator, ValidTime
+from stix.ttp import TTP, Behavior
+from stix.ttp.attack_pattern import AttackPattern
+from stix.ttp.malware_instance import MalwareInstance
+import stix.extensions.identity.ciq_identity_3_0 as ciq
+
+
+NAMESPACE = Namespace("http://example.com/benchmark", "bench")
+TIMESTAMP = "2017-01-01T00:00:00+00:00"
+
+_TLP_COLORS = ("WHITE", "GREEN", "AMBER", "RED")
+
+
+def _package(description):
+    # Restart the sequential id counter for every fixture.
+    idgen.set_id_method(idgen.IDGenerator.METHOD_INT)
+    idgen.set_id_namespace(NAMESPACE)
+
+    package = STIXPackage()
+    package.stix_header = STIXHeader()
+    package.stix_header.information_source = InformationSource(description=description)
+    return package
+
+
+def _file_observable(idx):
+    f = File()
+    f.file_name = "sample-%d.exe" % idx
+    f.add_hash(Hash("%032x" % idx))
+    return Observable(f)
+
+
+def indicator_heavy(size=1000):
+    """Indicators with hash and address observables, types and valid times."""
+    package = _package("Indicator heavy")
+
+    for idx in range(size):
+        indicator = Indicator(title="Indicator %d" % idx, timestamp=TIMESTAMP)
+        indicator.description = "Indicator description %d" % idx
+        indicator.add_indicator_type("File Hash Watchlist")
+        indicator.add_indicator_type("IP Watchlist")
+        indicator.add_observable(_file_observable(idx))
+        indicator.add_observable(Address("10.%d.%d.%d" % (idx >> 16 & 255, idx >> 8 & 255, idx & 255)))
+        indicator.add_valid_time_position(ValidTime(TIMESTAMP, "2017-12-31T00:00:00+00:00"))
+        indicator.confidence = "High"
+        package.add(indicator)
+
+    return package
+
+
+def incident_heavy(size=1000):
+    """Incidents with categories, effects, related indicators and
+    observables.
+
+    """
+    package = _package("Incident heavy")
+
+    for idx in range(size):
+        indicator = Indicator(title="Related indicator %d" % idx, timestamp=TIMESTAMP)
+        package.add(indicator)
+
+        incident = Incident(title="Incident %d" % idx, timestamp=TIMESTAMP)
+        incident.description = "Incident description %d" % idx
+        incident.add_category("Malicious Code")
+        incident.add_discovery_method("NIDS")
+        incident.add_intended_effect("Theft - Intellectual Property")
+        incident.add_related_indicator(Indicator(idref=indicator.id_))
+        incident.add_related_observable(_file_observable(idx))
+        incident.confidence = "Medium"
+        package.add(incident)
+
+    return package
+
+
+def nested_ttp(size=100, depth=8):
+    """TTPs with behaviors and chains of inline related TTPs `depth` deep."""
+    package = _package("Nested TTP")
+
+    for idx in range(size):
+        root = TTP(title="TTP %d" % idx, timestamp=TIMESTAMP)
+        parent = root
+
+        for level in range(depth):
+            behavior = Behavior()
+            behavior.add_malware_instance(MalwareInstance(title="Malware %d.%d" % (idx, level)))
+            behavior.add_attack_pattern(AttackPattern(title="Pattern %d.%d" % (idx, level)))
+            parent.behavior = behavior
+
+            child = TTP(title="TTP %d.%d" % (idx, level), timestamp=TIMESTAMP)
+            parent.add_related_ttp(child)
+            parent = child
+
+        package.add(root)
+
+    return package
+
+
+def ciq_identity_heavy(size=500):
+    """Indicators produced by sources with CIQ identities."""
+    package = _package("CIQ identity heavy")
+
+    for idx in range(size):
+        party = ciq.PartyName(
+            name_lines=("Name line %d" % idx,),
+            person_names=("Person %d" % idx,),
+            organisation_names=("Organisation %d" % idx,)
+        )
+        spec = ciq.STIXCIQIdentity3_0(party_name=party)
+        spec.add_electronic_address_identifier("user%d@example.com" % idx)
+        spec.add_free_text_line("Free text %d" % idx)
+        spec.add_contact_number("555-%04d" % idx)
+        spec.add_address(ciq.Address(free_text_address="%d Example Lane" % idx, country="USA"))
+        spec.add_nationality(ciq.Country("Norway"))
+
+        indicator = Indicator(title="Indicator %d" % idx, timestamp=TIMESTAMP)
+        indicator.producer = InformationSource(
+            identity=ciq.CIQIdentity3_0Instance(specification=spec)
+        )
+        package.add(indicator)
+
+    return package
+
+
+def _ciq_identity(idx, role):
+    party = ciq.PartyName(
+        person_names=("%s %d" % (role, idx),),
+        organisation_names=("%s organisation %d" % (role, idx),)
+    )
+    spec = ciq.STIXCIQIdentity3_0(party_name=party)
+    spec.add_electronic_address_identifier("%s%d@example.com" % (role.lower(), idx))
+    spec.add_contact_number("555-%04d" % idx)
+    spec.add_address(ciq.Address(free_text_address="%d Example Lane" % idx, country="USA"))
+    spec.organisation_info = ciq.OrganisationInfo(industry_type="Financial Services")
+    return ciq.CIQIdentity3_0Instance(specification=spec)
+
+
+def ciq_incident_heavy(size=500):
+    """Incidents with CIQ victim, responder and coordinator identities."""
+    package = _package("CIQ incident heavy")
+
+    for idx in range(size):
+        incident = Incident(title="Incident %d" % idx, timestamp=TIMESTAMP)
+        incident.add_victim(_ciq_identity(idx, "Victim"))
+        incident.add_responder(InformationSource(identity=_ciq_identity(idx, "Responder")))
+        incident.add_coordinator(InformationSource(identity=_ciq_identity(idx, "Coordinator")))
+        package.add(incident)
+
+    return package
+
+
+_SNORT_RULE = (
+    '<![CDATA[alert tcp any any -> any any (msg:"Rule %d"; '
+    'content:"|16 03|"; depth:2; sid:%d; rev:1;)]]>'
+)
+_YARA_RULE = (
+    '<![CDATA[rule r%d { strings: $a = "sample-%d" '
+    'condition: $a }]]>'
+)
+
+
+def rule_heavy(size=1000):
+    """Indicators with CDATA wrapped Snort and YARA test mechanism rules."""
+    package = _package("Rule heavy")
+
+    for idx in range(size):
+        indicator = Indicator(title="Indicator %d" % idx, timestamp=TIMESTAMP)
+
+        snort = SnortTestMechanism()
+        snort.rules = [EncodedCDATA(_SNORT_RULE % (idx, x)) for x in range(4)]
+        indicator.add_test_mechanism(snort)
+
+        yara = YaraTestMechanism()
+        yara.rule = EncodedCDATA(_YARA_RULE % (idx, idx))
+        indicator.add_test_mechanism(yara)
+
+        package.add(indicator)
+
+    return package
+
+
+def marking_heavy(size=1000):
+    """Indicators with several component-level marking specifications."""
+    package = _package("Marking heavy")
+
+    header_marking = MarkingSpecification(controlled_structure="//node() | //@*")
+    header_marking.marking_structures.append(TLPMarkingStructure(color="GREEN"))
+    package.stix_header.handling = Marking(header_marking)
+
+    for idx in range(size):
+        indicator = Indicator(title="Indicator %d" % idx, timestamp=TIMESTAMP)
+        handling = Marking()
+
+        for color in _TLP_COLORS[idx % 4:]:
+            spec = MarkingSpecification(controlled_structure="../../../descendant-or-self::node()")
+            spec.marking_structures.append(TLPMarkingStructure(color=color))
+            spec.marking_structures.append(SimpleMarkingStructure("Statement %d" % idx))
+            handling.add_marking(spec)
+
+        indicator.handling = handling
+        package.add(indicator)
+
+    return package
+
+
+def synthetic(size=100):
+    """A mixed corpus from :class:`stix.utils.generator.CorpusGenerator`,
+    with `size` indicators and proportional counts of the other components.
+
+    """
+    from stix.utils.generator import CorpusGenerator, DEFAULT_COUNTS
+
+    _package("Synthetic")
+
+    scale = float(size) / DEFAULT_COUNTS["indicators"]
+    counts = dict((k, max(1, int(v * scale))) for k, v in DEFAULT_COUNTS.items())
+    return CorpusGenerator(seed=0, counts=counts).package()
+
+
+#: Fixture functions by name.
+FIXTURES = {
+    "indicator_heavy": indicator_heavy,
+    "incident_heavy": incident_heavy,
+    "nested_ttp": nested_ttp,
+    "ciq_identity_heavy": ciq_identity_heavy,
+    "ciq_incident_heavy": ciq_incident_heavy,
+    "marking_heavy": marking_heavy,
+    "rule_heavy": rule_heavy,
+}
+
+try:
+    import stix.utils.generator  # noqa
+    FIXTURES["synthetic"] = synthetic
+except ImportError:
+    # Older revisions do not have a corpus generator.
+    pass
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Runs the python-stix benchmark suite and reports the time and peak memory
+of each operation on each fixture.
+
+Usage:
+    python benchmarks/run.py [--size N] [--repeat N] [--filter TEXT]
+                             [--output results.json]
+"""
+
+# stdlib
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from mixbox.vendor.six import BytesIO
+
+# Make the fixtures importable when run as a script.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa
+
+import stix  # noqa
+from stix.core import STIXPackage  # noqa
+
+
+def _store_ingest(package):
+    from stix.store import Store
+
+    with Store() as store:
+        store.ingest(package)
+
+
+def _compress(data, compression):
+    from stix.utils.compression import compressing
+
+    out = BytesIO()
+    f = compressing(out, compression)
+    f.write(data)
+    f.close()
+    return out.getvalue()
+
+
+def _write_package(package, compression):
+    from stix.core.writer import COLLECTIONS, PackageWriter
+
+    with PackageWriter(BytesIO(), package, compression=compression) as writer:
+        for attr in (x[0] for x in COLLECTIONS):
+            writer.write_all(getattr(package, attr) or ())
+
+
+def _compressed_operations(package, xml):
+    """Returns ``(name, callable)`` tuples for reading and writing `package`
+    in each compression format.
+
+    """
+    try:
+        from stix.utils.compression import FORMATS
+        from stix.utils.pull import iter_entities
+    except ImportError:
+        # Older revisions do not read compressed documents.
+        return []
+
+    ops = []
+
+    for compression in FORMATS:
+        try:
+            data = _compress(xml, compression)
+        except ValueError:
+            # xz is not supported on Python 2.
+            continue
+
+        ops.extend([
+            ("from_xml_" + compression,
+             lambda data=data: STIXPackage.from_xml(BytesIO(data))),
+            ("iter_entities_" + compression,
+             lambda data=data: sum(1 for _ in iter_entities(BytesIO(data)))),
+            ("write_" + compression,
+             lambda compression=compression: _write_package(package, compression)),
+        ])
+
+    return ops
+
+
+def _operations(package):
+    """Returns a list of ``(name, callable)`` tuples for the benchmarked
+    operations on `package`.
+
+    """
+    xml = package.to_xml()
+    d = package.to_dict()
+
+    ops = [
+        ("from_xml", lambda: STIXPackage.from_xml(BytesIO(xml))),
+        ("to_xml", package.to_xml),
+        ("to_dict", package.to_dict),
+        ("from_dict", lambda: STIXPackage.from_dict(d)),
+        ("to_json", package.to_json),
+        ("walk", lambda: sum(1 for _ in package.walk())),
+    ]
+
+    try:
+        import stix.store  # noqa
+        ops.append(("store_ingest", lambda: _store_ingest(package)))
+    except ImportError:
+        # Older revisions do not have a store.
+        pass
+
+    ops.extend(_compressed_operations(package, xml))
+    return ops
+
+
+def _peak_memory(func):
+    """Returns the peak number of bytes allocated while calling `func`, or
+    ``None`` if ``tracemalloc`` is not available.
+
+    """
+    if tracemalloc is None:
+        return None
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(size=1.0, repeat=5, pattern=None, out=sys.stdout):
+    """Runs the benchmarks and returns a results dictionary.
+
+    Args:
+        size: A multiplier applied to the default size of each fixture.
+        repeat: The number of timed runs of each operation.
+        pattern: Only run benchmarks whose ``fixture.operation`` name
+            contains this text.
+
+    """
+    results = {}
+
+    for fixture_name in sorted(fixtures.FIXTURES):
+        factory = fixtures.FIXTURES[fixture_name]
+        default = factory.__defaults__[0]
+        package = factory(max(1, int(default * size)))
+
+        for op_name, func in _operations(package):
+            name = "%s.%s" % (fixture_name, op_name)
+
+            if pattern and pattern not in name:
+                continue
+
+            times = timeit.repeat(func, number=1, repeat=repeat)
+            times.sort()
+
+            results[name] = {
+                "min": times[0],
+                "median": times[len(times) // 2],
+                "peak_memory": _peak_memory(func),
+            }
+
+            out.write("%-40s %10.4fs %12s\n" % (
+                name, times[0], results[name]["peak_memory"]
+            ))
+            out.flush()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "stix": stix.__version__,
+            "size": size,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the python-stix benchmarks.")
+    parser.add_argument("--size", type=float, default=1.0,
+                        help="Multiplier for the default fixture sizes.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of timed runs per operation.")
+    parser.add_argument("--filter", dest="pattern", default=None,
+                        help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--output", default=None,
+                        help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run(size=args.size, repeat=args.repeat, pattern=args.pattern)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+The implementation of :mod:`stix.aio`. This module uses asynchronous
+generators, which are a syntax error before Python 3.6, so it is only
+imported by :mod:`stix.aio` on Python 3.6 or later.
+
+"""
+
+# stdlib
+import asyncio
+
+# internal
+from stix.utils.pull import DEFAULT_CHUNK_SIZE, EntityPullParser, _convert_all
+
+
+async def _chunks(stream, chunk_size):
+    if hasattr(stream, "read"):
+        while True:
+            data = await stream.read(chunk_size)
+
+            if not data:
+                return
+
+            yield data
+    else:
+        async for data in stream:
+            yield data
+
+
+async def iter_entities(stream, chunk_size=DEFAULT_CHUNK_SIZE, executor=None,
+                        parser=None):
+    """Yields the top-level components of the STIX package read from
+    `stream`.
+
+    Args:
+        stream: An object with a ``read(n)`` coroutine method (e.g., an
+            ``asyncio.StreamReader``) or an asynchronous iterable of
+            ``bytes``.
+        chunk_size: The number of bytes passed to ``stream.read()``.
+        executor: The ``concurrent.futures.Executor`` used to convert parsed
+            components into entities. Default is the event loop's default
+            executor.
+        parser: An optional :class:`.EntityPullParser`. Pass one to read
+            the package ``id_`` and ``stix_header`` once they are parsed.
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the document is malformed or
+            incomplete.
+
+    """
+    loop = asyncio.get_event_loop()
+    parser = parser or EntityPullParser()
+
+    async for data in _chunks(stream, chunk_size):
+        pending = parser._feed(data)
+
+        if not pending:
+            # Yield to the event loop between chunks.
+            await asyncio.sleep(0)
+            continue
+
+        for entity in await loop.run_in_executor(executor, _convert_all, pending):
+            yield entity
+
+    pending = parser._close()
+
+    if pending:
+        for entity in await loop.run_in_executor(executor, _convert_all, pending):
+            yield entity
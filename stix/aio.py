@@ -0,0 +1,30 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+An ``asyncio`` interface for parsing STIX packages as they are received.
+
+:func:`iter_entities` reads a document from an ``asyncio`` stream (or any
+asynchronous iterable of bytes, such as an HTTP response body) and yields
+each top-level component as soon as it has been read, without buffering the
+whole document. Conversion of the parsed XML into entities is run in an
+executor so that large components do not block the event loop.
+
+This module requires Python 3.6 or later and lxml 3.3 or later.
+
+Example:
+    >>> import stix.aio
+    >>> async def collect(reader):
+    ...     async for entity in stix.aio.iter_entities(reader):
+    ...         await handle(entity)
+
+"""
+
+# stdlib
+import sys
+
+if sys.version_info < (3, 6):
+    raise ImportError("stix.aio requires Python 3.6 or later.")
+
+# internal
+from stix._aio import iter_entities  # noqa
@@ -11,7 +11,6 @@ from sys import version_info
 from mixbox import idgen
 from mixbox import entities
 from mixbox import fields
-from mixbox import binding_utils
 from mixbox import namespaces
 from mixbox.vendor.six import StringIO, iteritems, itervalues, text_type, binary_type
 
@@ -23,7 +22,13 @@ def _override(*args, **kwargs):
 
 
 class Entity(entities.Entity):
-    """Base class for all classes in the STIX API."""
+    """Base class for all classes in the STIX API.
+
+    Serialization is thread-safe: :meth:`to_xml`, ``to_dict()`` and
+    ``to_json()`` may be called from several threads at once, provided no
+    thread modifies an entity while it is being serialized.
+
+    """
     _namespace = None
     _XSI_TYPE = None
 
@@ -126,6 +131,17 @@ class Entity(entities.Entity):
             An XML string for this
             :class:`Entity` instance. Default character encoding is ``utf-8``.
 
+        Note:
+            This method is thread-safe: it keeps all of its state in local
+            variables, so it may be called from several threads at once, on
+            the same or different entities, provided no thread modifies an
+            entity while it is being serialized. On Python 2, exports are
+            run one at a time (see :func:`stix.utils.save_encoding`). It
+            reads the registered namespaces and the ID namespace (see
+            :mod:`mixbox.idgen`), which should not be changed while
+            serializing. :func:`stix.utils.to_xml_many` serializes many
+            entities using a pool of threads or processes.
+
         """
 
         from mixbox.entities import NamespaceCollector
@@ -161,7 +177,8 @@ class Entity(entities.Entity):
                 schemaloc = ns_info.get_schema_location_string(delim)
                 namespace_def += (delim + schemaloc)
 
-        with binding_utils.save_encoding(encoding):
+        # Byte string field values are decoded with the output encoding.
+        with utils.save_encoding(encoding):
             sio = StringIO()
             obj.export(
                 sio.write,                    # output buffer
@@ -397,7 +414,7 @@ class BaseCoreComponent(Entity):
         Returns:
             An instance of :class:`.StructuredText`
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -424,7 +441,7 @@ class BaseCoreComponent(Entity):
         Returns:
             An instance of :class:`.StructuredText`
         """
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
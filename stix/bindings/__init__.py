@@ -2,8 +2,10 @@
 # See LICENSE.txt for complete terms.
 
 import collections
+import threading
 
 from lxml import etree as etree_
+from mixbox.binding_utils import showIndent
 import mixbox.xml
 
 
@@ -98,12 +100,103 @@ def has_xsi_type(node):
     return mixbox.xml.TAG_XSI_TYPE in node.attrib
 
 
+class RawXML(object):
+    """An embedded foreign XML document (e.g., an OpenIOC ``ioc`` or a MAEC
+    package) kept as the serialized bytes of its element.
+
+    Bindings store embedded documents as :class:`RawXML` instead of building
+    them when passthrough parsing is enabled (see :func:`set_passthrough`).
+    The bytes are exported verbatim and only parsed if :attr:`element` is
+    accessed.
+
+    """
+    __slots__ = ("data", "_element")
+
+    def __init__(self, data):
+        self.data = data
+        self._element = None
+
+    @classmethod
+    def from_element(cls, node):
+        return cls(etree_.tostring(node, with_tail=False))
+
+    @property
+    def element(self):
+        """The parsed ``lxml.etree._Element``."""
+        if self._element is None:
+            parser = mixbox.xml.get_xml_parser()
+            self._element = etree_.fromstring(self.data, parser=parser)
+
+        return self._element
+
+    def to_obj(self, ns_info=None):
+        # Allows RawXML values to stand in for entities during to_obj().
+        return self
+
+    def export(self, lwrite, level, *args, **kwargs):
+        pretty_print = kwargs.get("pretty_print", True)
+
+        showIndent(lwrite, level, pretty_print)
+        lwrite(self.data.decode("utf-8"))
+
+        if pretty_print:
+            lwrite("\n")
+
+
+# Passthrough parsing is enabled per thread.
+_PASSTHROUGH = threading.local()
+
+
+def set_passthrough(enabled):
+    """Enables or disables passthrough parsing of embedded foreign XML
+    documents in the current thread.
+
+    """
+    _PASSTHROUGH.enabled = bool(enabled)
+
+
+def is_passthrough():
+    """Returns ``True`` if passthrough parsing is enabled in the current
+    thread.
+
+    """
+    return getattr(_PASSTHROUGH, "enabled", False)
+
+
+def build_embedded(node, build):
+    """Returns a :class:`RawXML` for the embedded document `node` if
+    passthrough parsing is enabled, or else ``build(node)``.
+
+    """
+    if is_passthrough():
+        return RawXML.from_element(node)
+
+    return build(node)
+
+
+def export_embedded(lwrite, level, value, pretty_print):
+    """Exports an embedded document stored as an lxml element or as a
+    :class:`RawXML`.
+
+    """
+    if isinstance(value, RawXML):
+        value.export(lwrite, level, pretty_print=pretty_print)
+    else:
+        showIndent(lwrite, level, pretty_print)
+        lwrite(etree_.tostring(value, pretty_print=pretty_print).decode())
+
+
 __all__ = [
+    'RawXML',
     'TypeInfo',
     'add_extension',
+    'build_embedded',
     'etree_',
+    'export_embedded',
     'get_type_info',
     'has_xsi_type',
+    'is_passthrough',
     'lookup_extension',
     'register_extension',
+    'set_passthrough',
 ]
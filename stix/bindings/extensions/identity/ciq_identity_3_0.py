@@ -12,7 +12,7 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, build_embedded, export_embedded
 import stix.bindings.stix_common as stix_common_binding
 
 XML_NS = "http://stix.mitre.org/extensions/Identity#CIQIdentity3.0-1"
@@ -98,8 +98,7 @@ class CIQIdentity3_0InstanceType(stix_common_binding.IdentityType):
         else:
             eol_ = ''
         if self.Specification is not None:
-            showIndent(lwrite, level, pretty_print)
-            lwrite(etree_.tostring(self.Specification, pretty_print=pretty_print).decode())
+            export_embedded(lwrite, level, self.Specification, pretty_print)
             #self.Specification.export(lwrite, level, nsmap, namespace_, name_='Specification', pretty_print=pretty_print)
         for Role_ in self.Role:
             showIndent(lwrite, level, pretty_print)
@@ -115,7 +114,7 @@ class CIQIdentity3_0InstanceType(stix_common_binding.IdentityType):
         super(CIQIdentity3_0InstanceType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Specification':
-            self.set_Specification(child_)
+            self.set_Specification(build_embedded(child_, lambda x: x))
         elif nodeName_ == 'Role':
             Role_ = child_.text
             Role_ = self.gds_validate_string(Role_, node, 'Role')
@@ -12,12 +12,20 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, build_embedded
 import stix.bindings.ttp as ttp_binding
 
 
 XML_NS = "http://stix.mitre.org/extensions/Malware#MAEC4.1-1"
 
+
+def _build_maec(node):
+    # Fails hard if maec library is not installed in your Python environment.
+    from maec.bindings.maec_package import PackageType
+    obj_ = PackageType.factory()
+    obj_.build(node)
+    return obj_
+
 #
 # Data representation classes.
 #
@@ -96,11 +104,7 @@ class MAEC4_1InstanceType(ttp_binding.MalwareInstanceType):
         super(MAEC4_1InstanceType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'MAEC':
-            # Fails hard if maec library is not installed in your Python environment.
-            from maec.bindings.maec_package import PackageType
-            obj_ = PackageType.factory()
-            obj_.build(child_)
-            self.set_MAEC(obj_)
+            self.set_MAEC(build_embedded(child_, _build_maec))
         super(MAEC4_1InstanceType, self).buildChildren(child_, node, nodeName_, True)
 # end class MAEC4_1InstanceType
 
@@ -12,7 +12,7 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, build_embedded, export_embedded
 import stix.bindings.indicator as indicator_binding
 
 XML_NS = "http://stix.mitre.org/extensions/TestMechanism#OpenIOC2010-1"
@@ -87,8 +87,7 @@ class OpenIOC2010TestMechanismType(indicator_binding.TestMechanismType):
         else:
             eol_ = ''
         if self.ioc is not None:
-            showIndent(lwrite, level, pretty_print)
-            lwrite(etree_.tostring(self.ioc, pretty_print=pretty_print).decode())
+            export_embedded(lwrite, level, self.ioc, pretty_print)
             #self.ioc.export(lwrite, level, nsmap, namespace_, name_='ioc', pretty_print=pretty_print)
     def build(self, node):
         self.__sourcenode__ = node
@@ -101,7 +100,7 @@ class OpenIOC2010TestMechanismType(indicator_binding.TestMechanismType):
         super(OpenIOC2010TestMechanismType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'ioc':
-            self.set_ioc(child_)
+            self.set_ioc(build_embedded(child_, lambda x: x))
         super(OpenIOC2010TestMechanismType, self).buildChildren(child_, node, nodeName_, True)
 # end class OpenIOC2010TestMechanismType
 
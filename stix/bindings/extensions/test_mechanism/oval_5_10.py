@@ -12,7 +12,7 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, build_embedded, export_embedded
 import stix.bindings.indicator as indicator_binding
 
 XML_NS = "http://stix.mitre.org/extensions/TestMechanism#OVAL5.10-1"
@@ -91,12 +91,10 @@ class OVAL5_10TestMechanismType(indicator_binding.TestMechanismType):
         else:
             eol_ = ''
         if self.oval_definitions is not None:
-            showIndent(lwrite, level, pretty_print)
-            lwrite(etree_.tostring(self.oval_definitions, pretty_print=pretty_print).decode())
+            export_embedded(lwrite, level, self.oval_definitions, pretty_print)
             #self.oval_definitions.export(lwrite, level, nsmap, namespace_, name_='oval_definitions', pretty_print=pretty_print)
         if self.oval_variables is not None:
-            showIndent(lwrite, level, pretty_print)
-            lwrite(etree_.tostring(self.oval_variables, pretty_print=pretty_print).decode())
+            export_embedded(lwrite, level, self.oval_variables, pretty_print)
             #self.oval_variables.export(lwrite, level, nsmap, namespace_, name_='oval_variables', pretty_print=pretty_print)
     def build(self, node):
         self.__sourcenode__ = node
@@ -109,9 +107,9 @@ class OVAL5_10TestMechanismType(indicator_binding.TestMechanismType):
         super(OVAL5_10TestMechanismType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'oval_definitions':
-            self.set_oval_definitions(child_)
+            self.set_oval_definitions(build_embedded(child_, lambda x: x))
         elif nodeName_ == 'oval_variables':
-            self.set_oval_variables(child_)
+            self.set_oval_variables(build_embedded(child_, lambda x: x))
         super(OVAL5_10TestMechanismType, self).buildChildren(child_, node, nodeName_, True)
 # end class OVAL5_10TestMechanismType
 
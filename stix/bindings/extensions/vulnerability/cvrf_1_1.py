@@ -12,7 +12,7 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, build_embedded, export_embedded
 import stix.bindings.exploit_target as exploit_target_binding
 
 XML_NS = "http://stix.mitre.org/extensions/Vulnerability#CVRF-1"
@@ -88,8 +88,7 @@ class CVRF1_1InstanceType(exploit_target_binding.VulnerabilityType):
         else:
             eol_ = ''
         if self.cvrfdoc is not None:
-            showIndent(lwrite, level, pretty_print)
-            lwrite(etree_.tostring(self.cvrfdoc, pretty_print=pretty_print).decode())
+            export_embedded(lwrite, level, self.cvrfdoc, pretty_print)
             #self.cvrfdoc.export(lwrite, level, nsmap, namespace_, name_='cvrfdoc', pretty_print=pretty_print)
     def build(self, node):
         self.__sourcenode__ = node
@@ -102,7 +101,7 @@ class CVRF1_1InstanceType(exploit_target_binding.VulnerabilityType):
         super(CVRF1_1InstanceType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'cvrfdoc':
-            self.set_cvrfdoc(child_)
+            self.set_cvrfdoc(build_embedded(child_, lambda x: x))
         super(CVRF1_1InstanceType, self).buildChildren(child_, node, nodeName_, True)
 # end class CVRF1_1InstanceType
 
@@ -158,7 +158,7 @@ class Campaign(stix.BaseCoreComponent):
             An instance of :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -38,7 +38,7 @@ class Objective(stix.Entity):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -67,7 +67,7 @@ class Objective(stix.Entity):
             An instance of :class:`.StructuredText`
 
         """
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
@@ -4,7 +4,8 @@
 from __future__ import absolute_import
 from sys import version_info
 
-from mixbox.fields import TypedField, CDATAField
+from mixbox import fields
+from mixbox.fields import TypedField
 
 from .structured_text import StructuredText, StructuredTextList  # noqa
 from .vocabs import VocabString   # noqa
@@ -33,6 +34,19 @@ import stix.bindings.stix_common as common_binding
 
 from mixbox.vendor.six import text_type
 
+class CDATAField(fields.CDATAField):
+    """A field whose values are stored without CDATA blocks and are wrapped
+    in a CDATA block when exported. Uses :func:`stix.utils.strip_cdata`,
+    which does not parse each value as XML.
+
+    """
+    def _clean(self, value):
+        return utils.strip_cdata(value)
+
+    def binding_value(self, value):
+        return utils.cdata(value)
+
+
 class EncodedCDATA(stix.Entity):
     _namespace = "http://stix.mitre.org/common-1"
     _binding = common_binding
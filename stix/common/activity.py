@@ -38,7 +38,7 @@ class Activity(stix.Entity):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -51,7 +51,7 @@ class Confidence(stix.Entity):
             An instance of :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -65,7 +65,7 @@ class InformationSource(stix.Entity):
             An instance of :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
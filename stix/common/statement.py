@@ -55,7 +55,7 @@ class Statement(stix.Entity):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
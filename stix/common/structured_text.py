@@ -1,5 +1,6 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
+import bisect
 import itertools
 import contextlib
 import collections
@@ -16,6 +17,19 @@ from mixbox.vendor.six import text_type
 #: Default ordinality value for StructuredText.
 DEFAULT_ORDINALITY = 1
 
+# Incremented whenever the ordinality of any StructuredText object is set.
+# StructuredTextList indexes built at an older count are revalidated before
+# they are used.
+_ORDINALITY_CHANGES = [0]
+
+
+class _OrdinalityField(fields.TypedField):
+    """Records changes to ``StructuredText.ordinality`` values."""
+
+    def __set__(self, instance, value):
+        super(_OrdinalityField, self).__set__(instance, value)
+        _ORDINALITY_CHANGES[0] += 1
+
 
 class StructuredText(stix.Entity):
     """Used for storing descriptive text elements.
@@ -32,7 +46,7 @@ class StructuredText(stix.Entity):
     _namespace = 'http://stix.mitre.org/common-1'
 
     id_ = fields.IdField("id")
-    ordinality = fields.TypedField("ordinality")
+    ordinality = _OrdinalityField("ordinality")
     value = fields.TypedField("valueOf_", key_name="value")
     structuring_format = fields.TypedField("structuring_format")
 
@@ -105,6 +119,63 @@ def _unset_default(text):
         text.ordinality = ordinality
 
 
+class _OrdinalityIndex(object):
+    """The items of a :class:`StructuredTextList`, sorted and keyed by
+    ordinality.
+
+    The ``items`` list is replaced rather than modified when an item is
+    appended, so iterators over it are not affected.
+
+    """
+    __slots__ = ("changes", "items", "keys", "ordinalities", "by_ordinality")
+
+    def __init__(self, inner):
+        self.changes = _ORDINALITY_CHANGES[0]
+        self.items = sorted(inner, key=lambda x: int(x.ordinality))
+        self.ordinalities = [x.ordinality for x in self.items]
+        self.keys = [int(x) for x in self.ordinalities]
+        self.by_ordinality = {}
+
+        # The first item wins if ordinalities are duplicated.
+        for item in inner:
+            self.by_ordinality.setdefault(item.ordinality, item)
+
+    def is_current(self):
+        """Returns ``True`` if no item ordinality has changed since the
+        index was built.
+
+        """
+        changes = _ORDINALITY_CHANGES[0]
+
+        if self.changes == changes:
+            return True
+
+        for item, ordinality in zip(self.items, self.ordinalities):
+            if item.ordinality != ordinality:
+                return False
+
+        # Ordinalities were set, but not on these items (or not changed).
+        self.changes = changes
+        return True
+
+    def append(self, item):
+        """Adds `item`, which has been appended to the list."""
+        ordinality = item.ordinality
+        key = int(ordinality)
+
+        # Insert after equal keys, as a stable sort of the list would.
+        idx = bisect.bisect_right(self.keys, key)
+        self.items = self.items[:idx] + [item] + self.items[idx:]
+        self.ordinalities.insert(idx, ordinality)
+        self.keys.insert(idx, key)
+        self.by_ordinality.setdefault(ordinality, item)
+        self.changes = _ORDINALITY_CHANGES[0]
+
+    def first(self):
+        """Returns the item with the lowest ordinality, or ``None``."""
+        return self.items[0] if self.items else None
+
+
 class StructuredTextList(stix.TypedCollection, collections.Sequence):
     """A sequence type used to store StructureText objects.
 
@@ -118,8 +189,21 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
     _try_cast = True
 
     def __init__(self, *args):
+        self._index = None
         stix.TypedCollection.__init__(self, *args)
 
+    def _ordered(self):
+        """Returns the current :class:`_OrdinalityIndex` of the collection,
+        rebuilding it if the collection or any item ordinality has changed.
+
+        """
+        index = self._index
+
+        if index is None or not index.is_current():
+            index = self._index = _OrdinalityIndex(self._inner)
+
+        return index
+
     def _initialize_inner(self, *args):
         # Check if it was initialized with args=None
         if not any(args):
@@ -158,7 +242,15 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         :class:`.StructuredText` objects, sorted by their ``ordinality``.
 
         """
-        return sorted(self._inner, key=lambda x: int(x.ordinality))
+        return list(self._ordered().items)
+
+    @property
+    def first(self):
+        """Returns the :class:`.StructuredText` object with the lowest
+        ordinality, or ``None`` if the collection is empty.
+
+        """
+        return self._ordered().first()
 
     @property
     def ordinalities(self):
@@ -166,14 +258,14 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         values of the internal :class:`StructuredTex` objects.
 
         """
-        return tuple(x.ordinality for x in self.sorted)
+        return tuple(self._ordered().ordinalities)
 
     @property
     def next_ordinality(self):
         """Returns the "+1" of the highest ordinality in the collection.
 
         """
-        ords = self.ordinalities
+        ords = self._ordered().ordinalities
 
         if not ords:
             return 1
@@ -184,7 +276,7 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         """Returns an iterator for the collection sorted by ordinality.
 
         """
-        return iter(self.sorted)
+        return iter(self._ordered().items)
 
     def __getitem__(self, key):
         """Returns the :class:`.StructuredText` object with a matching
@@ -199,10 +291,10 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
 
         """
         o = int(key)
+        item = self._ordered().by_ordinality.get(o)
 
-        for item in self._inner:
-            if item.ordinality == o:
-                return item
+        if item is not None:
+            return item
 
         error = "No item found with an ordinality of {0}".format(o)
         raise KeyError(error)
@@ -219,13 +311,14 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
 
         """
         self._inner.remove(self[key])
+        self._index = None
 
     def __reversed__(self):
         """Yields the :class:`StructuredText` collection in descending order
         of their ordinalities.
 
         """
-        for text in reversed(self.sorted):
+        for text in reversed(self._ordered().items):
             yield text
 
     def add(self, value):
@@ -253,7 +346,9 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         with utils.ignored(KeyError):
             del self[value.ordinality]
 
+        index = self._ordered()
         self._inner.append(value)
+        index.append(value)
 
     def update(self, iterable):
         """Adds each item of `iterable` to the collection.
@@ -309,12 +404,14 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         else:
             self._shift(value.ordinality)
             self._inner.append(value)
+            self._index = None
 
     def remove(self, value):
         """Removes the value from the collection.
 
         """
         self._inner.remove(value)
+        self._index = None
 
     def to_obj(self, ns_info=None):
         """Returns a binding object list for the StructuredTextList.
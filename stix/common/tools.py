@@ -46,7 +46,7 @@ class ToolInformation(stix.Entity, cybox.common.ToolInformation):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
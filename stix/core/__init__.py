@@ -120,4 +120,5 @@ class Reports(stix.EntityList):
 
 # Namespace flattening
 from .stix_package import STIXPackage  # noqa
-from .stix_header import STIXHeader  # noqa
\ No newline at end of file
+from .stix_header import STIXHeader  # noqa
+from .writer import PackageWriter, JSONPackageWriter  # noqa
@@ -73,7 +73,7 @@ class STIXHeader(stix.Entity):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -104,7 +104,7 @@ class STIXHeader(stix.Entity):
             An instance of :class:`.StructuredText`
 
         """
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
@@ -0,0 +1,417 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Incremental writers for STIX packages.
+
+:class:`PackageWriter` and :class:`JSONPackageWriter` write a package to a
+file one top-level component at a time, so packages with more components
+than fit in memory can be produced. Components must be written in the order
+of the ``STIXPackage`` collections (observables, indicators, TTPs, exploit
+targets, incidents, courses of action, campaigns, threat actors, reports).
+
+Both writers can compress their output as it is written (see
+:mod:`stix.utils.compression`).
+
+Example:
+    >>> from stix.core.writer import PackageWriter
+    >>> with open("out.xml", "wb") as f, PackageWriter(f) as writer:
+    ...     for indicator in indicators:
+    ...         writer.write(indicator)
+
+"""
+
+# stdlib
+import io
+import json
+
+# external
+from cybox.core import Observable, Observables
+from mixbox.entities import NamespaceCollector
+from mixbox.vendor.six import StringIO, iteritems, string_types, text_type
+
+# internal
+import stix.bindings.stix_core as stix_core_binding
+from stix.utils import save_encoding
+from stix.utils.compression import compressing, from_extension
+
+# component imports
+from ..campaign import Campaign
+from ..coa import CourseOfAction
+from ..exploit_target import ExploitTarget
+from ..incident import Incident
+from ..indicator import Indicator
+from ..report import Report
+from ..threat_actor import ThreatActor
+from ..ttp import TTP
+
+# relative imports
+from .stix_package import STIXPackage
+from .ttps import TTPs
+from . import (Campaigns, CoursesOfAction, ExploitTargets, Incidents,
+               Indicators, ThreatActors, Reports)
+
+
+#: ``(STIXPackage attribute, collection element name, component element
+#: name, component class, collection class)`` tuples, in the order the
+#: collections are written.
+COLLECTIONS = (
+    ("observables", "Observables", "Observable", Observable, Observables),
+    ("indicators", "Indicators", "Indicator", Indicator, Indicators),
+    ("ttps", "TTPs", "TTP", TTP, TTPs),
+    ("exploit_targets", "Exploit_Targets", "Exploit_Target", ExploitTarget, ExploitTargets),
+    ("incidents", "Incidents", "Incident", Incident, Incidents),
+    ("courses_of_action", "Courses_Of_Action", "Course_Of_Action", CourseOfAction, CoursesOfAction),
+    ("campaigns", "Campaigns", "Campaign", Campaign, Campaigns),
+    ("threat_actors", "Threat_Actors", "Threat_Actor", ThreatActor, ThreatActors),
+    ("reports", "Reports", "Report", Report, Reports),
+)
+
+_POSITIONS = dict((x[3], idx) for idx, x in enumerate(COLLECTIONS))
+
+_NS_STIX = stix_core_binding.XML_NS
+
+
+def _position(component):
+    """Returns the index into :data:`COLLECTIONS` of the collection which
+    holds `component`.
+
+    """
+    for klass in type(component).__mro__:
+        try:
+            return _POSITIONS[klass]
+        except KeyError:
+            continue
+
+    error = "Cannot add type '{0}' to a top-level collection"
+    raise TypeError(error.format(type(component)))
+
+
+class _BaseWriter(object):
+    """Tracks the collection being written and enforces the order in which
+    components are written.
+
+    """
+    def __init__(self, fileobj, package=None, encoding="utf-8",
+                 compression=None):
+        self.encoding = encoding
+        self.package = package or STIXPackage()
+        self.count = 0
+
+        self._current = None
+        self._started = False
+        self._closed = False
+        self._opened = None
+        self._compressed = None
+
+        if isinstance(fileobj, string_types):
+            if compression is None:
+                compression = from_extension(fileobj)
+
+            fileobj = self._opened = io.open(fileobj, "wb")
+
+        if compression is not None:
+            try:
+                fileobj = self._compressed = compressing(fileobj, compression)
+            except ValueError:
+                self._release()
+                raise
+
+        self.fileobj = fileobj
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._release()
+
+    def _release(self):
+        """Finishes the compressed stream and closes the file, if the writer
+        opened them.
+
+        """
+        if self._compressed is not None:
+            self._compressed.close()
+            self._compressed = None
+
+        if self._opened is not None:
+            self._opened.close()
+            self._opened = None
+
+    def _write(self, text):
+        if self.encoding:
+            text = text.encode(self.encoding)
+        self.fileobj.write(text)
+
+    def open(self):
+        """Writes the start of the package. This is called automatically by
+        the first :meth:`write` call.
+
+        """
+        if self._started:
+            return
+
+        self._started = True
+        self._write_start()
+
+    def close(self):
+        """Writes the end of the package and finishes the compressed stream,
+        if the output is compressed. Does not close the file, unless the
+        writer was given a filename.
+
+        """
+        if self._closed:
+            return
+
+        self.open()
+
+        if self._current is not None:
+            self._write_collection_end(COLLECTIONS[self._current])
+
+        self._write_end()
+        self._release()
+        self._closed = True
+
+    def write(self, component):
+        """Writes the top-level `component`.
+
+        Raises:
+            TypeError: If `component` is not a top-level component type.
+            ValueError: If a component of a collection which precedes the
+                collection being written is written, or if the writer is
+                closed.
+
+        """
+        position = _position(component)
+        self._enter_collection(position)
+        self._write_rendered(self._render_component(component, COLLECTIONS[position]))
+        self.count += 1
+
+    def _enter_collection(self, position):
+        """Starts the collection at index `position` of :data:`COLLECTIONS`,
+        if it is not the collection being written.
+
+        """
+        if self._closed:
+            raise ValueError("Cannot write to a closed PackageWriter.")
+
+        if self._current is None or position > self._current:
+            self.open()
+
+            if self._current is not None:
+                self._write_collection_end(COLLECTIONS[self._current])
+
+            self._write_collection_start(COLLECTIONS[position])
+            self._current = position
+        elif position < self._current:
+            error = "Cannot write {0} after {1}; components must be written in collection order."
+            raise ValueError(error.format(
+                COLLECTIONS[position][0], COLLECTIONS[self._current][0]
+            ))
+
+    def write_all(self, components):
+        """Writes each of the top-level `components`."""
+        for component in components:
+            self.write(component)
+
+
+class PackageWriter(_BaseWriter):
+    """Writes a STIX package as XML, one top-level component at a time.
+
+    Namespaces used by the package header, the ID namespace and any
+    `namespaces` passed in are declared on the ``STIX_Package`` element.
+    Namespaces used by a component which are not declared there are declared
+    on the component element.
+
+    Args:
+        fileobj: A file-like object opened for writing, or a filename. If a
+            file-like object, ``bytes`` are written to it, unless `encoding`
+            is ``None``.
+        package: An optional :class:`.STIXPackage` which provides the
+            package ``id``, ``version`` and ``STIX_Header``. Its top-level
+            collections are not written.
+        namespaces: An optional dictionary of ``namespace: alias`` pairs to
+            declare on the ``STIX_Package`` element.
+        pretty: Pretty-print the XML. Default is ``True``.
+        encoding: The output character encoding. Default is ``utf-8``.
+        compression: Compress the output with one of
+            :data:`stix.utils.compression.FORMATS`. By default, a filename's
+            extension selects the compression (e.g., ``.xml.gz``); output
+            to a file-like object is not compressed.
+
+    """
+    def __init__(self, fileobj, package=None, namespaces=None, pretty=True,
+                 encoding="utf-8", compression=None):
+        super(PackageWriter, self).__init__(fileobj, package, encoding, compression)
+        self.namespaces = namespaces
+        self.pretty = pretty
+        self._nsmap = {}
+        self._prefix = None
+
+    def _write_start(self):
+        header = STIXPackage(
+            id_=self.package.id_,
+            idref=self.package.idref,
+            stix_header=self.package.stix_header
+        )
+        header.version = self.package.version
+
+        ns_info = NamespaceCollector()
+        obj = header.to_obj(ns_info=ns_info)
+        ns_info.finalize(ns_dict=self.namespaces)
+
+        self._nsmap = dict(ns_info.binding_namespaces)
+        self._prefix = self._nsmap[_NS_STIX]
+
+        delim = "\n\t" if self.pretty else " "
+        namespacedef = delim + ns_info.get_xmlns_string(delim)
+
+        text = self._export(obj, (self._nsmap, _NS_STIX), "STIX_Package", namespacedef, 0)
+        end = "</%s:STIX_Package>" % self._prefix
+
+        if end in text:
+            text = text[:text.rindex(end)]
+        else:
+            # The package has no STIX_Header, so it was written as an empty
+            # element.
+            text = text.rstrip()[:-2] + (">\n" if self.pretty else ">")
+
+        self._write(text)
+
+    def _write_end(self):
+        self._write("</%s:STIX_Package>%s" % (self._prefix, "\n" if self.pretty else ""))
+
+    def _indent(self, level):
+        return "    " * level if self.pretty else ""
+
+    def _write_collection_start(self, collection):
+        name, klass = collection[1], collection[4]
+
+        attrs = ""
+        if klass is Observables:
+            observables = Observables()
+            attrs = ' cybox_major_version="%s" cybox_minor_version="%s" cybox_update_version="%s"' % (
+                observables.cybox_major_version,
+                observables.cybox_minor_version,
+                observables.cybox_update_version
+            )
+
+        self._write("%s<%s:%s%s>%s" % (
+            self._indent(1), self._prefix, name, attrs, "\n" if self.pretty else ""
+        ))
+
+    def _write_collection_end(self, collection):
+        self._write("%s</%s:%s>%s" % (
+            self._indent(1), self._prefix, collection[1], "\n" if self.pretty else ""
+        ))
+
+    def _write_rendered(self, text):
+        self._write(text)
+
+    def _render_component(self, component, collection):
+        ns_info = NamespaceCollector()
+        obj = component.to_obj(ns_info=ns_info)
+        ns_info.finalize()
+
+        undeclared = sorted(
+            (prefix, ns) for ns, prefix in iteritems(ns_info.binding_namespaces)
+            if self._nsmap.get(ns) != prefix
+        )
+
+        nsmap = dict(self._nsmap)
+        nsmap.update(ns_info.binding_namespaces)
+        namespacedef = " ".join('xmlns:%s="%s"' % x for x in undeclared)
+
+        if isinstance(component, Observable):
+            # CybOX bindings use fixed namespace prefixes.
+            args = ("cybox:",)
+        else:
+            args = (nsmap, _NS_STIX)
+
+        return self._export(obj, args, collection[2], namespacedef, 2)
+
+    def _export(self, obj, args, name, namespacedef, level):
+        """Exports the binding object `obj` to a string."""
+        with save_encoding(self.encoding):
+            sio = StringIO()
+            obj.export(sio.write, level, *args, name_=name,
+                       namespacedef_=namespacedef, pretty_print=self.pretty)
+
+        return text_type(sio.getvalue())
+
+
+class JSONPackageWriter(_BaseWriter):
+    """Writes a STIX package as JSON (the ``to_dict()`` representation), one
+    top-level component at a time.
+
+    Args:
+        fileobj: A file-like object opened for writing, or a filename. If a
+            file-like object, ``bytes`` are written to it, unless `encoding`
+            is ``None``.
+        package: An optional :class:`.STIXPackage` which provides the
+            package ``id``, ``version`` and ``STIX_Header``. Its top-level
+            collections are not written.
+        encoding: The output character encoding. Default is ``utf-8``.
+        compression: Compress the output with one of
+            :data:`stix.utils.compression.FORMATS`. By default, a filename's
+            extension selects the compression (e.g., ``.json.gz``); output
+            to a file-like object is not compressed.
+
+    """
+    def __init__(self, fileobj, package=None, encoding="utf-8",
+                 compression=None):
+        super(JSONPackageWriter, self).__init__(fileobj, package, encoding, compression)
+        self._first = True
+
+    def _write_start(self):
+        d = STIXPackage(
+            id_=self.package.id_,
+            idref=self.package.idref,
+            stix_header=self.package.stix_header
+        ).to_dict()
+
+        d["version"] = self.package.version
+
+        # Drop the empty collections created by the STIXPackage constructor.
+        for collection in COLLECTIONS:
+            d.pop(collection[0], None)
+
+        self._write(json.dumps(d)[:-1])
+
+    def _write_end(self):
+        self._write("}")
+
+    def _write_collection_start(self, collection):
+        attr, klass = collection[0], collection[4]
+        self._first = True
+
+        if klass._dict_as_list():
+            self._write(', "%s": [' % attr)
+            return
+
+        key = klass._multiple_field().key_name
+        d = klass().to_dict()
+        d.pop(key, None)
+
+        prefix = json.dumps(d)[1:-1]
+        self._write(', "%s": {%s%s"%s": [' % (attr, prefix, ", " if prefix else "", key))
+
+    def _write_collection_end(self, collection):
+        if collection[4]._dict_as_list():
+            self._write("]")
+        else:
+            self._write("]}")
+
+    def _write_rendered(self, text):
+        if not self._first:
+            self._write(", ")
+
+        self._first = False
+        self._write(text)
+
+    def _render_component(self, component, collection):
+        return json.dumps(component.to_dict())
@@ -44,7 +44,7 @@ class Configuration(stix.Entity):
         """
         if self.descriptions is None:
             return None
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -75,7 +75,7 @@ class Configuration(stix.Entity):
         """
         if self.short_descriptions is None:
             self.short_descriptions = StructuredTextList()
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
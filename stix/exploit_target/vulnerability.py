@@ -59,7 +59,7 @@ class Vulnerability(stix.Entity):
         Returns:
             An instance of :class:`.StructuredText`
         """
-        return next(iter(self.descriptions or []), None)
+        return self.descriptions.first if self.descriptions else None
 
     @description.setter
     def description(self, value):
@@ -86,7 +86,7 @@ class Vulnerability(stix.Entity):
         Returns:
             An instance of :class:`.StructuredText`
         """
-        return next(iter(self.short_descriptions or []), None)
+        return self.short_descriptions.first if self.short_descriptions else None
 
     @short_description.setter
     def short_description(self, value):
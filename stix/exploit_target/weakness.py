@@ -39,7 +39,7 @@ class Weakness(stix.Entity):
         Returns:
             An instance of :class:`.StructuredText`
         """
-        return next(iter(self.descriptions or []), None)
+        return self.descriptions.first if self.descriptions else None
 
     @description.setter
     def description(self, value):
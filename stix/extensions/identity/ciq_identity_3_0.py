@@ -7,6 +7,7 @@ import stix
 import stix.utils as utils
 import stix.common as common
 import stix.bindings.extensions.identity.ciq_identity_3_0 as ciq_identity_binding
+from stix.bindings import RawXML
 
 from mixbox.vendor.six import string_types
 
@@ -16,12 +17,44 @@ XML_NS_XNL      = "urn:oasis:names:tc:ciq:xnl:3"
 XML_NS_XAL      = "urn:oasis:names:tc:ciq:xal:3"
 XML_NS_STIX_EXT = "http://stix.mitre.org/extensions/Identity#CIQIdentity3.0-1"
 
+# Tags of child elements which are read and written by the containing
+# entity.
+_TAG_LANGUAGES                       = "{%s}Languages" % XML_NS_XPIL
+_TAG_ADDRESSES                       = "{%s}Addresses" % XML_NS_XPIL
+_TAG_NATIONALITIES                   = "{%s}Nationalities" % XML_NS_XPIL
+_TAG_ELECTRONIC_ADDRESS_IDENTIFIERS  = "{%s}ElectronicAddressIdentifiers" % XML_NS_XPIL
+_TAG_FREE_TEXT_LINES                 = "{%s}FreeTextLines" % XML_NS_XPIL
+_TAG_CONTACT_NUMBERS                 = "{%s}ContactNumbers" % XML_NS_XPIL
+_TAG_NATIONALITY                     = "{%s}Country" % XML_NS_XPIL
+_TAG_FREE_TEXT_ADDRESS               = "{%s}FreeTextAddress" % XML_NS_XAL
+_TAG_COUNTRY                         = "{%s}Country" % XML_NS_XAL
+_TAG_ADMINISTRATIVE_AREA             = "{%s}AdministrativeArea" % XML_NS_XAL
+
 et.register_namespace('xpil', XML_NS_XPIL)
 et.register_namespace('xnl', XML_NS_XNL)
 et.register_namespace('xal', XML_NS_XAL)
 et.register_namespace('stix-ciqidentity', XML_NS_STIX_EXT)
 
 
+def _children_by_tag(obj):
+    """Returns a dictionary of tags to lists of the child elements of `obj`,
+    in document order. The children are read in a single pass, rather than
+    once per ``findall()`` call.
+
+    """
+    children = {}
+
+    for child in obj:
+        tagged = children.get(child.tag)
+
+        if tagged is None:
+            children[child.tag] = [child]
+        else:
+            tagged.append(child)
+
+    return children
+
+
 @stix.register_extension
 class CIQIdentity3_0Instance(common.Identity):
     _binding = ciq_identity_binding
@@ -58,6 +91,11 @@ class CIQIdentity3_0Instance(common.Identity):
 
     @property
     def specification(self):
+        if isinstance(self._specification, RawXML):
+            # Parse content kept by passthrough parsing on first access.
+            raw = self._specification
+            self._specification = STIXCIQIdentity3_0.from_obj(raw.element)
+
         return self._specification
 
     @specification.setter
@@ -75,7 +113,9 @@ class CIQIdentity3_0Instance(common.Identity):
             for role in self.roles:
                 obj.add_Role(role)
 
-        if self.specification:
+        if isinstance(self._specification, RawXML):
+            obj.Specification = self._specification
+        elif self.specification:
             obj.Specification = self.specification.to_obj(ns_info=ns_info)
 
         return obj
@@ -91,7 +131,9 @@ class CIQIdentity3_0Instance(common.Identity):
             for role in roles:
                 obj.add_role(role)
 
-        if specification is not None:
+        if isinstance(specification, RawXML):
+            obj._specification = specification
+        elif specification is not None:
             obj.specification = STIXCIQIdentity3_0.from_obj(specification)
 
         return obj
@@ -313,36 +355,38 @@ class STIXCIQIdentity3_0(stix.Entity):
         if not return_obj:
             return_obj = cls()
 
-        party_name = obj.findall(PartyName.XML_TAG)
-        if party_name is not None and len(party_name) > 0:
+        children = _children_by_tag(obj)
+
+        party_name = children.get(PartyName.XML_TAG)
+        if party_name:
             return_obj.party_name = PartyName.from_obj(party_name[0])
 
-        languages = obj.findall("{%s}Languages" % XML_NS_XPIL)
-        if languages is not None and len(languages) > 0:
+        languages = children.get(_TAG_LANGUAGES)
+        if languages:
             return_obj.languages = [Language.from_obj(x) for x in languages[0]]
 
-        addresses = obj.findall("{%s}Addresses" % XML_NS_XPIL)
-        if addresses is not None and len(addresses) > 0:
+        addresses = children.get(_TAG_ADDRESSES)
+        if addresses:
             return_obj.addresses = [Address.from_obj(x) for x in addresses[0]]
 
-        nationalities = obj.findall("{%s}Nationalities" % XML_NS_XPIL)
-        if nationalities is not None and len(nationalities) > 0:
+        nationalities = children.get(_TAG_NATIONALITIES)
+        if nationalities:
             return_obj.nationalities = [Country.from_obj(x) for x in nationalities[0]]
 
-        organisation_info = obj.findall(OrganisationInfo.XML_TAG)
-        if organisation_info is not None and len(organisation_info) > 0:
+        organisation_info = children.get(OrganisationInfo.XML_TAG)
+        if organisation_info:
             return_obj.organisation_info = OrganisationInfo.from_obj(organisation_info[0])
 
-        electronic_address_identifiers = obj.findall("{%s}ElectronicAddressIdentifiers" % XML_NS_XPIL)
-        if electronic_address_identifiers is not None and len(electronic_address_identifiers) > 0:
+        electronic_address_identifiers = children.get(_TAG_ELECTRONIC_ADDRESS_IDENTIFIERS)
+        if electronic_address_identifiers:
             return_obj.electronic_address_identifiers = [ElectronicAddressIdentifier.from_obj(x) for x in electronic_address_identifiers[0]]
 
-        free_text_lines = obj.findall("{%s}FreeTextLines" % XML_NS_XPIL)
-        if free_text_lines is not None and len(free_text_lines) > 0:
+        free_text_lines = children.get(_TAG_FREE_TEXT_LINES)
+        if free_text_lines:
             return_obj.free_text_lines = [FreeTextLine.from_obj(x) for x in free_text_lines[0]]
 
-        contact_numbers = obj.findall("{%s}ContactNumbers" % XML_NS_XPIL)
-        if contact_numbers is not None and len(contact_numbers) > 0:
+        contact_numbers = children.get(_TAG_CONTACT_NUMBERS)
+        if contact_numbers:
             return_obj.contact_numbers = [ContactNumber.from_obj(x) for x in contact_numbers[0]]
 
         return return_obj
@@ -361,8 +405,7 @@ class STIXCIQIdentity3_0(stix.Entity):
             return_obj = et.Element(root_tag)
 
         if self.free_text_lines:
-            ftl_root = et.Element("{%s}FreeTextLines" % XML_NS_XPIL)
-            return_obj.append(ftl_root)
+            ftl_root = et.SubElement(return_obj, _TAG_FREE_TEXT_LINES)
             for ftl in self.free_text_lines:
                 ftl_root.append(ftl.to_obj(ns_info=ns_info))
 
@@ -370,20 +413,17 @@ class STIXCIQIdentity3_0(stix.Entity):
             return_obj.append(self.party_name.to_obj(ns_info=ns_info))
 
         if self.addresses:
-            addresses_root = et.Element("{%s}Addresses" % XML_NS_XPIL)
-            return_obj.append(addresses_root)
+            addresses_root = et.SubElement(return_obj, _TAG_ADDRESSES)
             for address in self.addresses:
                 addresses_root.append(address.to_obj(ns_info=ns_info))
 
         if self.contact_numbers:
-            contact_numbers_root = et.Element("{%s}ContactNumbers" % XML_NS_XPIL)
-            return_obj.append(contact_numbers_root)
+            contact_numbers_root = et.SubElement(return_obj, _TAG_CONTACT_NUMBERS)
             for contact_number in self.contact_numbers:
                 contact_numbers_root.append(contact_number.to_obj(ns_info=ns_info))
 
         if self.electronic_address_identifiers:
-            eai_root = et.Element("{%s}ElectronicAddressIdentifiers" % XML_NS_XPIL)
-            return_obj.append(eai_root)
+            eai_root = et.SubElement(return_obj, _TAG_ELECTRONIC_ADDRESS_IDENTIFIERS)
             for eai in self.electronic_address_identifiers:
                 eai_root.append(eai.to_obj(ns_info=ns_info))
 
@@ -391,17 +431,15 @@ class STIXCIQIdentity3_0(stix.Entity):
             return_obj.append(self.organisation_info.to_obj(ns_info=ns_info))
 
         if self.languages:
-            languages_root = et.Element("{%s}Languages" % XML_NS_XPIL)
-            return_obj.append(languages_root)
+            languages_root = et.SubElement(return_obj, _TAG_LANGUAGES)
             for language in self.languages:
                 languages_root.append(language.to_obj(ns_info=ns_info))
 
         if self.nationalities:
-            nationalities_root = et.Element("{%s}Nationalities" % XML_NS_XPIL)
-            return_obj.append(nationalities_root)
+            nationalities_root = et.SubElement(return_obj, _TAG_NATIONALITIES)
             for country in self.nationalities:
                 country_obj = country.to_obj(ns_info=ns_info)
-                country_obj.tag = "{%s}Country" % XML_NS_XPIL
+                country_obj.tag = _TAG_NATIONALITY
                 nationalities_root.append(country_obj)
 
         return return_obj
@@ -513,16 +551,18 @@ class Address(stix.Entity):
         if not return_obj:
             return_obj = cls()
 
-        free_text_address = obj.findall("{%s}FreeTextAddress" % XML_NS_XAL)
-        if len(free_text_address) > 0:
+        children = _children_by_tag(obj)
+
+        free_text_address = children.get(_TAG_FREE_TEXT_ADDRESS)
+        if free_text_address:
             return_obj.free_text_address = FreeTextAddress.from_obj(free_text_address[0])
 
-        country = obj.findall("{%s}Country" % XML_NS_XAL)
-        if len(country) > 0:
+        country = children.get(_TAG_COUNTRY)
+        if country:
             return_obj.country = Country.from_obj(country[0])
 
-        administrative_area = obj.findall("{%s}AdministrativeArea" % XML_NS_XAL)
-        if len(administrative_area) > 0:
+        administrative_area = children.get(_TAG_ADMINISTRATIVE_AREA)
+        if administrative_area:
             return_obj.administrative_area = AdministrativeArea.from_obj(administrative_area[0])
 
         return return_obj
@@ -754,7 +794,7 @@ class NameElement(stix.Entity):
 
 class FreeTextAddress(stix.Entity):
     _namespace = XML_NS_XAL
-    XML_TAG = "{%s}FreeTextAddress" % XML_NS_XAL
+    XML_TAG = _TAG_FREE_TEXT_ADDRESS
 
     def __init__(self, address_lines=None):
         self.address_lines = address_lines
@@ -891,19 +931,21 @@ class PartyName(stix.Entity):
         if not return_obj:
             return_obj = cls()
 
-        name_lines = obj.findall(NameLine.XML_TAG)
+        children = _children_by_tag(obj)
+
+        name_lines = children.get(NameLine.XML_TAG)
         if name_lines:
             for name_line_obj in name_lines:
                 name_line = NameLine.from_obj(name_line_obj)
                 return_obj.add_name_line(name_line)
 
-        person_names = obj.findall(PersonName.XML_TAG)
+        person_names = children.get(PersonName.XML_TAG)
         if person_names:
             for person_name_obj in person_names:
                 person_name = PersonName.from_obj(person_name_obj)
                 return_obj.add_person_name(person_name)
 
-        org_names = obj.findall(OrganisationName.XML_TAG)
+        org_names = children.get(OrganisationName.XML_TAG)
         if org_names:
             for organisation_name_obj in org_names:
                 org_name = OrganisationName.from_obj(organisation_name_obj)
@@ -1174,13 +1216,15 @@ class OrganisationName(stix.Entity):
 
         return_obj.type_ = obj.attrib.get('{%s}Type' % XML_NS_XNL)
 
-        name_elements = obj.findall(OrganisationNameElement.XML_TAG)
+        children = _children_by_tag(obj)
+
+        name_elements = children.get(OrganisationNameElement.XML_TAG)
         if name_elements:
             for name_element_obj in name_elements:
                 name_element = OrganisationNameElement.from_obj(name_element_obj)
                 return_obj.add_organisation_name_element(name_element)
 
-        sub_division_names = obj.findall(SubDivisionName.XML_TAG)
+        sub_division_names = children.get(SubDivisionName.XML_TAG)
         if sub_division_names:
             for sub_division_name_obj in sub_division_names:
                 sub_division_name = SubDivisionName.from_obj(sub_division_name_obj)
@@ -1,14 +1,11 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
-# external
-from mixbox import fields
-
-
 # internal
 import stix
 from stix.bindings.extensions.malware import maec_4_1 as maec_instance_binding
 from stix.ttp.malware_instance import MalwareInstance
+from stix.utils.passthrough import RawXMLField
 
 
 @stix.register_extension
@@ -30,8 +27,17 @@ class MAECInstance(MalwareInstance):
     _namespace = "http://stix.mitre.org/extensions/Malware#MAEC4.1-1"
     _XSI_TYPE = "stix-maec:MAEC4.1InstanceType"
 
-    maec = fields.TypedField("MAEC", type_="maec.package.package.Package")
+    maec = RawXMLField(
+        "MAEC",
+        type_="maec.package.package.Package",
+        binding="maec.bindings.maec_package.PackageType"
+    )
 
     def __init__(self, maec=None):
         super(MAECInstance, self).__init__()
         self.maec = maec
+
+    def to_dict(self):
+        # Parse passthrough content, which has no dictionary representation.
+        self.maec
+        return super(MAECInstance, self).to_dict()
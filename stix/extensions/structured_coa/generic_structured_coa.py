@@ -46,7 +46,7 @@ class GenericStructuredCOA(_BaseStructuredCOA):
 
         """
         if self.descriptions is not None:
-            return next(iter(self.descriptions), None)
+            return self.descriptions.first
 
     @description.setter
     def description(self, value):
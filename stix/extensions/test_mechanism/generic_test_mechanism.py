@@ -42,7 +42,7 @@ class GenericTestMechanism(_BaseTestMechanism):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -4,12 +4,12 @@
 # external
 from lxml import etree
 import mixbox.xml
-from mixbox.fields import TypedField
 from mixbox.vendor.six import BytesIO, iteritems
 
 # internal
 import stix
 from stix.indicator.test_mechanism import _BaseTestMechanism
+from stix.utils.passthrough import RawXMLField, raw_value
 import stix.bindings.extensions.test_mechanism.open_ioc_2010 as open_ioc_tm_binding
 
 
@@ -22,7 +22,7 @@ class OpenIOCTestMechanism(_BaseTestMechanism):
     _XSI_TYPE = "stix-openioc:OpenIOC2010TestMechanismType"
     _TAG_IOC = "{%s}ioc" % _namespace
 
-    ioc = TypedField("ioc")
+    ioc = RawXMLField("ioc")
 
     def __init__(self, id_=None, idref=None):
         super(OpenIOCTestMechanism, self).__init__(id_=id_, idref=idref)
@@ -53,9 +53,15 @@ class OpenIOCTestMechanism(_BaseTestMechanism):
             raise ValueError(error)
 
     def _processed_ioc(self):
+        # Unparsed passthrough content is exported verbatim.
+        raw = raw_value(self, OpenIOCTestMechanism.ioc)
+
+        if raw is not None:
+            return raw
+
         if self.ioc is None:
             return None
-        
+
         tree = mixbox.xml.get_etree(self.ioc)
         root = mixbox.xml.get_etree_root(tree)
 
@@ -98,8 +104,11 @@ class OpenIOCTestMechanism(_BaseTestMechanism):
 
     def to_dict(self):
         d = super(OpenIOCTestMechanism, self).to_dict()
+        raw = raw_value(self, OpenIOCTestMechanism.ioc)
 
-        if self.ioc:
+        if raw is not None:
+            d['ioc'] = raw.data
+        elif self.ioc:
             d['ioc'] = etree.tostring(self._processed_ioc())
 
         return d
@@ -49,7 +49,7 @@ class AffectedAsset(stix.Entity):
             :class:`.StructuredText`
 
         """
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -65,7 +65,7 @@ class AffectedAsset(stix.Entity):
 
     @property
     def business_function_or_role(self):
-        return next(iter(self.business_functions_or_roles), None)
+        return self.business_functions_or_roles.first
 
     @business_function_or_role.setter
     def business_function_or_role(self, value):
@@ -58,7 +58,7 @@ class PropertyAffected(stix.Entity):
             :class:`.StructuredTextList`
 
         """
-        return next(iter(self.descriptions_of_effect), None)
+        return self.descriptions_of_effect.first
 
     @description_of_effect.setter
     def description_of_effect(self, value):
@@ -0,0 +1,372 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Bulk construction of Indicators from columns of IOC data.
+
+:class:`IndicatorColumns` holds equal-length columns of observable values
+and types, and optional titles, confidences and valid time windows. Every
+indicator built from it shares one timestamp, ids are generated in batches,
+and confidence terms are validated once per distinct term.
+
+:meth:`IndicatorColumns.write` streams the indicators to a
+:class:`.PackageWriter` or :class:`.JSONPackageWriter` without building an
+entity per row: a prototype indicator is serialized once for each
+combination of observable type, confidence and present columns, and the
+output for each row is produced by substituting its (escaped) values into
+that serialization.
+
+Example:
+    >>> from stix.core.writer import PackageWriter
+    >>> from stix.indicator.bulk import IndicatorColumns
+    >>> columns = IndicatorColumns(
+    ...     values=["10.0.0.1", "bad.example"],
+    ...     types=["ipv4", "domain"],
+    ...     confidences=["High", "Low"]
+    ... )
+    >>> with open("out.xml", "wb") as f, PackageWriter(f) as writer:
+    ...     columns.write(writer)
+
+"""
+
+# stdlib
+import binascii
+import datetime
+import json
+import os
+import re
+
+# external
+import dateutil.tz
+from cybox.common import DEFAULT_DELIM, Hash
+from cybox.core import Object, Observable
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+from cybox.utils import normalize_to_xml
+from mixbox import idgen
+from mixbox.binding_utils import quote_attrib, quote_xml
+from mixbox.vendor.six.moves import range, zip
+
+# internal
+from stix.common import Confidence
+from stix.common.vocabs import HighMediumLow
+from stix.core.writer import COLLECTIONS, JSONPackageWriter
+from stix.utils import dates
+
+# relative
+from .indicator import Indicator
+from .valid_time import ValidTime
+
+
+def _file_hash(type_):
+    def build(value):
+        properties = File()
+        properties.add_hash(Hash(value, type_))
+        return properties
+    return build
+
+
+def _file_name(value):
+    properties = File()
+    properties.file_name = value
+    return properties
+
+
+def _domain(value):
+    properties = DomainName()
+    properties.value = value
+    return properties
+
+
+#: Observable types and the functions which build their CybOX object
+#: properties from a value.
+TYPES = {
+    "ipv4": lambda x: Address(x, Address.CAT_IPV4),
+    "ipv6": lambda x: Address(x, Address.CAT_IPV6),
+    "email": lambda x: Address(x, Address.CAT_EMAIL),
+    "domain": _domain,
+    "url": lambda x: URI(x, URI.TYPE_URL),
+    "md5": _file_hash(Hash.TYPE_MD5),
+    "sha1": _file_hash(Hash.TYPE_SHA1),
+    "sha256": _file_hash(Hash.TYPE_SHA256),
+    "file_name": _file_name,
+}
+
+#: The number of rows whose ids are generated at a time.
+ID_BATCH_SIZE = 4096
+
+# Row fields substituted into serialized prototypes.
+_INDICATOR_ID, _OBSERVABLE_ID, _OBJECT_ID, _TITLE, _VALUE, _START, _END = range(7)
+
+_TOKEN = "bulktoken%dx"
+_TOKENS = re.compile(r'"?bulktoken(\d)x"?')
+
+# Serialized in place of the valid time columns, then replaced by tokens.
+_SENTINEL_START = datetime.datetime(1901, 2, 3, 4, 5, 6, tzinfo=dateutil.tz.tzutc())
+_SENTINEL_END = _SENTINEL_START + datetime.timedelta(seconds=1)
+
+_POSITION = [x[3] for x in COLLECTIONS].index(Indicator)
+
+_VARIANT = dict(zip("0123456789abcdef", "89ab89ab89ab89ab"))
+
+
+def _uuid4s(count):
+    """Returns a list of `count` random (version 4) UUID strings."""
+    digits = binascii.hexlify(os.urandom(16 * count)).decode("ascii")
+    uuids = []
+
+    for idx in range(0, 32 * count, 32):
+        x = digits[idx:idx + 32]
+        uuids.append("%s-%s-4%s-%s%s-%s" % (
+            x[:8], x[8:12], x[13:16], _VARIANT[x[16]], x[17:20], x[20:]
+        ))
+
+    return uuids
+
+
+class _Template(object):
+    """A serialized prototype indicator, split around its row fields."""
+
+    def __init__(self, text):
+        self.parts = []
+        self.fields = []
+        self.quoted = []
+        pos = 0
+
+        for match in _TOKENS.finditer(text):
+            self.parts.append(text[pos:match.start()])
+            self.fields.append(int(match.group(1)))
+            self.quoted.append(match.group(0).startswith('"'))
+            pos = match.end()
+
+        self.parts.append(text[pos:])
+
+    def render(self, row, escape, quote):
+        out = [self.parts[0]]
+
+        for field, quoted, part in zip(self.fields, self.quoted, self.parts[1:]):
+            value = row[field]
+            out.append(quote(value) if quoted else escape(value))
+            out.append(part)
+
+        return "".join(out)
+
+
+class IndicatorColumns(object):
+    """Columns of IOC data, one row per Indicator.
+
+    Each Indicator has one Observable, whose object is built from the row's
+    value and type (see :data:`TYPES`).
+
+    Args:
+        values: The observable values.
+        types: The observable types. Each must be a key of :data:`TYPES`.
+        titles: Optional Indicator titles.
+        confidences: Optional ``HighMediumLowVocab-1.0`` confidence terms.
+        valid_from: Optional valid time window start times, as
+            ``datetime`` objects or ISO8601 strings.
+        valid_until: Optional valid time window end times.
+        timestamp: The timestamp of every Indicator and Confidence. Default
+            is the current time.
+
+    Items of the optional columns may be ``None``.
+
+    Raises:
+        ValueError: If the columns differ in length, or contain an unknown
+            type or confidence term.
+
+    """
+    def __init__(self, values, types, titles=None, confidences=None,
+                 valid_from=None, valid_until=None, timestamp=None):
+        self.values = list(values)
+        self.types = list(types)
+        self.titles = self._column(titles)
+        self.confidences = self._column(confidences)
+        self.valid_from = self._column(valid_from)
+        self.valid_until = self._column(valid_until)
+        self.timestamp = dates.parse_value(timestamp) or dates.now()
+
+        self._validate()
+        self._templates = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def _column(self, column):
+        if column is None:
+            return [None] * len(self.values)
+
+        return list(column)
+
+    def _validate(self):
+        count = len(self.values)
+        columns = (self.types, self.titles, self.confidences, self.valid_from, self.valid_until)
+
+        if any(len(x) != count for x in columns):
+            raise ValueError("All columns must have the same length.")
+
+        unknown = set(self.types).difference(TYPES)
+
+        if unknown:
+            error = "Unknown observable types {0}. Expected one of {1}."
+            raise ValueError(error.format(sorted(unknown), sorted(TYPES)))
+
+        allowed = HighMediumLow._ALLOWED_VALUES
+        unknown = set(x for x in self.confidences if x is not None and x not in allowed)
+
+        if unknown:
+            error = "Unknown confidence terms {0}. Expected one of {1}."
+            raise ValueError(error.format(sorted(unknown), allowed))
+
+    def _ids(self):
+        """Yields ``(indicator id, observable id, object id)`` tuples."""
+        alias = idgen.get_id_namespace_prefix()
+        remaining = len(self)
+
+        while remaining > 0:
+            count = min(remaining, ID_BATCH_SIZE)
+            uuids = iter(_uuid4s(3 * count))
+            remaining -= count
+
+            for _ in range(count):
+                yield (
+                    "%s:indicator-%s" % (alias, next(uuids)),
+                    "%s:Observable-%s" % (alias, next(uuids)),
+                    next(uuids)
+                )
+
+    def _rows(self):
+        """Yields ``(type, confidence, row)`` tuples, where `row` is a list
+        of the row fields.
+
+        """
+        alias = idgen.get_id_namespace_prefix()
+        prefixes = {}
+
+        # Tabular data usually has few distinct valid times, so each is only
+        # parsed once.
+        times = {None: None}
+
+        def serialize(value):
+            if value not in times:
+                times[value] = dates.serialize_value(dates.parse_value(value))
+            return times[value]
+
+        columns = zip(
+            self._ids(), self.values, self.types, self.titles,
+            self.confidences, self.valid_from, self.valid_until
+        )
+
+        for ids, value, type_, title, confidence, start, end in columns:
+            prefix = prefixes.get(type_)
+
+            if prefix is None:
+                name = TYPES[type_]("").__class__.__name__
+                prefix = prefixes[type_] = "%s:%s-" % (alias, name)
+
+            row = [
+                ids[0], ids[1], prefix + ids[2], title, value,
+                serialize(start), serialize(end)
+            ]
+
+            yield type_, confidence, row
+
+    def _build(self, row, type_, confidence, start, end):
+        """Returns an Indicator for the row fields `row`. `start` and `end`
+        are the valid time window values.
+
+        """
+        indicator = Indicator(id_=row[_INDICATOR_ID], timestamp=self.timestamp)
+        indicator.title = row[_TITLE]
+
+        properties = TYPES[type_](row[_VALUE])
+        obj = Object(properties, id_=row[_OBJECT_ID])
+        indicator.observable = Observable(obj, id_=row[_OBSERVABLE_ID])
+
+        if confidence is not None:
+            indicator.confidence = Confidence(
+                value=HighMediumLow(confidence),
+                timestamp=self.timestamp
+            )
+
+        if start is not None or end is not None:
+            indicator.add_valid_time_position(ValidTime(start, end))
+
+        return indicator
+
+    def indicators(self):
+        """Yields an :class:`.Indicator` for each row."""
+        valid_times = zip(self.valid_from, self.valid_until)
+
+        for (type_, confidence, row), (start, end) in zip(self._rows(), valid_times):
+            yield self._build(row, type_, confidence, start, end)
+
+    def _template(self, writer, type_, confidence, row):
+        key = (
+            type(writer), type_, confidence,
+            tuple(row[x] is None for x in (_TITLE, _START, _END))
+        )
+
+        template = self._templates.get(key)
+
+        if template is not None:
+            return template
+
+        tokens = [_TOKEN % x for x in range(len(row))]
+
+        if row[_TITLE] is None:
+            tokens[_TITLE] = None
+
+        # The object id token replaces the whole id, including its prefix.
+        prototype = self._build(
+            tokens, type_, confidence,
+            None if row[_START] is None else _SENTINEL_START,
+            None if row[_END] is None else _SENTINEL_END
+        )
+
+        text = writer._render_component(prototype, COLLECTIONS[_POSITION])
+        text = text.replace(dates.serialize_value(_SENTINEL_START), tokens[_START])
+        text = text.replace(dates.serialize_value(_SENTINEL_END), tokens[_END])
+
+        template = self._templates[key] = _Template(text)
+        return template
+
+    def write(self, writer):
+        """Writes an Indicator for each row to `writer`, a
+        :class:`.PackageWriter` or :class:`.JSONPackageWriter`.
+
+        The output is the same as writing the :meth:`indicators` one at a
+        time.
+
+        Returns:
+            The number of Indicators written.
+
+        Raises:
+            ValueError: If `writer` writes XML and a value contains the
+                CybOX list delimiter (``##comma##``).
+
+        """
+        if isinstance(writer, JSONPackageWriter):
+            escape = quote = json.dumps
+            normalize = False
+        else:
+            escape, quote = quote_xml, quote_attrib
+            normalize = True
+
+        writer._enter_collection(_POSITION)
+        write = writer._write_rendered
+        count = 0
+
+        for type_, confidence, row in self._rows():
+            if normalize:
+                # As CybOX properties do when exported to XML.
+                row[_VALUE] = normalize_to_xml(row[_VALUE], DEFAULT_DELIM)
+
+            template = self._template(writer, type_, confidence, row)
+            write(template.render(row, escape, quote))
+            count += 1
+
+        writer.count += count
+        return count
@@ -0,0 +1,578 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Compiles the observable patterns of :class:`.Indicator` objects into lookup
+tables which can be matched against flat event dictionaries.
+
+Supported observable types are file hashes, IP addresses and networks,
+domain names, URLs and email addresses. Object property conditions are
+mapped onto lookup tables as follows:
+
+* ``Equals`` (or no condition): hash table lookup. IP addresses and CIDR
+  blocks are looked up by network prefix.
+* ``StartsWith`` and ``EndsWith``: hash table lookup per prefix/suffix
+  length.
+* ``Contains`` and ``FitsPattern``: checked against every event value of the
+  same type.
+* ``DoesNotEqual`` and ``DoesNotContain``: the negation of ``Equals`` and
+  ``Contains``.
+
+Other conditions and unsupported object types never match. Indicator and
+observable ``negate`` flags, ``Observable_Composition`` operators and
+``Composite_Indicator_Expression`` operators are honored.
+
+Events are dictionaries which map one of the ``TYPE_*`` keys to a string or
+a list of strings.
+
+Example:
+    >>> from stix.indicator.matching import IndicatorMatcher
+    >>> matcher = IndicatorMatcher()
+    >>> matcher.add_package(package)
+    >>> matcher.match({"ip": "198.51.100.7", "domain": "example.com"})
+    set(['example:indicator-1c4a...'])
+
+"""
+
+# stdlib
+import binascii
+import re
+import socket
+
+# external
+from mixbox.vendor.six import iteritems, string_types
+
+#: Event key for MD5, SHA1, SHA256, etc. file hash values.
+TYPE_HASH = "hash"
+
+#: Event key for IPv4 and IPv6 addresses.
+TYPE_IP = "ip"
+
+#: Event key for domain names.
+TYPE_DOMAIN = "domain"
+
+#: Event key for URLs.
+TYPE_URL = "url"
+
+#: Event key for email addresses.
+TYPE_EMAIL = "email"
+
+EVENT_TYPES = (TYPE_HASH, TYPE_IP, TYPE_DOMAIN, TYPE_URL, TYPE_EMAIL)
+
+# Types which are compared case-insensitively.
+_CASE_INSENSITIVE = (TYPE_HASH, TYPE_DOMAIN, TYPE_EMAIL)
+
+# Expression node kinds.
+_LEAF, _AND, _OR, _NOT, _FALSE = range(5)
+
+_NEVER = (_FALSE,)
+
+
+def _normalize(type_, value):
+    value = value.strip()
+
+    if type_ in _CASE_INSENSITIVE:
+        value = value.lower()
+
+    if type_ == TYPE_DOMAIN:
+        value = value.rstrip(".")
+
+    return value
+
+
+def _parse_ip(value):
+    """Returns a ``(bits, prefix length, integer address)`` tuple for the IP
+    address or CIDR block `value`, or ``None`` if `value` cannot be parsed.
+
+    """
+    address, _, prefix = value.strip().partition("/")
+
+    for family, bits in ((socket.AF_INET, 32), (socket.AF_INET6, 128)):
+        try:
+            packed = socket.inet_pton(family, address)
+        except (socket.error, ValueError):
+            continue
+
+        try:
+            length = int(prefix) if prefix else bits
+        except ValueError:
+            return None
+
+        if not 0 <= length <= bits:
+            return None
+
+        return bits, length, int(binascii.hexlify(packed), 16)
+
+    return None
+
+
+def _evaluate(expr, hits):
+    """Evaluates the compiled expression `expr` against the set of matching
+    leaf ids `hits`.
+
+    """
+    kind = expr[0]
+
+    if kind == _LEAF:
+        return expr[1] in hits
+    elif kind == _OR:
+        return any(_evaluate(x, hits) for x in expr[1])
+    elif kind == _AND:
+        return all(_evaluate(x, hits) for x in expr[1])
+    elif kind == _NOT:
+        return not _evaluate(expr[1], hits)
+
+    return False
+
+
+def _is_simple(expr):
+    """Returns ``True`` if `expr` is a leaf or a disjunction of leaves, in
+    which case any matching leaf means the expression matches.
+
+    """
+    if expr[0] == _LEAF:
+        return True
+
+    if expr[0] == _OR:
+        return all(_is_simple(x) for x in expr[1])
+
+    return False
+
+
+def _combine(kind, children):
+    children = [x for x in children if x is not None]
+
+    if not children:
+        return _NEVER
+
+    if len(children) == 1:
+        return children[0]
+
+    return (kind, children)
+
+
+def _negate(expr):
+    return (_NOT, expr)
+
+
+class IndicatorMatcher(object):
+    """Matches events against a compiled set of :class:`.Indicator` objects.
+
+    Indicators can be added (or replaced, when an indicator with the same
+    ``id_`` is added again) and removed at any time. Only the affected
+    indicators are recompiled.
+
+    Note:
+        Observable and indicator ``idref`` values are resolved when an
+        indicator is added, so referenced content should be added first.
+        :meth:`add_package` takes care of this for package content.
+
+    """
+
+    def __init__(self, indicators=None):
+        self._next_leaf = 0
+
+        # Lookup tables. See _register() for their layouts.
+        self._exact = {}
+        self._prefix = {}
+        self._suffix = {}
+        self._cidr = {}
+        self._scan = {}
+
+        self._leaves = {}       # leaf id => (table, keys) registrations
+        self._owners = {}       # leaf id => top-level indicator id
+        self._owned = {}        # indicator id => list of leaf ids
+        self._exprs = {}        # indicator id => compiled expression
+        self._simple = set()    # ids of indicators with simple expressions
+        self._always = set()    # ids of indicators that match on no hits
+
+        self._indicators = {}   # indicator id => Indicator
+        self._observables = {}  # observable id => Observable
+
+        for indicator in indicators or ():
+            self.add(indicator)
+
+    def __len__(self):
+        return len(self._exprs)
+
+    def __contains__(self, id_):
+        return id_ in self._exprs
+
+    def add_package(self, package):
+        """Compiles all the top-level indicators in the STIX `package`.
+
+        Top-level observables are registered first so that observable
+        ``idref`` values can be resolved.
+
+        """
+        for observable in package.observables or ():
+            self.add_observable(observable)
+
+        indicators = list(package.indicators or ())
+
+        for indicator in indicators:
+            if indicator.id_:
+                self._indicators[indicator.id_] = indicator
+
+        for indicator in indicators:
+            self.add(indicator)
+
+    def add_observable(self, observable):
+        """Registers `observable` so that observable ``idref`` values which
+        point to it can be resolved.
+
+        """
+        if observable.id_:
+            self._observables[observable.id_] = observable
+
+    def add(self, indicator):
+        """Compiles `indicator` and adds it to the lookup tables. Any
+        previously added indicator with the same ``id_`` is replaced.
+
+        Raises:
+            ValueError: If `indicator` has no ``id_``.
+
+        """
+        id_ = indicator.id_
+
+        if not id_:
+            raise ValueError("Indicators must have an id_ to be matched.")
+
+        if id_ in self._exprs:
+            self.remove(id_)
+
+        self._indicators[id_] = indicator
+        expr = self._compile_indicator(indicator, id_, set())
+        self._exprs[id_] = expr
+
+        if _is_simple(expr):
+            self._simple.add(id_)
+        elif _evaluate(expr, ()):
+            self._always.add(id_)
+
+    def remove(self, id_):
+        """Removes the indicator with the id `id_` from the lookup tables."""
+        if id_ not in self._exprs:
+            return
+
+        del self._exprs[id_]
+        self._simple.discard(id_)
+        self._always.discard(id_)
+        self._indicators.pop(id_, None)
+
+        for leaf in self._owned.pop(id_, ()):
+            self._unregister(leaf)
+            del self._owners[leaf]
+
+    def match(self, event):
+        """Returns the set of ids of the indicators which match `event`.
+
+        Args:
+            event: A dictionary mapping ``TYPE_*`` keys to a string value or
+                a list of string values. Unknown keys are ignored.
+
+        """
+        hits = self._hits(event)
+        owners = self._owners
+
+        candidates = set(owners[x] for x in hits)
+        candidates.update(self._always)
+
+        simple = self._simple
+        exprs = self._exprs
+
+        return set(
+            x for x in candidates
+            if x in simple or _evaluate(exprs[x], hits)
+        )
+
+    def match_batch(self, events):
+        """Returns a list containing the :meth:`match` result for each event
+        in the `events` iterable.
+
+        """
+        match = self.match
+        return [match(x) for x in events]
+
+    # Compilation.
+
+    def _compile_indicator(self, indicator, owner, seen):
+        if indicator.idref and not (indicator.observable or
+                                    indicator.composite_indicator_expression):
+            indicator = self._indicators.get(indicator.idref)
+
+            if indicator is None:
+                return _NEVER
+
+        if id(indicator) in seen:
+            return _NEVER
+
+        seen = seen | set([id(indicator)])
+        parts = []
+
+        if indicator.observable:
+            parts.append(self._compile_observable(indicator.observable, owner, set()))
+
+        composite = indicator.composite_indicator_expression
+
+        if composite:
+            kind = _AND if composite.operator == composite.OP_AND else _OR
+            children = [self._compile_indicator(x, owner, seen) for x in composite]
+            parts.append(_combine(kind, children))
+
+        expr = _combine(_AND, parts)
+
+        if indicator.negate:
+            expr = _negate(expr)
+
+        return expr
+
+    def _compile_observable(self, observable, owner, seen):
+        if observable.idref and not (observable.object_ or
+                                     observable.observable_composition):
+            if observable.idref in seen:
+                return _NEVER
+
+            seen = seen | set([observable.idref])
+            observable = self._observables.get(observable.idref)
+
+            if observable is None:
+                return _NEVER
+
+        composition = observable.observable_composition
+
+        if composition:
+            kind = _AND if composition.operator == "AND" else _OR
+            children = [
+                self._compile_observable(x, owner, seen)
+                for x in composition.observables
+            ]
+            expr = _combine(kind, children)
+        elif observable.object_ and observable.object_.properties:
+            expr = self._compile_properties(observable.object_.properties, owner)
+        else:
+            expr = _NEVER
+
+        # Objects without a value cannot match.
+        if expr is None:
+            expr = _NEVER
+
+        if observable.negate:
+            expr = _negate(expr)
+
+        return expr
+
+    def _compile_properties(self, props, owner):
+        from cybox.objects.address_object import Address
+        from cybox.objects.domain_name_object import DomainName
+        from cybox.objects.email_message_object import EmailMessage
+        from cybox.objects.file_object import File
+        from cybox.objects.uri_object import URI
+
+        if isinstance(props, File):
+            hashes = [x.simple_hash_value for x in props.hashes or ()]
+            exprs = [self._compile_property(TYPE_HASH, x, owner) for x in hashes]
+            return _combine(_OR, exprs)
+
+        if isinstance(props, Address):
+            category = props.category
+
+            if category == Address.CAT_EMAIL:
+                return self._compile_property(TYPE_EMAIL, props.address_value, owner)
+
+            if category in (None, Address.CAT_IPV4, Address.CAT_IPV6,
+                            Address.CAT_CIDR, Address.CAT_IPV4_NET,
+                            Address.CAT_IPV6_NET):
+                return self._compile_property(TYPE_IP, props.address_value, owner)
+
+            return _NEVER
+
+        if isinstance(props, DomainName):
+            return self._compile_property(TYPE_DOMAIN, props.value, owner)
+
+        if isinstance(props, URI):
+            if props.type_ == URI.TYPE_DOMAIN:
+                return self._compile_property(TYPE_DOMAIN, props.value, owner)
+
+            return self._compile_property(TYPE_URL, props.value, owner)
+
+        if isinstance(props, EmailMessage) and props.header:
+            header = props.header
+            addresses = [header.from_, header.sender, header.reply_to]
+
+            for recipients in (header.to, header.cc, header.bcc):
+                addresses.extend(recipients or ())
+
+            exprs = [
+                self._compile_property(TYPE_EMAIL, x.address_value, owner)
+                for x in addresses if x is not None
+            ]
+            return _combine(_OR, exprs)
+
+        return _NEVER
+
+    def _compile_property(self, type_, prop, owner):
+        """Compiles the cybox ``BaseProperty`` `prop` holding values of the
+        ``TYPE_*`` `type_`.
+
+        """
+        if prop is None:
+            return None
+
+        values = [x for x in prop.values if isinstance(x, string_types)]
+
+        if not values:
+            return None
+
+        condition = prop.condition or "Equals"
+        negated = condition in ("DoesNotEqual", "DoesNotContain")
+
+        if negated:
+            condition = condition[len("DoesNot"):]
+            condition = "Equals" if condition == "Equal" else condition
+
+        leaves = [self._compile_value(type_, condition, x, owner) for x in values]
+
+        apply_condition = prop.apply_condition or "ANY"
+
+        if apply_condition == "ALL":
+            expr = _combine(_AND, leaves)
+        elif apply_condition == "NONE":
+            expr = _negate(_combine(_OR, leaves))
+        else:
+            expr = _combine(_OR, leaves)
+
+        if negated:
+            expr = _negate(expr)
+
+        return expr
+
+    def _compile_value(self, type_, condition, value, owner):
+        value = _normalize(type_, value)
+
+        if type_ == TYPE_IP and condition == "Equals":
+            parsed = _parse_ip(value)
+
+            if parsed is None:
+                return _NEVER
+
+            bits, length, address = parsed
+            key = address >> (bits - length)
+            return self._leaf(owner, self._cidr, (bits, length, key))
+
+        if condition == "Equals":
+            return self._leaf(owner, self._exact, (type_, value))
+
+        if condition == "StartsWith":
+            return self._leaf(owner, self._prefix, (type_, len(value), value))
+
+        if condition == "EndsWith":
+            return self._leaf(owner, self._suffix, (type_, len(value), value))
+
+        if condition == "Contains":
+            test = lambda x: value in x
+        elif condition == "FitsPattern":
+            test = re.compile(value).search
+        else:
+            return _NEVER
+
+        return self._leaf(owner, self._scan, (type_,), test)
+
+    def _leaf(self, owner, table, keys, test=None):
+        leaf = self._next_leaf
+        self._next_leaf += 1
+
+        self._register(table, keys, leaf, test)
+        self._leaves[leaf] = (table, keys)
+        self._owners[leaf] = owner
+        self._owned.setdefault(owner, []).append(leaf)
+
+        return (_LEAF, leaf)
+
+    # Lookup tables.
+
+    def _register(self, table, keys, leaf, test=None):
+        """Adds `leaf` to the nested dictionary `table` under the `keys` path.
+
+        The innermost value is a set of leaf ids, or for the scan table, a
+        dictionary mapping leaf ids to test functions.
+
+        """
+        node = table
+
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+
+        if test is None:
+            node.setdefault(keys[-1], set()).add(leaf)
+        else:
+            node.setdefault(keys[-1], {})[leaf] = test
+
+    def _unregister(self, leaf):
+        table, keys = self._leaves.pop(leaf)
+
+        path = [table]
+        for key in keys[:-1]:
+            path.append(path[-1][key])
+
+        entries = path[-1][keys[-1]]
+
+        if isinstance(entries, dict):
+            del entries[leaf]
+        else:
+            entries.discard(leaf)
+
+        # Prune empty containers.
+        for node, key in reversed(list(zip(path, keys))):
+            if node[key]:
+                break
+            del node[key]
+
+    def _hits(self, event):
+        hits = set()
+
+        for type_, values in iteritems(event):
+            if values is None:
+                continue
+
+            if isinstance(values, string_types):
+                values = (values,)
+
+            for value in values:
+                value = _normalize(type_, value)
+
+                if type_ == TYPE_IP:
+                    self._hit_ip(value, hits)
+
+                exact = self._exact.get(type_, {}).get(value)
+                if exact:
+                    hits.update(exact)
+
+                for length, entries in iteritems(self._prefix.get(type_, {})):
+                    found = entries.get(value[:length])
+                    if found:
+                        hits.update(found)
+
+                for length, entries in iteritems(self._suffix.get(type_, {})):
+                    found = entries.get(value[-length:]) if length else None
+                    if found:
+                        hits.update(found)
+
+                for leaf, test in iteritems(self._scan.get(type_, {})):
+                    if test(value):
+                        hits.add(leaf)
+
+        return hits
+
+    def _hit_ip(self, value, hits):
+        parsed = _parse_ip(value)
+
+        if parsed is None:
+            return
+
+        bits, _, address = parsed
+
+        for length, entries in iteritems(self._cidr.get(bits, {})):
+            found = entries.get(address >> (bits - length))
+            if found:
+                hits.update(found)
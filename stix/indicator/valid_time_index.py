@@ -0,0 +1,294 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+An index over the ``Valid_Time_Position`` windows of :class:`.Indicator`
+objects, for finding the indicators which are valid at a point in time or
+during a time range.
+
+Windows are stored as integer epoch seconds in ``array`` objects sorted by
+start time, alongside the maximum end time of each fixed-size block of
+windows. A point or range query bisects the start times and then only visits
+blocks whose maximum end time reaches the query. A second ordering by end
+time answers "expiring soon" queries with two bisections.
+
+Windows without a start time are treated as starting at the beginning of
+time and windows without an end time as never ending. Indicators without any
+``Valid_Time_Position`` are not indexed.
+
+Example:
+    >>> from stix.indicator.valid_time_index import ValidTimeIndex
+    >>> index = ValidTimeIndex.from_package(package)
+    >>> index.at("2017-05-01T00:00:00Z")
+    set(['example:indicator-1c4a...'])
+
+"""
+
+# stdlib
+from array import array
+import bisect
+import calendar
+import datetime
+import numbers
+
+# external
+from mixbox.vendor.six import moves, string_types
+
+# internal
+from stix.utils import dates
+
+
+#: Number of windows summarized by each maximum end time entry.
+BLOCK_SIZE = 64
+
+_MIN = -(2 ** 63)
+_MAX = 2 ** 63 - 1
+
+
+def to_epoch(value):
+    """Converts `value` to integer seconds since the epoch.
+
+    Args:
+        value: A ``datetime.datetime``, ``datetime.date``,
+            :class:`.DateTimeWithPrecision`, timestamp string or number.
+            Naive timestamps are assumed to be UTC.
+
+    Returns:
+        An integer, or ``None`` if `value` is ``None``.
+
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, numbers.Number):
+        return int(value)
+
+    if hasattr(value, "precision"):
+        value = value.value
+
+    if isinstance(value, string_types):
+        value = dates.parse_value(value)
+
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.utctimetuple())
+
+    if isinstance(value, datetime.date):
+        return calendar.timegm(value.timetuple())
+
+    raise TypeError("Cannot convert {0} to a timestamp".format(type(value)))
+
+
+class ValidTimeIndex(object):
+    """An index of :class:`.Indicator` valid time windows.
+
+    New windows are buffered and merged into the sorted arrays once the
+    buffer grows past :attr:`merge_threshold` windows, so adding indicators
+    one at a time does not re-sort the index on every addition.
+
+    Args:
+        indicators: An optional iterable of :class:`.Indicator` objects to
+            index.
+
+    """
+    #: Minimum number of buffered windows that triggers a merge.
+    merge_threshold = 1024
+
+    def __init__(self, indicators=None):
+        self._starts = array('q')
+        self._ends = array('q')
+        self._ids = []
+        self._block_max = array('q')
+        self._end_order = array('q')    # window positions sorted by end
+        self._sorted_ends = array('q')  # ends in _end_order order
+
+        self._dead = set()      # positions of removed windows
+        self._positions = {}    # id => positions in the sorted arrays
+        self._pending = []      # (start, end, id) windows not yet merged
+
+        if indicators:
+            self.add_all(indicators)
+
+    @classmethod
+    def from_package(cls, package):
+        """Returns an index of the top-level indicators in `package`."""
+        return cls(package.indicators or ())
+
+    @classmethod
+    def from_arrays(cls, ids, starts, ends):
+        """Builds an index from parallel sequences of indicator ids and
+        window start and end epoch seconds.
+
+        ``None`` start or end values denote open-ended windows.
+
+        """
+        index = cls()
+        index._pending = [
+            (_MIN if s is None else s, _MAX if e is None else e, i)
+            for i, s, e in moves.zip(ids, starts, ends)
+        ]
+        index._merge()
+        return index
+
+    def __len__(self):
+        return len(self._ids) - len(self._dead) + len(self._pending)
+
+    @property
+    def ids(self):
+        """The set of indexed indicator ids."""
+        ids = set(x for x in self._positions if self._positions[x])
+        ids.update(x[2] for x in self._pending)
+        return ids
+
+    def add(self, indicator):
+        """Adds the valid time windows of `indicator` to the index."""
+        for window in indicator.valid_time_positions or ():
+            self.add_window(indicator.id_, window.start_time, window.end_time)
+
+    def add_all(self, indicators):
+        """Adds the valid time windows of each of the `indicators`."""
+        threshold = self.merge_threshold
+        self.merge_threshold = float("inf")
+
+        try:
+            for indicator in indicators:
+                self.add(indicator)
+        finally:
+            self.merge_threshold = threshold
+
+        self._merge()
+
+    def add_window(self, id_, start=None, end=None):
+        """Adds a window for the indicator `id_`.
+
+        Args:
+            id_: An indicator id.
+            start: The window start. See :func:`to_epoch`. ``None`` denotes
+                no start.
+            end: The window end. See :func:`to_epoch`. ``None`` denotes no
+                end.
+
+        """
+        start = to_epoch(start)
+        end = to_epoch(end)
+
+        start = _MIN if start is None else start
+        end = _MAX if end is None else end
+
+        self._pending.append((start, end, id_))
+
+        if len(self._pending) >= max(self.merge_threshold, len(self._ids) // 8):
+            self._merge()
+
+    def remove(self, id_):
+        """Removes all windows of the indicator `id_` from the index."""
+        self._dead.update(self._positions.pop(id_, ()))
+        self._pending = [x for x in self._pending if x[2] != id_]
+
+    def at(self, when):
+        """Returns the set of ids of indicators which are valid at `when`.
+
+        Args:
+            when: A timestamp. See :func:`to_epoch`.
+
+        """
+        t = to_epoch(when)
+        return self._overlapping(t, t)
+
+    def between(self, start, end):
+        """Returns the set of ids of indicators which are valid at any point
+        between `start` and `end` (inclusive).
+
+        """
+        return self._overlapping(to_epoch(start), to_epoch(end))
+
+    def expiring(self, when, within):
+        """Returns the set of ids of indicators which are valid at `when`
+        and whose window ends within `within` of `when`.
+
+        Args:
+            when: A timestamp. See :func:`to_epoch`.
+            within: A ``datetime.timedelta`` or number of seconds.
+
+        """
+        t = to_epoch(when)
+
+        if isinstance(within, datetime.timedelta):
+            within = within.days * 86400 + within.seconds
+
+        limit = t + int(within)
+
+        lo = bisect.bisect_left(self._sorted_ends, t)
+        hi = bisect.bisect_right(self._sorted_ends, limit)
+
+        dead = self._dead
+        starts = self._starts
+        result = set()
+
+        for pos in self._end_order[lo:hi]:
+            if starts[pos] <= t and pos not in dead:
+                result.add(self._ids[pos])
+
+        result.update(
+            i for s, e, i in self._pending if s <= t <= e <= limit
+        )
+        return result
+
+    def _overlapping(self, start, end):
+        """Returns the ids of windows which overlap ``[start, end]``."""
+        starts = self._starts
+        ends = self._ends
+        ids = self._ids
+        dead = self._dead
+
+        result = set()
+        count = bisect.bisect_right(starts, end)
+
+        for block, maximum in enumerate(self._block_max):
+            first = block * BLOCK_SIZE
+
+            if first >= count:
+                break
+
+            if maximum < start:
+                continue
+
+            for pos in moves.range(first, min(first + BLOCK_SIZE, count)):
+                if ends[pos] >= start and pos not in dead:
+                    result.add(ids[pos])
+
+        result.update(i for s, e, i in self._pending if s <= end and e >= start)
+        return result
+
+    def _merge(self):
+        """Merges the pending windows into the sorted arrays, dropping removed
+        windows.
+
+        """
+        live = [
+            (s, e, i) for pos, (s, e, i)
+            in enumerate(moves.zip(self._starts, self._ends, self._ids))
+            if pos not in self._dead
+        ]
+        live.extend(self._pending)
+        live.sort(key=lambda x: x[0])
+
+        self._starts = array('q', (x[0] for x in live))
+        self._ends = array('q', (x[1] for x in live))
+        self._ids = [x[2] for x in live]
+        self._pending = []
+        self._dead = set()
+
+        positions = {}
+        for pos, id_ in enumerate(self._ids):
+            positions.setdefault(id_, []).append(pos)
+        self._positions = positions
+
+        ends = self._ends
+        self._block_max = array('q', (
+            max(ends[x:x + BLOCK_SIZE])
+            for x in moves.range(0, len(ends), BLOCK_SIZE)
+        ))
+
+        order = sorted(moves.range(len(ends)), key=ends.__getitem__)
+        self._end_order = array('q', order)
+        self._sorted_ends = array('q', (ends[x] for x in order))
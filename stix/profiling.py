@@ -0,0 +1,366 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Opt-in instrumentation of parsing and serialization.
+
+While a :func:`collect` block is active, calls to
+``EntityParser.parse_xml``, ``Entity.from_obj``, ``Entity.to_obj`` and
+``Entity.to_xml`` are counted and timed per entity class. Outside of a
+:func:`collect` block nothing is instrumented, so there is no overhead when
+profiling is disabled.
+
+Example:
+    >>> import stix.profiling
+    >>> with stix.profiling.collect() as stats:
+    ...     package = STIXPackage.from_xml("feed.xml")
+    >>> print(stats.format(limit=5))
+    operation  type                 count    time (s)  self (s)  bytes
+    from_obj   Indicator            10000    3.2101    0.9012    0
+    ...
+
+"""
+
+# stdlib
+import contextlib
+import functools
+import os
+import threading
+import timeit
+
+# external
+from mixbox import entities
+from mixbox.vendor.six import iteritems, string_types, text_type
+
+# internal
+import stix
+from stix.utils import parser
+
+PARSE_XML = "parse_xml"
+FROM_OBJ = "from_obj"
+TO_OBJ = "to_obj"
+TO_XML = "to_xml"
+
+#: The operations which are recorded.
+OPERATIONS = (PARSE_XML, FROM_OBJ, TO_OBJ, TO_XML)
+
+_timer = timeit.default_timer
+
+# Active Stats objects, patched methods and the per-thread call stack.
+_collectors = []
+_patches = []
+_local = threading.local()
+
+# Held while collect() blocks are entered and exited, so that the methods
+# are installed and uninstalled once.
+_lock = threading.Lock()
+
+
+class TypeStats(object):
+    """The statistics recorded for one operation on one entity class.
+
+    Attributes:
+        count: The number of calls.
+        time: The cumulative time of the calls, in seconds, including
+            nested calls for other entities.
+        self_time: The cumulative time of the calls, in seconds, excluding
+            nested calls for other entities.
+        bytes: The cumulative number of bytes parsed or serialized. This is
+            only recorded for ``parse_xml`` and ``to_xml``. Documents
+            serialized to strings (``to_xml(encoding=None)``) are counted
+            as their UTF-8 encoded size.
+
+    """
+    __slots__ = ("count", "time", "self_time", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.self_time = 0.0
+        self.bytes = 0
+
+    def __repr__(self):
+        return "TypeStats(count=%d, time=%.6f, self_time=%.6f, bytes=%d)" % (
+            self.count, self.time, self.self_time, self.bytes
+        )
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "time": self.time,
+            "self_time": self.self_time,
+            "bytes": self.bytes,
+        }
+
+
+class Stats(object):
+    """Per-class statistics recorded by :func:`collect`.
+
+    Args:
+        callback: An optional function called for every recorded call with
+            the operation name, the entity class name, the elapsed time in
+            seconds and the number of bytes.
+
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._records = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(sorted(self._records))
+
+    def __str__(self):
+        return self.format()
+
+    def record(self, operation, name, elapsed, self_elapsed, nbytes=0):
+        """Records one call."""
+        key = (operation, name)
+        stats = self._records.get(key)
+
+        if stats is None:
+            stats = self._records[key] = TypeStats()
+
+        stats.count += 1
+        stats.time += elapsed
+        stats.self_time += self_elapsed
+        stats.bytes += nbytes
+
+        if self.callback:
+            self.callback(operation, name, elapsed, nbytes)
+
+    def get(self, operation, name):
+        """Returns the :class:`TypeStats` for `operation` on the entity class
+        named `name`, or ``None`` if no calls were recorded.
+
+        """
+        return self._records.get((operation, name))
+
+    def by_type(self, operation):
+        """Returns a dictionary of entity class names to :class:`TypeStats`
+        for `operation`.
+
+        """
+        return dict(
+            (name, stats) for (op, name), stats in iteritems(self._records)
+            if op == operation
+        )
+
+    def top(self, limit=10, key="self_time", operation=None):
+        """Returns a list of ``((operation, name), TypeStats)`` tuples for
+        the `limit` most expensive records, ordered by the :class:`TypeStats`
+        attribute `key`.
+
+        """
+        items = [
+            x for x in iteritems(self._records)
+            if operation is None or x[0][0] == operation
+        ]
+        items.sort(key=lambda x: getattr(x[1], key), reverse=True)
+        return items[:limit]
+
+    def to_dict(self):
+        """Returns the statistics as a ``{operation: {name: dict}}``
+        dictionary.
+
+        """
+        d = {}
+
+        for (operation, name), stats in iteritems(self._records):
+            d.setdefault(operation, {})[name] = stats.to_dict()
+
+        return d
+
+    def format(self, limit=None, key="self_time"):
+        """Returns the statistics as a text table, ordered by the
+        :class:`TypeStats` attribute `key`.
+
+        """
+        lines = ["%-10s %-32s %8s %10s %10s %12s" % (
+            "operation", "type", "count", "time (s)", "self (s)", "bytes"
+        )]
+
+        for (operation, name), stats in self.top(limit or len(self), key):
+            lines.append("%-10s %-32s %8d %10.4f %10.4f %12d" % (
+                operation, name, stats.count, stats.time, stats.self_time,
+                stats.bytes
+            ))
+
+        return "\n".join(lines)
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def _call(operation, target, name, func, args, kwargs, size=None):
+    """Calls `func` and records the call against the entity class `name`.
+    If `name` is ``None``, the class of the result is used.
+
+    Overridden ``from_obj`` and ``to_obj`` methods usually call the parent
+    implementation for the same `target` object, so calls made directly from
+    a call for the same operation and target are not recorded separately.
+
+    """
+    stack = _stack()
+    marker = (operation, id(target))
+
+    if stack and stack[-1][0] == marker:
+        return func(*args, **kwargs)
+
+    frame = [marker, 0.0]
+    stack.append(frame)
+    start = _timer()
+
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = _timer() - start
+        stack.pop()
+
+        if stack:
+            stack[-1][1] += elapsed
+
+    nbytes = size(args, result) if size else 0
+    name = name or type(result).__name__
+
+    # Other threads may enter or exit collect() blocks.
+    for stats in tuple(_collectors):
+        stats.record(operation, name, elapsed, elapsed - frame[1], nbytes)
+
+    return result
+
+
+def _input_size(args, result):
+    """Returns the number of bytes of the ``parse_xml`` input, or ``0`` if it
+    cannot be determined.
+
+    """
+    xml_file = args[1] if len(args) > 1 else None
+
+    try:
+        if isinstance(xml_file, string_types):
+            return os.path.getsize(xml_file)
+        if hasattr(xml_file, "getvalue"):
+            return len(xml_file.getvalue())
+        if hasattr(xml_file, "fileno"):
+            return os.fstat(xml_file.fileno()).st_size
+    except Exception:
+        pass
+
+    return 0
+
+
+def _output_size(args, result):
+    if isinstance(result, text_type):
+        result = result.encode("utf-8")
+
+    return len(result)
+
+
+def _wrap_method(operation, func, size=None):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        name = None if operation == PARSE_XML else type(self).__name__
+        return _call(operation, self, name, func, (self,) + args, kwargs, size)
+    return wrapper
+
+
+def _wrap_from_obj(func):
+    @functools.wraps(func)
+    def wrapper(cls, obj, *args, **kwargs):
+        # Key nested calls on the binding object, which parent
+        # implementations receive unchanged.
+        return _call(FROM_OBJ, obj, cls.__name__, func, (cls, obj) + args, kwargs)
+    return wrapper
+
+
+def _patch(klass, name, value):
+    # Inherited methods are restored by deleting the override.
+    _patches.append((klass, name, klass.__dict__.get(name)))
+    setattr(klass, name, value)
+
+
+def _entity_classes():
+    seen = set()
+    pending = [entities.Entity]
+
+    while pending:
+        klass = pending.pop()
+
+        if klass in seen:
+            continue
+
+        seen.add(klass)
+        pending.extend(klass.__subclasses__())
+
+    return seen
+
+
+def _install():
+    for klass in _entity_classes():
+        attrs = klass.__dict__
+
+        if isinstance(attrs.get("from_obj"), classmethod):
+            func = attrs["from_obj"].__func__
+            _patch(klass, "from_obj", classmethod(_wrap_from_obj(func)))
+
+        if callable(attrs.get("to_obj")):
+            _patch(klass, "to_obj", _wrap_method(TO_OBJ, attrs["to_obj"]))
+
+    _patch(stix.Entity, "to_xml",
+           _wrap_method(TO_XML, stix.Entity.__dict__["to_xml"], _output_size))
+
+    _patch(parser.EntityParser, "parse_xml",
+           _wrap_method(PARSE_XML, parser.EntityParser.parse_xml, _input_size))
+
+
+def _uninstall():
+    while _patches:
+        klass, name, original = _patches.pop()
+
+        if original is None:
+            delattr(klass, name)
+        else:
+            setattr(klass, name, original)
+
+
+@contextlib.contextmanager
+def collect(callback=None):
+    """Records parse and serialization statistics for the duration of the
+    ``with`` block.
+
+    Only entity classes which have been imported when the block is entered
+    are instrumented. :func:`collect` blocks may be nested; each records
+    every call made while it is active.
+
+    Args:
+        callback: An optional function called for every recorded call. See
+            :class:`Stats`.
+
+    Yields:
+        A :class:`Stats` object.
+
+    """
+    stats = Stats(callback)
+
+    with _lock:
+        if not _collectors:
+            _install()
+
+        _collectors.append(stats)
+
+    try:
+        yield stats
+    finally:
+        with _lock:
+            _collectors.remove(stats)
+
+            if not _collectors:
+                _uninstall()
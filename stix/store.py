@@ -0,0 +1,382 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+A persistent, indexed store of top-level STIX and CybOX components, backed
+by SQLite.
+
+Each top-level component of an ingested package is stored as a compressed
+JSON blob (the output of ``to_dict()``), alongside indexed columns for its
+id, type, timestamp and title, its controlled vocabulary values (e.g.,
+``indicator_types``), the kill chain phase ids it references and the
+``idref`` values it contains. Queries are answered from the indexes and
+components are only deserialized as query results are consumed.
+
+Example:
+    >>> from stix.store import Store
+    >>> with Store("stix.db") as store:
+    ...     store.ingest(packages)
+    ...     for indicator in store.query(type="Indicator",
+    ...                                  vocab=("indicator_types", "C2"),
+    ...                                  since="2017-01-01T00:00:00Z"):
+    ...         print(indicator.title)
+
+"""
+
+# stdlib
+import calendar
+import collections
+import datetime
+import importlib
+import json
+import sqlite3
+import zlib
+
+# external
+from mixbox.vendor.six import iteritems, itervalues, string_types
+
+# internal
+from stix.common.kill_chains import KillChainPhase
+from stix.common.vocabs import VocabString
+from stix.utils import dates, is_sequence, iterwalk
+
+
+#: Top-level ``STIXPackage`` collections which are stored.
+COLLECTIONS = (
+    "observables",
+    "indicators",
+    "ttps",
+    "exploit_targets",
+    "incidents",
+    "campaigns",
+    "threat_actors",
+    "courses_of_action",
+    "reports",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    class TEXT NOT NULL,
+    timestamp INTEGER,
+    title TEXT,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_type ON objects (type, timestamp);
+CREATE INDEX IF NOT EXISTS objects_timestamp ON objects (timestamp);
+
+CREATE TABLE IF NOT EXISTS vocabs (
+    id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vocabs_value ON vocabs (field, value);
+CREATE INDEX IF NOT EXISTS vocabs_id ON vocabs (id);
+
+CREATE TABLE IF NOT EXISTS phases (
+    id TEXT NOT NULL,
+    phase_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phases_phase_id ON phases (phase_id);
+CREATE INDEX IF NOT EXISTS phases_id ON phases (id);
+
+CREATE TABLE IF NOT EXISTS refs (
+    id TEXT NOT NULL,
+    idref TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_idref ON refs (idref);
+CREATE INDEX IF NOT EXISTS refs_id ON refs (id);
+"""
+
+_CLASSES = {}
+
+
+def _epoch(value):
+    """Converts the timestamp `value` to integer seconds since the epoch."""
+    if not value:
+        return None
+
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    value = dates.parse_value(value)
+
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.utctimetuple())
+
+    return calendar.timegm(value.timetuple())
+
+
+def _class_path(entity):
+    klass = type(entity)
+    return "%s.%s" % (klass.__module__, klass.__name__)
+
+
+def _load_class(path):
+    try:
+        return _CLASSES[path]
+    except KeyError:
+        pass
+
+    module, name = path.rsplit(".", 1)
+    klass = getattr(importlib.import_module(module), name)
+    _CLASSES[path] = klass
+    return klass
+
+
+def _encode(entity):
+    data = json.dumps(entity.to_dict(), separators=(",", ":"))
+    return sqlite3.Binary(zlib.compress(data.encode("utf-8")))
+
+
+def _decode(path, data):
+    d = json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+    return _load_class(path).from_dict(d)
+
+
+def _vocabs(entity):
+    """Yields ``(field, value)`` tuples for the controlled vocabulary fields
+    of `entity`.
+
+    """
+    for field, value in iteritems(entity._fields):
+        if isinstance(value, VocabString):
+            values = (value,)
+        elif is_sequence(value):
+            values = value
+        else:
+            continue
+
+        for item in values:
+            if isinstance(item, VocabString) and item.value:
+                yield field.key_name, item.value
+
+
+def _title(entity):
+    title = getattr(entity, "title", None)
+    return title if isinstance(title, string_types) else None
+
+
+def _rows(entity):
+    """Returns the ``objects``, ``vocabs``, ``phases`` and ``refs`` rows for
+    the top-level `entity`.
+
+    """
+    id_ = entity.id_
+    obj = (
+        id_,
+        type(entity).__name__,
+        _class_path(entity),
+        _epoch(getattr(entity, "timestamp", None)),
+        _title(entity),
+        _encode(entity),
+    )
+
+    vocabs = [(id_, f, v) for f, v in _vocabs(entity)]
+    phases = set()
+    refs = set()
+
+    for node in iterwalk(entity):
+        if isinstance(node, KillChainPhase) and node.phase_id:
+            phases.add((id_, node.phase_id))
+
+        idref = getattr(node, "idref", None)
+        if idref:
+            refs.add((id_, idref))
+
+    return obj, vocabs, phases, refs
+
+
+class Store(object):
+    """A SQLite-backed store of top-level STIX components.
+
+    A :class:`Store` can be used as a context manager, which closes the
+    database connection on exit.
+
+    Args:
+        path: The database filename. Default is an in-memory database.
+
+    """
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def __contains__(self, id_):
+        query = "SELECT 1 FROM objects WHERE id = ?"
+        return self._conn.execute(query, (id_,)).fetchone() is not None
+
+    def close(self):
+        """Closes the database connection."""
+        self._conn.close()
+
+    def ingest(self, packages):
+        """Stores the top-level components of each of the `packages` in a
+        single transaction.
+
+        Components with an id which is already stored replace the stored
+        component. Components without an id are not stored.
+
+        Args:
+            packages: A :class:`.STIXPackage` or an iterable of
+                :class:`.STIXPackage` objects.
+
+        Returns:
+            The number of components stored.
+
+        """
+        if hasattr(packages, "stix_header"):
+            packages = (packages,)
+
+        return self.add_all(
+            component
+            for package in packages
+            for name in COLLECTIONS
+            for component in (getattr(package, name, None) or ())
+        )
+
+    def add_all(self, entities):
+        """Stores each of the top-level `entities` in a single transaction.
+
+        If several of the `entities` have the same id (e.g., versions from
+        successive feeds), only the last of them is stored.
+
+        Returns:
+            The number of entities stored.
+
+        """
+        latest = collections.OrderedDict()
+
+        for entity in entities:
+            if entity.id_:
+                latest[entity.id_] = entity
+
+        objects, vocabs, phases, refs = [], [], [], []
+
+        for entity in itervalues(latest):
+            obj, v, p, r = _rows(entity)
+            objects.append(obj)
+            vocabs.extend(v)
+            phases.extend(p)
+            refs.extend(r)
+
+        ids = [(x[0],) for x in objects]
+
+        with self._conn:
+            cursor = self._conn.cursor()
+
+            for table in ("vocabs", "phases", "refs"):
+                cursor.executemany("DELETE FROM %s WHERE id = ?" % table, ids)
+
+            cursor.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)",
+                objects
+            )
+            cursor.executemany("INSERT INTO vocabs VALUES (?, ?, ?)", vocabs)
+            cursor.executemany("INSERT INTO phases VALUES (?, ?)", phases)
+            cursor.executemany("INSERT INTO refs VALUES (?, ?)", refs)
+
+        return len(objects)
+
+    def add(self, entity):
+        """Stores the top-level `entity`."""
+        self.add_all((entity,))
+
+    def remove(self, id_):
+        """Removes the component `id_` from the store."""
+        with self._conn:
+            for table in ("objects", "vocabs", "phases", "refs"):
+                self._conn.execute("DELETE FROM %s WHERE id = ?" % table, (id_,))
+
+    def get(self, id_):
+        """Returns the stored component `id_`, or ``None``."""
+        query = "SELECT class, data FROM objects WHERE id = ?"
+        row = self._conn.execute(query, (id_,)).fetchone()
+        return _decode(*row) if row else None
+
+    def _select(self, columns, type=None, since=None, until=None, title=None,
+                vocab=None, kill_chain_phase=None, references=None):
+        where, params = [], []
+
+        if type:
+            where.append("type = ?")
+            params.append(type)
+
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(_epoch(since))
+
+        if until is not None:
+            where.append("timestamp <= ?")
+            params.append(_epoch(until))
+
+        if title is not None:
+            where.append("title LIKE ?")
+            params.append(title)
+
+        if vocab:
+            where.append(
+                "id IN (SELECT id FROM vocabs WHERE field = ? AND value = ?)"
+            )
+            params.extend(vocab)
+
+        if kill_chain_phase:
+            where.append("id IN (SELECT id FROM phases WHERE phase_id = ?)")
+            params.append(kill_chain_phase)
+
+        if references:
+            where.append("id IN (SELECT id FROM refs WHERE idref = ?)")
+            params.append(references)
+
+        query = "SELECT %s FROM objects" % columns
+        if where:
+            query += " WHERE " + " AND ".join(where)
+
+        return self._conn.execute(query, params)
+
+    def query(self, **criteria):
+        """Returns a generator of the stored components which match all of
+        the `criteria`. Components are deserialized as the generator is
+        consumed.
+
+        Keyword Args:
+            type: A component class name (e.g., ``"Indicator"``).
+            since: Only return components with a ``timestamp`` at or after
+                this timestamp.
+            until: Only return components with a ``timestamp`` at or before
+                this timestamp.
+            title: An SQL ``LIKE`` pattern matched against the title.
+            vocab: A ``(field, value)`` tuple, where ``field`` is the
+                ``to_dict()`` key of a vocabulary field (e.g.,
+                ``("indicator_types", "C2")``).
+            kill_chain_phase: A kill chain phase id.
+            references: Only return components which contain this
+                ``idref``.
+
+        """
+        for path, data in self._select("class, data", **criteria):
+            yield _decode(path, data)
+
+    def ids(self, **criteria):
+        """Returns a list of the ids of stored components which match the
+        `criteria`. See :meth:`query`.
+
+        """
+        return [row[0] for row in self._select("id", **criteria)]
+
+    def count(self, **criteria):
+        """Returns the number of stored components which match the
+        `criteria`. See :meth:`query`.
+
+        """
+        return self._select("COUNT(*)", **criteria).fetchone()[0]
@@ -0,0 +1,81 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import sys
+import unittest
+
+from stix.test.utils.pull_test import _package, pull_present
+
+
+class _Reader(object):
+    """A minimal asyncio.StreamReader stand-in."""
+
+    def __init__(self, data, loop):
+        self.data = data
+        self.loop = loop
+        self.reads = 0
+
+    def read(self, n):
+        self.reads += 1
+        future = self.loop.create_future()
+        future.set_result(self.data[:n])
+        self.data = self.data[n:]
+        return future
+
+
+@unittest.skipIf(sys.version_info >= (3, 6), "stix.aio is supported")
+class UnsupportedTests(unittest.TestCase):
+
+    def test_import(self):
+        with self.assertRaises(ImportError):
+            import stix.aio  # noqa
+
+
+@unittest.skipIf(sys.version_info < (3, 6), "stix.aio requires Python 3.6+")
+@unittest.skipIf(condition=pull_present is False, reason="These tests require lxml 3.3 or later.")
+class IterEntitiesTests(unittest.TestCase):
+
+    def setUp(self):
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.package = _package()
+        self.xml = self.package.to_xml()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _collect(self, agen):
+        entities = []
+
+        while True:
+            try:
+                entities.append(self.loop.run_until_complete(agen.__anext__()))
+            except StopAsyncIteration:  # noqa
+                return entities
+
+    def test_stream(self):
+        import stix.aio
+
+        reader = _Reader(self.xml, self.loop)
+        entities = self._collect(stix.aio.iter_entities(reader, chunk_size=256))
+
+        self.assertEqual(len(entities), 12)
+        self.assertEqual(entities[1].id_, self.package.indicators[0].id_)
+        self.assertTrue(reader.reads > 1)
+
+    def test_first_entity(self):
+        import stix.aio
+
+        reader = _Reader(self.xml, self.loop)
+        agen = stix.aio.iter_entities(reader, chunk_size=256)
+        self.loop.run_until_complete(agen.__anext__())
+
+        # The first component is returned before the document is read.
+        self.assertTrue(reader.data)
+        self.loop.run_until_complete(agen.aclose())
+
+
+if __name__ == "__main__":
+    unittest.main()
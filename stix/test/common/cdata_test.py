@@ -1,8 +1,11 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+import random
 import unittest
 
+import lxml.etree
+
 from stix import utils
 from stix.test import EntityTestCase
 from stix.common import EncodedCDATA
@@ -35,6 +38,58 @@ class CDATATests(unittest.TestCase):
         stripped = utils.strip_cdata(multi)
         self.assertEqual(stripped, initial*2)
 
+    def test_unescape(self):
+        text = "<![CDATA[a &amp; b]]> &lt;c&gt; &amp; &quot;d&apos;"
+        self.assertEqual(utils.strip_cdata(text), "a &amp; b <c> & \"d'")
+
+    def test_parser_fallback(self):
+        text = "<![CDATA[x]]>&#65;&#x42;\r\ny"
+        self.assertEqual(utils.strip_cdata(text), "xAB\ny")
+
+        for text in ("<![CDATA[x]]>&nbsp;", "<![CDATA[x]]>]]>", "<![CDATA[x"):
+            self.assertRaises(lxml.etree.XMLSyntaxError, utils.strip_cdata, text)
+
+    def test_same_as_parser(self):
+        pieces = [
+            "<![CDATA[", "]]>", "a", " ", "&amp;", "&lt;", "&gt;", "&quot;",
+            "&apos;", "&#65;", "&", "<", ">", "<b/>", "\n", "\r", "]", "\u00e9"
+        ]
+        rng = random.Random(0)
+
+        for _ in range(2000):
+            text = "<![CDATA[" + "".join(rng.choice(pieces) for _ in range(8))
+
+            try:
+                expected = utils._parse_cdata(text)
+            except lxml.etree.XMLSyntaxError:
+                self.assertRaises(lxml.etree.XMLSyntaxError, utils.strip_cdata, text)
+                continue
+
+            self.assertEqual(utils.strip_cdata(text), expected, repr(text))
+
+    def test_many(self):
+        texts = [
+            None, "plain", "<![CDATA[a]]>", "<![CDATA[a]]>&#65;",
+            "<![CDATA[]]>", ""
+        ]
+        expected = [utils.strip_cdata(x) for x in texts]
+
+        self.assertEqual(utils.strip_cdata_many(texts), expected)
+        self.assertEqual(utils.cdata_many(texts), [utils.cdata(x) for x in texts])
+
+    def test_many_error(self):
+        texts = ["<![CDATA[a]]>&#65;", "<![CDATA[a]]>&nbsp;"]
+        self.assertRaises(lxml.etree.XMLSyntaxError, utils.strip_cdata_many, texts)
+
+        # Items which are malformed on their own but well-formed together.
+        texts = ["<![CDATA[a]]></e><e>", "<![CDATA[b]]><e>", "<![CDATA[c]]></e>"]
+        self.assertRaises(lxml.etree.XMLSyntaxError, utils.strip_cdata_many, texts)
+
+    def test_illegal_characters(self):
+        for char in (u"\x01", u"\ufffe", u"\ud800"):
+            text = u"<![CDATA[a" + char + u"b]]>"
+            self.assertRaises(lxml.etree.XMLSyntaxError, utils.strip_cdata, text)
+
 
 class EncodedCDATATests(EntityTestCase, unittest.TestCase):
     klass = EncodedCDATA
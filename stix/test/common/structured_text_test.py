@@ -174,6 +174,63 @@ class StructuredTextListTests(unittest.TestCase, TypedListTestCase):
 
         self.assertEqual(len(slist), 1)
 
+    def test_ordinality_changed(self):
+        slist = common.StructuredTextList()
+        st1 = common.StructuredText("foo", ordinality=1)
+        st2 = common.StructuredText("bar", ordinality=2)
+
+        slist.add(st1)
+        slist.add(st2)
+        self.assertEqual(list(slist), [st1, st2])
+
+        # Changing an ordinality outside of the list reorders it.
+        st1.ordinality = 3
+        self.assertEqual(list(slist), [st2, st1])
+        self.assertEqual(slist[3], st1)
+        self.assertRaises(KeyError, slist.__getitem__, 1)
+        self.assertEqual(slist.next_ordinality, 4)
+
+    def test_unrelated_ordinality_changed(self):
+        slist = common.StructuredTextList(["foo", "bar"])
+        common.StructuredText("baz", ordinality=1)
+
+        self.assertEqual(slist.ordinalities, (1, 2))
+        self.assertEqual([x.value for x in reversed(slist)], ["bar", "foo"])
+
+    def test_first(self):
+        slist = common.StructuredTextList()
+        self.assertEqual(None, slist.first)
+
+        st3 = common.StructuredText("baz", ordinality=3)
+        st2 = common.StructuredText("bar", ordinality=2)
+        slist.add(st3)
+        slist.add(st2)
+        self.assertEqual(st2, slist.first)
+
+        st3.ordinality = 1
+        self.assertEqual(st3, slist.first)
+
+    def test_description(self):
+        from stix.indicator import Indicator
+
+        indicator = Indicator()
+        indicator.add_description(common.StructuredText("second", ordinality=2))
+        indicator.add_description(common.StructuredText("first", ordinality=1))
+        indicator.add_short_description("short")
+
+        self.assertEqual("first", indicator.description.value)
+        self.assertEqual("short", indicator.short_description.value)
+        self.assertEqual(None, Indicator().description)
+
+    def test_add_while_iterating(self):
+        slist = common.StructuredTextList(["foo", "bar"])
+
+        # Items added during iteration are not visited.
+        for text in slist:
+            slist.add(text.value + "!")
+
+        self.assertEqual([x.value for x in slist], ["foo", "bar", "foo!", "bar!"])
+
 
 if __name__ == "__main__":
     unittest.main()
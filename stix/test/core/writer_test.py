@@ -0,0 +1,80 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import json
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage, STIXHeader, PackageWriter, JSONPackageWriter
+from stix.common import InformationSource
+from stix.indicator import Indicator
+from stix.ttp import TTP
+
+
+class PackageWriterTests(unittest.TestCase):
+    writer_class = PackageWriter
+
+    def setUp(self):
+        header = STIXHeader()
+        header.information_source = InformationSource(description="Writer test")
+
+        self.package = STIXPackage(stix_header=header)
+        self.observable = Observable(Address("192.0.2.1"))
+        self.indicators = [Indicator(title="Indicator %d" % x) for x in range(3)]
+        self.ttp = TTP(title="TTP")
+
+    def _write(self, components, package=None):
+        f = BytesIO()
+
+        with self.writer_class(f, package or self.package) as writer:
+            writer.write_all(components)
+
+        self.assertEqual(writer.count, len(components))
+        return self._read(f.getvalue())
+
+    def _read(self, data):
+        return STIXPackage.from_xml(BytesIO(data))
+
+    def test_roundtrip(self):
+        components = [self.observable] + self.indicators + [self.ttp]
+        package = self._write(components)
+
+        self.assertEqual(package.id_, self.package.id_)
+        self.assertEqual(package.stix_header.information_source.description.value, "Writer test")
+        self.assertEqual([x.id_ for x in package.observables], [self.observable.id_])
+        self.assertEqual([x.id_ for x in package.indicators], [x.id_ for x in self.indicators])
+        self.assertEqual([x.title for x in package.indicators], [x.title for x in self.indicators])
+        self.assertEqual([x.id_ for x in package.ttps], [self.ttp.id_])
+
+    def test_empty(self):
+        package = self._write([], STIXPackage())
+        self.assertFalse(package.indicators)
+
+    def test_order(self):
+        f = BytesIO()
+        writer = self.writer_class(f, self.package)
+        writer.write(self.ttp)
+        self.assertRaises(ValueError, writer.write, self.indicators[0])
+
+    def test_closed(self):
+        writer = self.writer_class(BytesIO(), self.package)
+        writer.close()
+        self.assertRaises(ValueError, writer.write, self.ttp)
+
+    def test_invalid_type(self):
+        writer = self.writer_class(BytesIO(), self.package)
+        self.assertRaises(TypeError, writer.write, self.package)
+
+
+class JSONPackageWriterTests(PackageWriterTests):
+    writer_class = JSONPackageWriter
+
+    def _read(self, data):
+        return STIXPackage.from_dict(json.loads(data.decode("utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
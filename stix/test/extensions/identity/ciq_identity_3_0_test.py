@@ -2,6 +2,8 @@
 # See LICENSE.txt for complete terms.
 
 import unittest
+
+import lxml.etree
 from mixbox.vendor.six import BytesIO, text_type
 
 from stix.threat_actor import ThreatActor
@@ -121,6 +123,45 @@ class CIQIdentity3_0InstanceTests(EntityTestCase, unittest.TestCase):
     }
 
 
+class STIXCIQIdentity3_0FromObjTests(unittest.TestCase):
+    XML = """
+    <stix-ciqidentity:Specification
+        xmlns:stix-ciqidentity="http://stix.mitre.org/extensions/Identity#CIQIdentity3.0-1"
+        xmlns:xpil="urn:oasis:names:tc:ciq:xpil:3"
+        xmlns:xnl="urn:oasis:names:tc:ciq:xnl:3"
+        xmlns:xal="urn:oasis:names:tc:ciq:xal:3">
+      <xpil:PartyName>
+        <xnl:NameLine>First</xnl:NameLine>
+        <xnl:OrganisationName>
+          <xnl:NameElement>Org</xnl:NameElement>
+        </xnl:OrganisationName>
+        <xnl:NameLine>Second</xnl:NameLine>
+      </xpil:PartyName>
+      <!-- comment -->
+      <xpil:Addresses>
+        <xpil:Address>
+          <xal:Country><xal:NameElement>USA</xal:NameElement></xal:Country>
+          <xal:Country><xal:NameElement>Ignored</xal:NameElement></xal:Country>
+        </xpil:Address>
+      </xpil:Addresses>
+      <xpil:FreeTextLines>
+        <xpil:FreeTextLine>Line</xpil:FreeTextLine>
+      </xpil:FreeTextLines>
+    </stix-ciqidentity:Specification>
+    """
+
+    def test_from_obj(self):
+        obj = lxml.etree.fromstring(self.XML)
+        spec = ciq.STIXCIQIdentity3_0.from_obj(obj)
+
+        name_lines = [x.value for x in spec.party_name.name_lines]
+        self.assertEqual(name_lines, ["First", "Second"])
+        self.assertEqual(len(spec.party_name.organisation_names), 1)
+        self.assertEqual(spec.addresses[0].country.name_elements[0].value, "USA")
+        self.assertEqual(spec.free_text_lines[0].value, "Line")
+        self.assertEqual(spec.languages, [])
+
+
 class IdentityInThreatActorTests(EntityTestCase, unittest.TestCase):
     klass = ThreatActor
     _full_dict = {
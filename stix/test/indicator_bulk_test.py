@@ -0,0 +1,96 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import re
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage
+from stix.core.writer import JSONPackageWriter, PackageWriter
+from stix.indicator.bulk import IndicatorColumns
+
+_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}")
+
+
+def _columns():
+    return IndicatorColumns(
+        values=["10.0.0.1", "bad.example", "http://x/?a=1&b=<2>",
+                "d41d8cd98f00b204e9800998ecf8427e", "evil \"quoted\".exe"],
+        types=["ipv4", "domain", "url", "md5", "file_name"],
+        titles=["C2 & friends", None, "URL", None, "Dropper"],
+        confidences=["High", None, "Low", "Medium", None],
+        valid_from=["2017-01-01T00:00:00Z", None, "2017-02-01T00:00:00Z", None, None],
+        valid_until=[None, None, "2017-03-01T00:00:00Z", "2017-04-01T00:00:00Z", None],
+        timestamp="2017-06-01T00:00:00Z"
+    )
+
+
+class IndicatorColumnsTests(unittest.TestCase):
+
+    def _write(self, writer_class, write):
+        f = BytesIO()
+
+        with writer_class(f) as writer:
+            write(writer)
+
+        return f.getvalue()
+
+    def _assert_same(self, writer_class, parse):
+        columns = _columns()
+
+        def write_all(writer):
+            for indicator in columns.indicators():
+                writer.write(indicator)
+
+        fast = parse(BytesIO(self._write(writer_class, columns.write)))
+        slow = parse(BytesIO(self._write(writer_class, write_all)))
+
+        # Ids are random, so compare with them masked.
+        normalize = lambda x: _UUID.sub("", repr(x.to_dict()))
+        self.assertEqual(5, len(fast.indicators))
+        self.assertEqual(normalize(slow), normalize(fast))
+
+    def test_write_xml(self):
+        self._assert_same(PackageWriter, STIXPackage.from_xml)
+
+    def test_write_json(self):
+        self._assert_same(JSONPackageWriter, STIXPackage.from_json)
+
+    def test_indicators(self):
+        indicators = list(_columns().indicators())
+        ipv4, domain, url = indicators[:3]
+
+        self.assertEqual("10.0.0.1", ipv4.observable.object_.properties.address_value.value)
+        self.assertEqual("High", ipv4.confidence.value.value)
+        self.assertEqual(ipv4.timestamp, domain.timestamp)
+        self.assertEqual(None, domain.title)
+        self.assertEqual(None, domain.confidence)
+        self.assertEqual("2017-02-01", url.valid_time_positions[0].start_time.value.date().isoformat())
+        self.assertEqual(5, len(set(x.id_ for x in indicators)))
+
+    def test_write_count(self):
+        f = BytesIO()
+
+        with PackageWriter(f) as writer:
+            self.assertEqual(5, _columns().write(writer))
+            self.assertEqual(5, writer.count)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, IndicatorColumns, ["a"], ["ipv4", "ipv4"])
+        self.assertRaises(ValueError, IndicatorColumns, ["a"], ["mutex"])
+        self.assertRaises(ValueError, IndicatorColumns, ["a"], ["ipv4"], confidences=["Very High"])
+
+    def test_delimiter(self):
+        columns = IndicatorColumns(["a##comma##b"], ["domain"])
+
+        def write_all(writer):
+            writer.write_all(columns.indicators())
+
+        # Raised by CybOX when the entity is exported.
+        self.assertRaises(ValueError, self._write, PackageWriter, write_all)
+        self.assertRaises(ValueError, self._write, PackageWriter, columns.write)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.common import Hash
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator, CompositeIndicatorExpression
+from stix.indicator.matching import IndicatorMatcher
+
+
+def _indicator(*objects, **kwargs):
+    indicator = Indicator()
+
+    for obj in objects:
+        indicator.add_observable(obj)
+
+    indicator.observable_composition_operator = kwargs.get("operator", "OR")
+    indicator.negate = kwargs.get("negate")
+    return indicator
+
+
+def _address(value, category=Address.CAT_IPV4):
+    return Address(address_value=value, category=category)
+
+
+def _domain(value, condition=None):
+    domain = DomainName()
+    domain.value = value
+    domain.value.condition = condition
+    return domain
+
+
+def _file(hash_value):
+    f = File()
+    f.add_hash(Hash(hash_value))
+    return f
+
+
+class IndicatorMatcherTests(unittest.TestCase):
+    MD5 = "d41d8cd98f00b204e9800998ecf8427e"
+
+    def test_hash(self):
+        indicator = _indicator(_file(self.MD5))
+        matcher = IndicatorMatcher([indicator])
+
+        self.assertEqual(set([indicator.id_]), matcher.match({"hash": self.MD5.upper()}))
+        self.assertEqual(set(), matcher.match({"hash": "00" * 16}))
+
+    def test_cidr(self):
+        indicator = _indicator(_address("10.1.0.0/16", Address.CAT_CIDR))
+        single = _indicator(_address("2001:db8::1", Address.CAT_IPV6))
+        matcher = IndicatorMatcher([indicator, single])
+
+        self.assertEqual(set([indicator.id_]), matcher.match({"ip": "10.1.200.3"}))
+        self.assertEqual(set(), matcher.match({"ip": "10.2.0.1"}))
+        self.assertEqual(set([single.id_]), matcher.match({"ip": "2001:db8:0::1"}))
+        self.assertEqual(set(), matcher.match({"ip": "not an address"}))
+
+    def test_conditions(self):
+        suffix = _indicator(_domain(".example.com", "EndsWith"))
+        prefix = _indicator(_domain("mail.", "StartsWith"))
+        contains = _indicator(_domain("evil", "Contains"))
+        matcher = IndicatorMatcher([suffix, prefix, contains])
+
+        self.assertEqual(
+            set([suffix.id_, prefix.id_]),
+            matcher.match({"domain": "mail.Example.com."})
+        )
+        self.assertEqual(set([contains.id_]), matcher.match({"domain": "evil.org"}))
+
+    def test_composition(self):
+        both = _indicator(_address("192.0.2.1"), _domain("example.com"), operator="AND")
+        negated = _indicator(_domain("example.com"), negate=True)
+        matcher = IndicatorMatcher([both, negated])
+
+        event = {"ip": "192.0.2.1", "domain": "example.com"}
+        self.assertEqual(set([both.id_]), matcher.match(event))
+        self.assertEqual(set(), matcher.match({"domain": "example.com"}))
+        self.assertEqual(set([negated.id_]), matcher.match({"ip": "192.0.2.1"}))
+
+    def test_negated_observable(self):
+        observable = Observable(_domain("example.com"))
+        observable.negate = True
+        indicator = _indicator(observable, _address("192.0.2.1"), operator="AND")
+        matcher = IndicatorMatcher([indicator])
+
+        self.assertEqual(set([indicator.id_]), matcher.match({"ip": "192.0.2.1"}))
+        self.assertEqual(set(), matcher.match({"ip": "192.0.2.1", "domain": "example.com"}))
+
+    def test_negated_empty_observable(self):
+        observable = Observable(Address(category=Address.CAT_IPV4))
+        observable.negate = True
+        indicator = _indicator(observable)
+        matcher = IndicatorMatcher([indicator])
+
+        # An object without a value never matches, so its negation always
+        # does.
+        self.assertEqual(set([indicator.id_]), matcher.match({}))
+        self.assertEqual(set([indicator.id_]), matcher.match({"ip": "192.0.2.1"}))
+
+    def test_composite_indicator_expression(self):
+        first = _indicator(_address("192.0.2.1"))
+        second = _indicator(_domain("example.com"))
+
+        composite = Indicator()
+        composite.composite_indicator_expression = CompositeIndicatorExpression(
+            CompositeIndicatorExpression.OP_AND, Indicator(idref=first.id_), second
+        )
+
+        package = STIXPackage()
+        for x in (first, composite):
+            package.add(x)
+
+        matcher = IndicatorMatcher()
+        matcher.add_package(package)
+
+        self.assertEqual(
+            set([first.id_, composite.id_]),
+            matcher.match({"ip": ["192.0.2.1"], "domain": "example.com"})
+        )
+        self.assertEqual(set([first.id_]), matcher.match({"ip": "192.0.2.1"}))
+
+    def test_observable_idref(self):
+        observable = Observable(_address("192.0.2.1"))
+        indicator = Indicator()
+        indicator.observable = Observable(idref=observable.id_)
+
+        package = STIXPackage()
+        package.add(observable)
+        package.add(indicator)
+
+        matcher = IndicatorMatcher()
+        matcher.add_package(package)
+        self.assertEqual(set([indicator.id_]), matcher.match({"ip": "192.0.2.1"}))
+
+    def test_url(self):
+        url = URI("http://example.com/a", URI.TYPE_URL)
+        indicator = _indicator(url)
+        matcher = IndicatorMatcher([indicator])
+
+        self.assertEqual([set([indicator.id_]), set()], matcher.match_batch([
+            {"url": "http://example.com/a"},
+            {"url": "http://example.com/A"},
+        ]))
+
+    def test_incremental(self):
+        indicator = _indicator(_address("192.0.2.1"))
+        matcher = IndicatorMatcher([indicator])
+
+        replacement = _indicator(_address("192.0.2.2"))
+        replacement.id_ = indicator.id_
+        matcher.add(replacement)
+
+        self.assertEqual(1, len(matcher))
+        self.assertEqual(set(), matcher.match({"ip": "192.0.2.1"}))
+        self.assertEqual(set([indicator.id_]), matcher.match({"ip": "192.0.2.2"}))
+
+        matcher.remove(indicator.id_)
+        self.assertEqual(0, len(matcher))
+        self.assertEqual(set(), matcher.match({"ip": "192.0.2.2"}))
+        self.assertEqual({}, matcher._cidr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import datetime
+import unittest
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator, ValidTime
+from stix.indicator.valid_time_index import ValidTimeIndex, to_epoch
+
+
+def _indicator(*windows):
+    indicator = Indicator()
+
+    for start, end in windows:
+        indicator.add_valid_time_position(ValidTime(start, end))
+
+    return indicator
+
+
+class ValidTimeIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.january = _indicator(("2017-01-01T00:00:00Z", "2017-01-31T23:59:59Z"))
+        self.open_end = _indicator(("2017-01-15T00:00:00Z", None))
+        self.split = _indicator(
+            ("2016-12-01T00:00:00Z", "2016-12-31T00:00:00Z"),
+            ("2017-03-01T00:00:00Z", "2017-03-31T00:00:00Z"),
+        )
+        self.no_window = Indicator()
+
+        package = STIXPackage()
+        for x in (self.january, self.open_end, self.split, self.no_window):
+            package.add(x)
+
+        self.index = ValidTimeIndex.from_package(package)
+
+    def test_at(self):
+        self.assertEqual(
+            set([self.january.id_, self.open_end.id_]),
+            self.index.at("2017-01-20T12:00:00Z")
+        )
+        self.assertEqual(set([self.split.id_]), self.index.at("2016-12-10T00:00:00Z"))
+        self.assertEqual(
+            set([self.open_end.id_, self.split.id_]),
+            self.index.at(datetime.datetime(2017, 3, 2))
+        )
+        self.assertEqual(set(), self.index.at("2010-01-01T00:00:00Z"))
+
+    def test_between(self):
+        self.assertEqual(
+            set([self.january.id_, self.split.id_]),
+            self.index.between("2016-12-30T00:00:00Z", "2017-01-02T00:00:00Z")
+        )
+
+    def test_expiring(self):
+        when = "2017-01-30T00:00:00Z"
+        self.assertEqual(
+            set([self.january.id_]),
+            self.index.expiring(when, datetime.timedelta(days=2))
+        )
+        self.assertEqual(set(), self.index.expiring(when, 3600))
+
+    def test_incremental(self):
+        self.assertEqual(4, len(self.index))
+
+        late = _indicator(("2018-01-01T00:00:00Z", "2018-02-01T00:00:00Z"))
+        self.index.add(late)
+        self.assertEqual(set([late.id_, self.open_end.id_]), self.index.at("2018-01-10T00:00:00Z"))
+
+        self.index.remove(self.open_end.id_)
+        self.index.remove(late.id_)
+        self.assertEqual(set(), self.index.at("2018-01-10T00:00:00Z"))
+        self.assertEqual(set([self.january.id_, self.split.id_]), self.index.ids)
+
+    def test_merge(self):
+        index = ValidTimeIndex()
+        index.merge_threshold = 4
+
+        for x in range(10):
+            index.add_window("example:indicator-%d" % x, x * 10, x * 10 + 5)
+
+        self.assertTrue(len(index._pending) < 4)
+        self.assertEqual(10, len(index))
+        self.assertEqual(set(["example:indicator-3"]), index.at(32))
+        self.assertEqual(
+            set(["example:indicator-3", "example:indicator-4"]),
+            index.between(35, 40)
+        )
+
+    def test_from_arrays(self):
+        index = ValidTimeIndex.from_arrays(["a", "b", "c"], [0, 10, None], [20, None, 5])
+
+        self.assertEqual(set(["a", "b", "c"]), index.at(0) | index.at(15))
+        self.assertEqual(set(["b"]), index.at(10 ** 12))
+        self.assertEqual(set(["a", "c"]), index.at(2))
+
+    def test_to_epoch(self):
+        self.assertEqual(86400, to_epoch("1970-01-02T00:00:00+00:00"))
+        self.assertEqual(86400, to_epoch(datetime.date(1970, 1, 2)))
+        self.assertEqual(None, to_epoch(None))
+        self.assertRaises(TypeError, to_epoch, object())
+
+
+if __name__ == "__main__":
+    unittest.main()
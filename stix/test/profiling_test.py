@@ -0,0 +1,112 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import threading
+import unittest
+
+from mixbox import entities
+from mixbox.vendor.six import BytesIO
+
+import stix
+from stix import profiling
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.utils import parser
+
+
+class CollectTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage()
+        for idx in range(3):
+            self.package.add_indicator(Indicator(title="Indicator %d" % idx))
+
+        self.xml = self.package.to_xml()
+
+    def test_parse(self):
+        with profiling.collect() as stats:
+            STIXPackage.from_xml(BytesIO(self.xml))
+
+        parse = stats.get(profiling.PARSE_XML, "STIXPackage")
+        self.assertEqual(parse.count, 1)
+        self.assertEqual(parse.bytes, len(self.xml))
+
+        indicators = stats.get(profiling.FROM_OBJ, "Indicator")
+        self.assertEqual(indicators.count, 3)
+        self.assertTrue(0 <= indicators.self_time <= indicators.time <= parse.time)
+
+        # Parent implementations called via super() are not counted twice.
+        self.assertEqual(stats.get(profiling.FROM_OBJ, "STIXPackage").count, 1)
+
+    def test_serialize(self):
+        with profiling.collect() as stats:
+            xml = self.package.to_xml()
+
+        self.assertEqual(stats.get(profiling.TO_XML, "STIXPackage").bytes, len(xml))
+        self.assertEqual(stats.get(profiling.TO_OBJ, "Indicator").count, 3)
+        self.assertEqual(len(stats.by_type(profiling.TO_OBJ)), len(stats) - 1)
+        self.assertTrue("Indicator" in stats.format())
+
+    def test_serialize_text(self):
+        self.package.add_indicator(Indicator(title=u"Indicator \u00e9"))
+
+        with profiling.collect() as stats:
+            xml = self.package.to_xml(encoding=None)
+
+        self.assertEqual(stats.get(profiling.TO_XML, "STIXPackage").bytes, len(xml.encode("utf-8")))
+        self.assertTrue(len(xml) < len(xml.encode("utf-8")))
+
+    def test_callback(self):
+        events = []
+
+        with profiling.collect(callback=lambda *args: events.append(args)):
+            self.package.to_xml()
+
+        self.assertTrue((profiling.TO_XML, "STIXPackage") in [x[:2] for x in events])
+
+    def test_nested(self):
+        with profiling.collect() as outer:
+            with profiling.collect() as inner:
+                self.package.to_xml()
+            self.package.to_xml()
+
+        self.assertEqual(inner.get(profiling.TO_XML, "STIXPackage").count, 1)
+        self.assertEqual(outer.get(profiling.TO_XML, "STIXPackage").count, 2)
+
+    def test_threads(self):
+        to_xml = stix.Entity.__dict__["to_xml"]
+
+        def run():
+            for _ in range(20):
+                with profiling.collect():
+                    self.package.to_xml()
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(stix.Entity.__dict__["to_xml"] is to_xml)
+        self.assertEqual(profiling._patches, [])
+
+    def test_uninstall(self):
+        to_xml = stix.Entity.__dict__["to_xml"]
+        from_obj = entities.Entity.__dict__["from_obj"]
+        parse_xml = parser.EntityParser.__dict__["parse_xml"]
+
+        with profiling.collect() as stats:
+            pass
+
+        self.assertTrue(stix.Entity.__dict__["to_xml"] is to_xml)
+        self.assertTrue(entities.Entity.__dict__["from_obj"] is from_obj)
+        self.assertTrue(parser.EntityParser.__dict__["parse_xml"] is parse_xml)
+
+        self.package.to_xml()
+        self.assertEqual(len(stats), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.common.kill_chains import KillChainPhaseReference
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.store import Store
+from stix.ttp import TTP
+
+
+class StoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.ttp = TTP(title="Phishing", timestamp="2017-01-01T00:00:00Z")
+
+        self.indicator = Indicator(title="C2 address", timestamp="2017-03-01T00:00:00Z")
+        self.indicator.add_indicator_type("C2")
+        self.indicator.add_indicated_ttp(TTP(idref=self.ttp.id_))
+        self.indicator.kill_chain_phases.append(KillChainPhaseReference(phase_id="example:phase-1"))
+        self.indicator.add_observable(Address("192.0.2.1"))
+
+        self.observable = Observable(Address("198.51.100.1"))
+
+        package = STIXPackage()
+        for x in (self.ttp, self.indicator, self.observable):
+            package.add(x)
+
+        self.store = Store()
+        self.assertEqual(3, self.store.ingest(package))
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_get(self):
+        indicator = self.store.get(self.indicator.id_)
+
+        self.assertTrue(isinstance(indicator, Indicator))
+        expected = Indicator.from_dict(self.indicator.to_dict())
+        self.assertEqual(expected.to_dict(), indicator.to_dict())
+        self.assertEqual(self.observable.id_, self.store.get(self.observable.id_).id_)
+        self.assertEqual(None, self.store.get("example:missing"))
+
+    def test_query(self):
+        self.assertEqual([self.indicator.id_], self.store.ids(vocab=("indicator_types", "C2")))
+        self.assertEqual([self.indicator.id_], self.store.ids(references=self.ttp.id_))
+        self.assertEqual([self.indicator.id_], self.store.ids(kill_chain_phase="example:phase-1"))
+        self.assertEqual([self.ttp.id_], self.store.ids(type="TTP", until="2017-02-01T00:00:00Z"))
+        self.assertEqual(0, self.store.count(type="TTP", since="2017-02-01T00:00:00Z"))
+        self.assertEqual(["C2 address"], [x.title for x in self.store.query(title="C2%")])
+
+    def test_replace(self):
+        updated = Indicator(id_=self.indicator.id_, title="Updated")
+        self.store.add(updated)
+
+        self.assertEqual(3, len(self.store))
+        self.assertEqual("Updated", self.store.get(self.indicator.id_).title)
+        self.assertEqual([], self.store.ids(vocab=("indicator_types", "C2")))
+
+        self.store.remove(self.indicator.id_)
+        self.assertFalse(self.indicator.id_ in self.store)
+        self.assertEqual(2, len(self.store))
+
+    def test_versions(self):
+        first = Indicator(title="v1", timestamp="2017-04-01T00:00:00Z")
+        first.add_indicator_type("C2")
+        second = Indicator(id_=first.id_, title="v2", timestamp="2017-05-01T00:00:00Z")
+        second.add_indicator_type("Malware Artifacts")
+
+        self.assertEqual(1, self.store.add_all([first, second]))
+        self.assertEqual("v2", self.store.get(first.id_).title)
+        self.assertEqual([self.indicator.id_], self.store.ids(vocab=("indicator_types", "C2")))
+        self.assertEqual([first.id_], self.store.ids(vocab=("indicator_types", "Malware Artifacts")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import copy
+import unittest
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils import diff
+from stix.utils.changes import ADDED, REMOVED, MODIFIED
+from stix.utils.fingerprint import Fingerprinter
+
+
+class _CountingFingerprinter(Fingerprinter):
+    hashed = []
+
+    def _hash_entity(self, entity):
+        self.hashed.append(getattr(entity, "id_", None))
+        return super(_CountingFingerprinter, self)._hash_entity(entity)
+
+
+class DiffTests(unittest.TestCase):
+
+    def setUp(self):
+        self.indicator = Indicator(title="Test", description="A description")
+        self.indicator.add_indicator_type("C2")
+        self.indicator.add_indicator_type("IP Watchlist")
+        self.ttp = TTP(title="TTP")
+
+        self.old = STIXPackage()
+        self.old.add(self.indicator)
+        self.old.add(self.ttp)
+        self.new = copy.deepcopy(self.old)
+
+    def test_unchanged(self):
+        self.assertEqual([], diff(self.old, self.new))
+
+    def test_modified_field(self):
+        self.new.indicators[0].title = "Changed"
+
+        changes = diff(self.old, self.new)
+        self.assertEqual(1, len(changes))
+
+        change = changes[0]
+        self.assertEqual(MODIFIED, change.kind)
+        self.assertEqual(self.indicator.id_, change.id_)
+        self.assertEqual("title", change.path)
+        self.assertEqual(("Test", "Changed"), (change.old, change.new))
+
+    def test_modified_list_item(self):
+        self.new.indicators[0].indicator_types[1].value = "Domain Watchlist"
+
+        changes = diff(self.old, self.new)
+        self.assertEqual(["indicator_types[1].value"], [x.path for x in changes])
+
+    def test_reordered(self):
+        types = self.new.indicators[0].indicator_types
+        types.reverse()
+        self.assertEqual([], diff(self.old, self.new))
+
+    def test_added_removed(self):
+        added = Indicator(title="New")
+        self.new.add(added)
+        self.new.ttps.remove(self.new.ttps[0])
+
+        changes = diff(self.old, self.new)
+        self.assertEqual(
+            set([(ADDED, added.id_), (REMOVED, self.ttp.id_)]),
+            set((x.kind, x.id_) for x in changes)
+        )
+
+    def test_memoized(self):
+        fp = Fingerprinter(ignore=())
+        diff(self.old, self.new, fingerprinter=fp)
+        count = len(fp)
+        self.assertTrue(count > 0)
+
+        self.new.indicators[0].title = "Changed"
+        fp.forget(self.new.indicators[0])
+
+        changes = diff(self.old, self.new, fingerprinter=fp)
+        self.assertEqual(["title"], [x.path for x in changes])
+        self.assertEqual(count, len(fp))
+
+    def test_digests(self):
+        digests = {}
+        diff(self.old, self.new, digests=digests)
+        self.assertEqual(2, len(digests))
+
+        # The next snapshot, with a new version of the indicator.
+        newer = copy.deepcopy(self.new)
+        newer.indicators[0].title = "Changed"
+        newer.indicators[0].timestamp = "2030-01-01T00:00:00Z"
+
+        del _CountingFingerprinter.hashed[:]
+        fp = _CountingFingerprinter(ignore=())
+        changes = diff(self.new, newer, fingerprinter=fp, digests=digests)
+
+        self.assertEqual(["timestamp", "title"], sorted(x.path for x in changes))
+        self.assertTrue(self.indicator.id_ in _CountingFingerprinter.hashed)
+        self.assertFalse(self.ttp.id_ in _CountingFingerprinter.hashed)
+        self.assertEqual(3, len(digests))
+
+
+if __name__ == "__main__":
+    unittest.main()
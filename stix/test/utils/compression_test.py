@@ -0,0 +1,177 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor import six
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage
+from stix.core.writer import JSONPackageWriter, PackageWriter
+from stix.indicator import Indicator
+from stix.utils import compression
+
+try:
+    from stix.utils.pull import iter_entities
+    pull_present = True
+except ImportError:
+    pull_present = False
+
+try:
+    import lzma
+    lzma_present = True
+except ImportError:
+    lzma_present = False
+
+
+def _package():
+    package = STIXPackage()
+
+    for idx in range(3):
+        package.add(Indicator(title="Indicator %d" % idx))
+
+    return package
+
+
+def _compress(data, format_):
+    out = BytesIO()
+    f = compression.compressing(out, format_)
+    f.write(data)
+    f.close()
+    return out.getvalue()
+
+
+class _NonSeekable(object):
+
+    def __init__(self, data):
+        self._data = BytesIO(data)
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+
+class DetectTests(unittest.TestCase):
+
+    def test_from_extension(self):
+        self.assertEqual(compression.GZIP, compression.from_extension("a.xml.gz"))
+        self.assertEqual(compression.BZ2, compression.from_extension("a.XML.BZ2"))
+        self.assertEqual(compression.XZ, compression.from_extension("a.xz"))
+        self.assertEqual(None, compression.from_extension("a.xml"))
+
+    def test_from_magic(self):
+        self.assertEqual(compression.GZIP, compression.from_magic(_compress(b"<a/>", compression.GZIP)))
+        self.assertEqual(compression.BZ2, compression.from_magic(_compress(b"<a/>", compression.BZ2)))
+        self.assertEqual(None, compression.from_magic(b"<?xml"))
+        self.assertEqual(None, compression.from_magic(u"<?xml"))
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, compression.compressing, BytesIO(), "zip")
+        self.assertRaises(ValueError, compression.decompressing, BytesIO(), "zip")
+
+
+class _ReadWriteTests(object):
+    format_ = None
+    extension = None
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.package = _package()
+        self.xml = self.package.to_xml()
+        self.data = _compress(self.xml, self.format_)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _titles(self, package):
+        return [x.title for x in package.indicators]
+
+    def test_round_trip(self):
+        f = compression.decompressing(BytesIO(self.data), self.format_)
+        self.assertEqual(self.xml, f.read())
+
+    def test_from_xml_fileobj(self):
+        package = STIXPackage.from_xml(BytesIO(self.data))
+        self.assertEqual(self._titles(self.package), self._titles(package))
+
+    def test_from_xml_non_seekable(self):
+        package = STIXPackage.from_xml(_NonSeekable(self.data))
+        self.assertEqual(3, len(package.indicators))
+
+    def test_from_xml_filename(self):
+        # Detected by extension, and by magic bytes without one.
+        for filename in ("package.xml" + self.extension, "package"):
+            path = os.path.join(self.directory, filename)
+
+            with open(path, "wb") as f:
+                f.write(self.data)
+
+            package = STIXPackage.from_xml(path)
+            self.assertEqual(self._titles(self.package), self._titles(package))
+
+    @unittest.skipIf(condition=pull_present is False, reason="This test requires lxml 3.3 or later.")
+    def test_iter_entities(self):
+        # Concatenated streams are read in turn.
+        half = len(self.xml) // 2
+        data = _compress(self.xml[:half], self.format_) + _compress(self.xml[half:], self.format_)
+
+        entities = list(iter_entities(BytesIO(data), chunk_size=64))
+        self.assertEqual(self._titles(self.package), [x.title for x in entities])
+
+    def test_writer_filename(self):
+        path = os.path.join(self.directory, "out.xml" + self.extension)
+
+        with PackageWriter(path) as writer:
+            writer.write_all(self.package.indicators)
+
+        with open(path, "rb") as f:
+            head = f.read(8)
+
+        self.assertEqual(self.format_, compression.from_magic(head))
+        self.assertEqual(self._titles(self.package), self._titles(STIXPackage.from_xml(path)))
+
+    def test_writer_fileobj(self):
+        out = BytesIO()
+
+        with JSONPackageWriter(out, compression=self.format_) as writer:
+            writer.write_all(self.package.indicators)
+
+        self.assertFalse(out.closed)
+
+        f = compression.decompressing(BytesIO(out.getvalue()), self.format_)
+        package = STIXPackage.from_json(io.TextIOWrapper(f, encoding="utf-8") if six.PY3 else f)
+        self.assertEqual(self._titles(self.package), self._titles(package))
+
+
+class GzipTests(_ReadWriteTests, unittest.TestCase):
+    format_ = compression.GZIP
+    extension = ".gz"
+
+
+class BZ2Tests(_ReadWriteTests, unittest.TestCase):
+    format_ = compression.BZ2
+    extension = ".bz2"
+
+
+@unittest.skipIf(condition=lzma_present is False, reason="This test requires the 'lzma' module.")
+class XZTests(_ReadWriteTests, unittest.TestCase):
+    format_ = compression.XZ
+    extension = ".xz"
+
+
+class UncompressedTests(unittest.TestCase):
+
+    def test_non_seekable(self):
+        xml = _package().to_xml()
+        package = STIXPackage.from_xml(_NonSeekable(xml))
+        self.assertEqual(3, len(package.indicators))
+
+    def test_writer_unknown(self):
+        self.assertRaises(ValueError, PackageWriter, BytesIO(), compression="zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.campaign import Campaign
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.threat_actor import ThreatActor
+from stix.ttp import TTP
+from stix.common import StructuredTextList
+from stix.utils import fingerprint
+
+
+def _indicator(title, *types):
+    indicator = Indicator(title=title, description="A description")
+
+    for type_ in types:
+        indicator.add_indicator_type(type_)
+
+    return indicator
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def test_ignores_id_and_timestamp(self):
+        first = _indicator("Test", "C2", "IP Watchlist")
+        second = _indicator("Test", "IP Watchlist", "C2")
+        second.timestamp = "2001-01-01T00:00:00Z"
+
+        self.assertNotEqual(first.id_, second.id_)
+        self.assertEqual(fingerprint.fingerprint(first), fingerprint.fingerprint(second))
+
+    def test_content_differs(self):
+        first = _indicator("Test")
+        second = _indicator("Other")
+        self.assertNotEqual(fingerprint.fingerprint(first), fingerprint.fingerprint(second))
+
+        # Same content, different types.
+        self.assertNotEqual(
+            fingerprint.fingerprint(TTP(title="Test")),
+            fingerprint.fingerprint(Indicator(title="Test"))
+        )
+
+    def test_ordered(self):
+        first = _indicator("Test", "C2", "IP Watchlist")
+        second = _indicator("Test", "IP Watchlist", "C2")
+
+        self.assertNotEqual(
+            fingerprint.fingerprint(first, ordered=True),
+            fingerprint.fingerprint(second, ordered=True)
+        )
+
+    def test_ignore(self):
+        first = _indicator("Test")
+        second = _indicator("Test")
+        second.id_ = first.id_
+        second.timestamp = first.timestamp
+
+        self.assertEqual(
+            fingerprint.fingerprint(first, ignore=()),
+            fingerprint.fingerprint(second, ignore=())
+        )
+
+        second.timestamp = "2001-01-01T00:00:00Z"
+        self.assertNotEqual(
+            fingerprint.fingerprint(first, ignore=()),
+            fingerprint.fingerprint(second, ignore=())
+        )
+
+    def test_memoization(self):
+        fp = fingerprint.Fingerprinter()
+        indicator = _indicator("Test", "C2")
+        before = fp.fingerprint(indicator)
+        self.assertTrue(len(fp) > 1)
+
+        indicator.title = "Changed"
+        self.assertEqual(before, fp.fingerprint(indicator))
+
+        fp.forget(indicator)
+        self.assertNotEqual(before, fp.fingerprint(indicator))
+
+    def test_typed_collection(self):
+        fp = fingerprint.Fingerprinter()
+        first = StructuredTextList(["a", "b"])
+        second = StructuredTextList(["a", "b"])
+        self.assertEqual(fp.fingerprint(first), fp.fingerprint(second))
+
+
+class DedupeTests(unittest.TestCase):
+
+    def test_dedupe(self):
+        ttp1 = TTP(title="Shared TTP")
+        ttp2 = TTP(title="Shared TTP")
+
+        ind1 = _indicator("Shared")
+        ind1.add_indicated_ttp(TTP(idref=ttp1.id_))
+        ind2 = _indicator("Shared")
+        ind2.add_indicated_ttp(TTP(idref=ttp2.id_))
+        unique = _indicator("Unique")
+
+        obs1 = Observable(Address("192.0.2.1", Address.CAT_IPV4))
+        obs2 = Observable(Address("192.0.2.1", Address.CAT_IPV4))
+
+        first = STIXPackage()
+        second = STIXPackage()
+
+        for x in (ttp1, ind1, obs1):
+            first.add(x)
+
+        for x in (ttp2, ind2, unique, obs2):
+            second.add(x)
+
+        merged, aliases = fingerprint.dedupe([first, second])
+
+        self.assertEqual([ttp1.id_], [x.id_ for x in merged.ttps])
+        self.assertEqual([ind1.id_, unique.id_], [x.id_ for x in merged.indicators])
+        self.assertEqual(1, len(merged.observables))
+        self.assertEqual(ttp1.id_, aliases[ttp2.id_])
+        self.assertEqual(ind1.id_, aliases[ind2.id_])
+        self.assertEqual(ttp1.id_, ind2.indicated_ttps[0].item.idref)
+
+    def test_backward_reference(self):
+        campaign1 = Campaign(title="Shared campaign")
+        campaign2 = Campaign(title="Shared campaign")
+
+        # Threat Actors are deduplicated before the Campaigns they reference.
+        actor = ThreatActor(title="Actor")
+        actor.associated_campaigns.append(Campaign(idref=campaign2.id_))
+
+        first = STIXPackage()
+        first.add(campaign1)
+        second = STIXPackage()
+        second.add(actor)
+        second.add(campaign2)
+
+        merged, aliases = fingerprint.dedupe([first, second])
+
+        self.assertEqual([campaign1.id_], [x.id_ for x in merged.campaigns])
+        self.assertEqual(campaign1.id_, aliases[campaign2.id_])
+        self.assertEqual(campaign1.id_, merged.threat_actors[0].associated_campaigns[0].item.idref)
+
+    def test_fingerprinter(self):
+        package = STIXPackage()
+        package.add(_indicator("First"))
+        package.add(_indicator("Second"))
+
+        # A new (empty) Fingerprinter is used, not replaced by the default.
+        fp = fingerprint.Fingerprinter(ignore=("id", "timestamp", "title"))
+        merged, _ = fingerprint.dedupe([package], fingerprinter=fp)
+
+        self.assertEqual(1, len(merged.indicators))
+        self.assertTrue(len(fp) > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils import flatten
+
+try:
+    from stix.utils.pull import iter_entities
+    pull_present = True
+except ImportError:
+    pull_present = False
+
+try:
+    import pyarrow
+    pyarrow_present = True
+except ImportError:
+    pyarrow_present = False
+
+
+def _package():
+    package = STIXPackage()
+    ttp = TTP(title="Phishing")
+
+    indicator = Indicator(title="Bad IP", description="First")
+    indicator.add_indicator_type("IP Watchlist")
+    indicator.add_observable(Observable(Address("10.0.0.1", Address.CAT_IPV4)))
+    indicator.add_indicated_ttp(TTP(idref=ttp.id_))
+    indicator.confidence = "High"
+
+    package.add(indicator)
+    package.add(Indicator(title="Other"))
+    package.add(ttp)
+    return package
+
+
+class IterBatchesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = _package()
+        self.batches = list(flatten.iter_batches(self.package))
+        self.tables = dict((x[0], (x[1], x[2])) for x in self.batches)
+
+    def test_tables(self):
+        self.assertEqual(
+            set(["indicators", "observables", "ttps", flatten.RELATIONSHIPS]),
+            set(self.tables)
+        )
+
+    def test_columns(self):
+        columns, arrays = self.tables["indicators"]
+        indicator = self.package.indicators[0]
+
+        self.assertEqual("id", columns[0])
+        self.assertEqual([x.id_ for x in self.package.indicators], arrays["id"])
+        self.assertEqual(["Bad IP", "Other"], arrays["title"])
+        self.assertEqual("High", arrays["confidence.value"][0])
+        self.assertEqual(None, arrays["confidence.value"][1])
+        self.assertEqual("IP Watchlist", arrays["indicator_types"][0][0]["value"])
+        self.assertEqual(indicator.description.value, arrays["description"][0][0]["value"])
+
+        # The inline observable is a row of its own table.
+        columns, arrays = self.tables["observables"]
+        self.assertEqual(["10.0.0.1"], arrays["object.properties.address_value"])
+        self.assertEqual(["AddressObjectType"], arrays["object.properties.xsi:type"])
+        self.assertFalse(any(x.startswith("observable") for x in self.tables["indicators"][0]))
+
+    def test_relationships(self):
+        columns, arrays = self.tables[flatten.RELATIONSHIPS]
+        indicator = self.package.indicators[0]
+        observable = indicator.observable
+
+        self.assertEqual(list(flatten.RELATIONSHIP_COLUMNS), columns)
+        self.assertEqual([indicator.id_] * 2, arrays["source_id"])
+        self.assertEqual(
+            set([observable.id_, self.package.ttps[0].id_]),
+            set(arrays["target_id"])
+        )
+        self.assertEqual(set(["observable", "indicated_ttps"]), set(arrays["type"]))
+
+    def test_batch_size(self):
+        batches = [x for x in flatten.iter_batches(self.package, batch_size=1) if x[0] == "indicators"]
+        self.assertEqual(2, len(batches))
+
+        # Columns are kept across batches.
+        first, second = batches
+        self.assertEqual(first[1], second[1][:len(first[1])])
+        self.assertEqual([None], second[2]["confidence.value"])
+
+    @unittest.skipIf(condition=pull_present is False, reason="This test requires lxml 3.3 or later.")
+    def test_stream(self):
+        xml = self.package.to_xml()
+        batches = list(flatten.iter_batches(iter_entities(BytesIO(xml))))
+        tables = dict((x[0], x[2]) for x in batches)
+
+        self.assertEqual(self.tables["indicators"][1]["title"], tables["indicators"]["title"])
+        self.assertEqual(2, len(tables["relationships"]["source_id"]))
+
+    def test_invalid(self):
+        self.assertRaises(TypeError, list, flatten.iter_batches([object()]))
+
+
+class SinkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.package = _package()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def test_csv(self):
+        counts = flatten.flatten(self.package, flatten.CSVSink(self.directory))
+        self.assertEqual(2, counts["indicators"])
+
+        with io.open(self._path("indicators.csv"), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual(["Bad IP", "Other"], [x["title"] for x in rows])
+        self.assertEqual("", rows[1]["confidence.value"])
+        self.assertEqual("IP Watchlist", json.loads(rows[0]["indicator_types"])[0]["value"])
+
+    def test_csv_new_columns(self):
+        sink = flatten.CSVSink(self.directory)
+        flatten.flatten(reversed(self.package.indicators), sink, batch_size=1)
+
+        # The second indicator has columns the first does not.
+        self.assertEqual(
+            [self._path("indicators.csv"), self._path("indicators.1.csv")],
+            [x for x in sink.paths if "indicators" in x]
+        )
+
+    def test_ndjson(self):
+        flatten.flatten(self.package, flatten.NDJSONSink(self.directory))
+
+        with open(self._path("indicators.ndjson"), "rb") as f:
+            rows = [json.loads(x.decode("utf-8")) for x in f]
+
+        self.assertEqual(["Bad IP", "Other"], [x["title"] for x in rows])
+        self.assertFalse("confidence.value" in rows[1])
+
+    @unittest.skipIf(condition=pyarrow_present is False, reason="This test requires the 'pyarrow' library.")
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        flatten.flatten(self.package, flatten.ParquetSink(self.directory))
+        table = pyarrow.parquet.read_table(self._path("indicators.parquet"))
+        self.assertEqual(["Bad IP", "Other"], table.column("title").to_pylist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import json
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage
+from stix.utils.generator import CorpusGenerator, DEFAULT_COUNTS
+
+
+COUNTS = {
+    "observables": 3,
+    "indicators": 10,
+    "ttps": 4,
+    "exploit_targets": 2,
+    "incidents": 2,
+    "courses_of_action": 1,
+    "campaigns": 1,
+    "threat_actors": 1,
+    "reports": 1,
+}
+
+
+class CorpusGeneratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = CorpusGenerator(seed=7, counts=COUNTS, marking_ratio=0.5)
+
+    def test_counts(self):
+        package = self.generator.package()
+
+        for name, count in COUNTS.items():
+            self.assertEqual(len(getattr(package, name)), count)
+
+        self.assertEqual(len(self.generator), sum(COUNTS.values()))
+
+    def test_default_counts(self):
+        generator = CorpusGenerator(counts={"indicators": 1})
+        self.assertEqual(generator.counts["ttps"], DEFAULT_COUNTS["ttps"])
+        self.assertEqual(generator.counts["indicators"], 1)
+
+    def test_deterministic(self):
+        first = self.generator.package().to_dict()
+        second = CorpusGenerator(seed=7, counts=COUNTS, marking_ratio=0.5).package().to_dict()
+        other = CorpusGenerator(seed=8, counts=COUNTS, marking_ratio=0.5).package().to_dict()
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_relationships(self):
+        generator = CorpusGenerator(seed=1, counts=COUNTS, relationship_density=2)
+        package = generator.package()
+        ttp_ids = set(x.id_ for x in package.ttps)
+
+        for indicator in package.indicators:
+            self.assertEqual(len(indicator.indicated_ttps), 2)
+
+            for related in indicator.indicated_ttps:
+                self.assertTrue(related.item.idref in ttp_ids)
+
+    def test_no_relationships(self):
+        generator = CorpusGenerator(counts=COUNTS, relationship_density=0)
+        package = generator.package()
+
+        for indicator in package.indicators:
+            self.assertFalse(indicator.indicated_ttps)
+
+    def test_description_size(self):
+        generator = CorpusGenerator(counts=COUNTS, description_size=(10, 20))
+
+        for indicator in generator.package().indicators:
+            self.assertTrue(10 <= len(indicator.description.value) <= 20)
+
+    def test_vocabs(self):
+        generator = CorpusGenerator(counts=COUNTS, vocabs={"indicator_types": [("C2", 1)]})
+
+        for indicator in generator.package().indicators:
+            self.assertEqual(indicator.indicator_types[0].value, "C2")
+
+    def test_markings(self):
+        marked = CorpusGenerator(counts=COUNTS, marking_ratio=1).package()
+        unmarked = CorpusGenerator(counts=COUNTS, marking_ratio=0).package()
+
+        self.assertTrue(all(x.handling for x in marked.indicators))
+        self.assertFalse(any(x.handling for x in unmarked.indicators))
+
+    def test_write_xml(self):
+        f = BytesIO()
+        count = self.generator.write_xml(f)
+        package = STIXPackage.from_xml(BytesIO(f.getvalue()))
+
+        self.assertEqual(count, sum(COUNTS.values()))
+        self.assertEqual(
+            [x.id_ for x in package.indicators],
+            [x.id_ for x in self.generator.package().indicators]
+        )
+
+    def test_write_json(self):
+        f = BytesIO()
+        self.generator.write_json(f)
+        d = json.loads(f.getvalue().decode("utf-8"))
+
+        self.assertEqual(d, self.generator.package().to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.campaign import Campaign
+from stix.common import Confidence
+from stix.common.related import RelatedTTP
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.threat_actor import ThreatActor
+from stix.ttp import TTP
+from stix.utils.graph import RelationshipGraph, OUTGOING, INCOMING
+
+
+class RelationshipGraphTests(unittest.TestCase):
+
+    def setUp(self):
+        self.ttp = TTP(title="TTP")
+        self.actor = ThreatActor(title="Actor")
+        self.actor.observed_ttps.append(RelatedTTP(TTP(idref=self.ttp.id_), confidence=Confidence("High")))
+
+        self.observable = Observable(Address("192.0.2.1"))
+        self.indicator = Indicator(title="Indicator")
+        self.indicator.add_indicated_ttp(TTP(idref=self.ttp.id_))
+        self.indicator.add_observable(Observable(idref=self.observable.id_))
+
+        self.inline = TTP(title="Inline")
+        self.campaign = Campaign(title="Campaign")
+        self.campaign.related_ttps.append(self.inline)
+
+        self.lonely = Indicator(title="Lonely")
+
+        package = STIXPackage()
+        for x in (self.ttp, self.actor, self.observable, self.indicator,
+                  self.campaign, self.lonely):
+            package.add(x)
+
+        self.graph = RelationshipGraph.from_package(package)
+
+    def test_nodes(self):
+        self.assertEqual(7, len(self.graph))
+        self.assertEqual(4, self.graph.edge_count)
+        self.assertEqual("TTP", self.graph.node_type(self.inline.id_))
+        self.assertTrue(self.lonely.id_ in self.graph)
+
+    def test_neighbors(self):
+        self.assertEqual(
+            set([self.actor.id_, self.indicator.id_]),
+            set(self.graph.neighbors(self.ttp.id_))
+        )
+        self.assertEqual([], self.graph.neighbors(self.ttp.id_, direction=OUTGOING))
+        self.assertEqual(
+            [self.ttp.id_],
+            self.graph.neighbors(self.indicator.id_, edge_type="indicated_ttps")
+        )
+
+        edges = self.graph.edges(self.ttp.id_, direction=INCOMING)
+        self.assertTrue((self.actor.id_, "observed_ttps", 3) in edges)
+        self.assertTrue((self.indicator.id_, "indicated_ttps", 0) in edges)
+
+    def test_expand(self):
+        self.assertEqual(
+            set([self.observable.id_, self.indicator.id_]),
+            self.graph.expand([self.observable.id_])
+        )
+        self.assertEqual(
+            set([self.observable.id_, self.indicator.id_, self.ttp.id_, self.actor.id_]),
+            self.graph.expand([self.observable.id_], hops=3)
+        )
+
+    def test_shortest_path(self):
+        self.assertEqual(
+            [self.observable.id_, self.indicator.id_, self.ttp.id_, self.actor.id_],
+            self.graph.shortest_path(self.observable.id_, self.actor.id_)
+        )
+        self.assertEqual(None, self.graph.shortest_path(self.observable.id_, self.lonely.id_))
+        self.assertEqual(
+            None,
+            self.graph.shortest_path(self.observable.id_, self.actor.id_, direction=OUTGOING)
+        )
+
+    def test_components(self):
+        components = sorted(self.graph.components(), key=len)
+        self.assertEqual([1, 2, 4], [len(x) for x in components])
+        self.assertEqual(set([self.campaign.id_, self.inline.id_]), components[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
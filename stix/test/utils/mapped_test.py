@@ -0,0 +1,134 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.core import STIXHeader, STIXPackage
+from stix.extensions.test_mechanism.snort_test_mechanism import SnortTestMechanism
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils.parser import EntityParser
+
+try:
+    from stix.utils import mapped
+    mapped_present = True
+except ImportError:
+    mapped_present = False
+
+
+def _package():
+    package = STIXPackage()
+    package.stix_header = STIXHeader(title="Header")
+    package.add(Observable(Address("10.0.0.1", Address.CAT_IPV4)))
+
+    for idx in range(2):
+        indicator = Indicator(title="Indicator %d" % idx)
+        indicator.add_related_indicator(Indicator(title="Nested %d" % idx))
+        package.add(indicator)
+
+    # A rule whose text looks like markup.
+    mechanism = SnortTestMechanism()
+    mechanism.rules = ["<stix:Indicator> </stix:Indicators> <!-- -->"]
+    package.indicators[0].add_test_mechanism(mechanism)
+
+    package.add(TTP(title="TTP"))
+    return package
+
+
+@unittest.skipIf(condition=mapped_present is False, reason="These tests require lxml 3.3 or later.")
+class MappedTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.package = _package()
+        self.path = self._write("package.xml", self.package.to_xml())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, filename, data):
+        path = os.path.join(self.directory, filename)
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+        return path
+
+    def test_parse_xml(self):
+        package = EntityParser().parse_xml(self.path, mmap=True)
+        self.assertEqual(self.package.id_, package.id_)
+        self.assertEqual(["Indicator 0", "Indicator 1"], [x.title for x in package.indicators])
+
+    def _write_gzip(self):
+        path = os.path.join(self.directory, "package.xml.gz")
+
+        with gzip.GzipFile(path, "wb") as f:
+            f.write(self.package.to_xml())
+
+        return path
+
+    def test_parse_xml_compressed(self):
+        package = EntityParser().parse_xml(self._write_gzip(), mmap=True)
+        self.assertEqual(2, len(package.indicators))
+
+    def test_index(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        offsets = mapped.index_components(data)
+
+        self.assertEqual(
+            ["observables", "indicators", "indicators", "ttps"],
+            [x.collection for x in offsets]
+        )
+        self.assertEqual(self.package.indicators[1].id_, offsets[2].id_)
+
+        # Offsets span whole components, including nested ones.
+        for offset in offsets:
+            fragment = data[offset.start:offset.end]
+            self.assertTrue(fragment.startswith(b"<"))
+            self.assertTrue(fragment.endswith(b">"))
+
+        self.assertEqual(2, data[offsets[1].start:offsets[1].end].count(b"</indicator:Title>"))
+
+    def test_get(self):
+        with mapped.MappedDocument(self.path) as document:
+            self.assertEqual(4, len(document))
+            self.assertTrue(self.package.ttps[0].id_ in document)
+
+            indicator = document.get(self.package.indicators[0].id_)
+            self.assertEqual("Indicator 0", indicator.title)
+            self.assertEqual("Nested 0", indicator.related_indicators[0].item.title)
+            self.assertEqual(
+                self.package.indicators[0].test_mechanisms[0].rules[0].value,
+                indicator.test_mechanisms[0].rules[0].value
+            )
+
+            observable = document.get(self.package.observables[0].id_)
+            self.assertEqual("10.0.0.1", observable.object_.properties.address_value)
+
+            self.assertRaises(KeyError, document.get, "example:indicator-missing")
+
+    def test_components(self):
+        with mapped.MappedDocument(self.path) as document:
+            self.assertEqual(["TTP"], [x.title for x in document.components("ttps")])
+            self.assertEqual(4, len(list(document.components())))
+            self.assertEqual(self.package.id_, document.parse().id_)
+
+    def test_compressed(self):
+        self.assertRaises(ValueError, mapped.MappedDocument, self._write_gzip())
+
+    def test_incomplete(self):
+        data = self.package.to_xml()
+        self.assertRaises(ValueError, mapped.index_components, data[:len(data) // 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage, STIXHeader
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.utils import marking
+
+
+def _tlp_marking(color, controlled_structure=None):
+    spec = MarkingSpecification(controlled_structure=controlled_structure)
+    spec.marking_structures.append(TLPMarkingStructure(color=color))
+
+    handling = Marking()
+    handling.add_marking(spec)
+    return handling
+
+
+class ResolveTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage()
+        self.package.stix_header = STIXHeader()
+        self.package.stix_header.handling = _tlp_marking(
+            "GREEN", "//node() | //@*"
+        )
+
+        self.indicator = Indicator(title="Marked")
+        self.indicator.handling = _tlp_marking(
+            "RED", "../../../descendant-or-self::node()"
+        )
+
+        self.ttp = TTP(title="Unmarked")
+
+        self.package.add(self.indicator)
+        self.package.add(self.ttp)
+
+    def _colors(self, structures):
+        return sorted(x.color for x in structures)
+
+    def test_resolve(self):
+        markings = marking.resolve(self.package)
+
+        self.assertEqual(["GREEN", "RED"], self._colors(markings[self.indicator.id_]))
+        self.assertEqual(["GREEN"], self._colors(markings[self.ttp.id_]))
+
+    def test_get_markings(self):
+        markings = marking.resolve(self.package)
+
+        self.assertEqual(["GREEN"], self._colors(marking.get_markings(markings, self.ttp)))
+        self.assertEqual((), marking.get_markings(markings, "example:missing-1"))
+
+    def test_resolve_xml(self):
+        xml = BytesIO(self.package.to_xml())
+        markings = marking.resolve_xml(xml)
+
+        by_id = dict((k.get("id"), v) for k, v in markings.items() if k.get("id"))
+        self.assertEqual(["GREEN", "RED"], self._colors(by_id[self.indicator.id_]))
+
+        # Marking structures are parsed once and shared between elements.
+        green = [x for x in by_id[self.indicator.id_] if x.color == "GREEN"][0]
+        self.assertTrue(green is by_id[self.ttp.id_][0])
+
+    def test_default_controlled_structure(self):
+        self.indicator.handling = _tlp_marking("AMBER")
+        markings = marking.resolve(self.package, inherit=False)
+
+        self.assertEqual(["AMBER", "GREEN"], self._colors(markings[self.indicator.id_]))
+        self.assertEqual(["GREEN"], self._colors(markings[self.ttp.id_]))
+
+    def test_inherit(self):
+        self.package.stix_header.handling = _tlp_marking(
+            "WHITE", "../../../../self::node()"
+        )
+
+        inherited = marking.resolve(self.package)
+        direct = marking.resolve(self.package, inherit=False)
+
+        self.assertEqual(["WHITE"], self._colors(inherited[self.ttp.id_]))
+        self.assertTrue(self.ttp.id_ not in direct)
+        self.assertEqual(["WHITE"], self._colors(direct[self.package.id_]))
+
+    def test_compile_xpath_cached(self):
+        ns = {'stix': "http://stix.mitre.org/stix-1", None: "urn:default"}
+        first = marking.compile_xpath("//stix:Indicator", ns)
+        second = marking.compile_xpath("//stix:Indicator", dict(ns))
+        self.assertTrue(first is second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from lxml import etree
+
+from stix.core import STIXPackage
+from stix.extensions.test_mechanism.open_ioc_2010_test_mechanism import OpenIOCTestMechanism
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils.memory import memory_report, LXML
+
+
+class MemoryReportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage()
+        self.ttp = TTP(title="TTP")
+        self.package.add_ttp(self.ttp)
+
+        for idx in range(5):
+            indicator = Indicator(title="Indicator %d" % idx, description="x" * 1000)
+            self.package.add_indicator(indicator)
+
+    def test_types(self):
+        report = memory_report(self.package)
+        count, nbytes = report.by_type["Indicator"]
+
+        self.assertEqual(count, 5)
+        self.assertTrue(nbytes > 5 * 1000)
+        self.assertEqual(report.by_type["TTP"][0], 1)
+        self.assertEqual(report.total, sum(x[1] for x in report.by_type.values()))
+
+    def test_collections(self):
+        report = memory_report(self.package)
+
+        self.assertTrue(report.by_collection["indicators"] > report.by_collection["ttps"])
+        self.assertEqual(report.total, sum(report.by_collection.values()))
+
+    def test_shared(self):
+        description = "y" * 100000
+        for indicator in self.package.indicators:
+            indicator.description = description
+
+        # The shared description is only counted once.
+        self.assertTrue(memory_report(self.package).total < 2 * len(description))
+
+    def test_lxml(self):
+        ioc = etree.fromstring(
+            '<ioc xmlns="http://schemas.mandiant.com/2010/ioc">'
+            '<definition><Indicator id="a"/><Indicator id="b"/></definition>'
+            '</ioc>'
+        )
+        mechanism = OpenIOCTestMechanism()
+        mechanism.ioc = ioc
+        self.package.indicators[0].add_test_mechanism(mechanism)
+
+        report = memory_report(self.package)
+        self.assertEqual(report.by_type[LXML][0], 4)
+
+    def test_rows(self):
+        report = memory_report(self.package)
+        rows = report.rows()
+
+        self.assertEqual(rows[0][2], max(x[2] for x in rows))
+        self.assertEqual([x[0] for x in report.rows("name")], sorted(report.by_type))
+        self.assertTrue("Indicator" in report.format(limit=3))
+
+    def test_entity(self):
+        report = memory_report(self.ttp)
+
+        self.assertEqual(report.by_type["TTP"][0], 1)
+        self.assertFalse(report.by_collection)
+
+
+if __name__ == "__main__":
+    unittest.main()
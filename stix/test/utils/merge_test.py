@@ -0,0 +1,85 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils.merge import merge_packages, POLICY_KEEP, POLICY_UPDATE
+
+
+def _package(*components):
+    package = STIXPackage()
+
+    for x in components:
+        package.add(x)
+
+    return package
+
+
+def _version(component, title, timestamp):
+    return type(component)(id_=component.id_, title=title, timestamp=timestamp)
+
+
+class MergeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.indicator = Indicator(title="v1", timestamp="2017-01-01T00:00:00Z")
+        self.ttp = TTP(title="v1", timestamp="2017-01-01T00:00:00Z")
+        self.base = _package(self.indicator, self.ttp)
+
+    def test_newest(self):
+        newer = _version(self.indicator, "v2", "2017-02-01T00:00:00Z")
+        older = _version(self.ttp, "v0", "2016-01-01T00:00:00Z")
+        added = Indicator(title="new")
+        observable = Observable(Address("192.0.2.1"))
+
+        report = merge_packages(self.base, _package(newer, older, added, observable))
+
+        self.assertEqual(set([added.id_, observable.id_]), set(report.added))
+        self.assertEqual([self.indicator.id_], report.replaced)
+        self.assertEqual([self.ttp.id_], report.skipped)
+
+        self.assertEqual(["v2", "new"], [x.title for x in self.base.indicators])
+        self.assertEqual("v1", self.base.ttps[0].title)
+        self.assertEqual(1, len(self.base.observables))
+
+    def test_successive_updates(self):
+        first = _version(self.indicator, "v2", "2017-02-01T00:00:00Z")
+        second = _version(self.indicator, "v3", "2017-03-01T00:00:00Z")
+
+        report = merge_packages(self.base, _package(second), _package(first))
+
+        self.assertEqual([self.indicator.id_], report.replaced)
+        self.assertEqual([self.indicator.id_], report.skipped)
+        self.assertEqual(1, len(self.base.indicators))
+        self.assertEqual("v3", self.base.indicators[0].title)
+
+    def test_policies(self):
+        older = _version(self.ttp, "v0", "2016-01-01T00:00:00Z")
+        report = merge_packages(self.base, _package(older), policy=POLICY_UPDATE)
+        self.assertEqual("v0", self.base.ttps[0].title)
+        self.assertTrue(report)
+
+        newer = _version(self.ttp, "v2", "2018-01-01T00:00:00Z")
+        report = merge_packages(self.base, _package(newer), policy=POLICY_KEEP)
+        self.assertEqual("v0", self.base.ttps[0].title)
+        self.assertFalse(report)
+
+        self.assertRaises(ValueError, merge_packages, self.base, policy="oldest")
+
+    def test_empty_base(self):
+        base = STIXPackage()
+        base.ttps = None
+
+        report = merge_packages(base, _package(self.ttp))
+        self.assertEqual([self.ttp.id_], report.added)
+        self.assertEqual(self.ttp.id_, base.ttps[0].id_)
+
+
+if __name__ == "__main__":
+    unittest.main()
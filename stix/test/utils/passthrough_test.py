@@ -0,0 +1,179 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import threading
+import unittest
+
+import lxml.etree
+import mixbox.xml
+from mixbox.vendor.six import BytesIO, StringIO
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.threat_actor import ThreatActor
+from stix.extensions.identity.ciq_identity_3_0 import CIQIdentity3_0Instance
+from stix.extensions.test_mechanism.open_ioc_2010_test_mechanism import (
+    OpenIOCTestMechanism
+)
+from stix.utils import passthrough
+
+
+IOC = """<ioc xmlns="http://schemas.mandiant.com/2010/ioc" id="ioc-1">
+  <short_description>Passthrough</short_description>
+  <definition>
+    <Indicator operator="OR" id="ioc-2">
+      <IndicatorItem id="ioc-3" condition="contains">
+        <Context document="ProcessItem" search="ProcessItem/Name" type="mir"/>
+        <Content type="string">evil.exe</Content>
+      </IndicatorItem>
+    </Indicator>
+  </definition>
+</ioc>"""
+
+
+MAEC_PACKAGE = """<stix:STIX_Package
+    xmlns:stix="http://stix.mitre.org/stix-1"
+    xmlns:ttp="http://stix.mitre.org/TTP-1"
+    xmlns:stix-maec="http://stix.mitre.org/extensions/Malware#MAEC4.1-1"
+    xmlns:maecPackage="http://maec.mitre.org/XMLSchema/maec-package-2"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:example="http://example.com"
+    id="example:Package-1" version="1.2">
+  <stix:TTPs>
+    <stix:TTP id="example:ttp-1" xsi:type="ttp:TTPType">
+      <ttp:Behavior>
+        <ttp:Malware>
+          <ttp:Malware_Instance xsi:type="stix-maec:MAEC4.1InstanceType">
+            <stix-maec:MAEC id="example:package-1" schema_version="2.1">
+              <maecPackage:Malware_Subjects/>
+            </stix-maec:MAEC>
+          </ttp:Malware_Instance>
+        </ttp:Malware>
+      </ttp:Behavior>
+    </stix:TTP>
+  </stix:TTPs>
+</stix:STIX_Package>"""
+
+
+def _package():
+    parser = mixbox.xml.get_xml_parser()
+    tm = OpenIOCTestMechanism()
+    tm.ioc = lxml.etree.parse(StringIO(IOC), parser=parser)
+
+    indicator = Indicator(title="Passthrough")
+    indicator.add_test_mechanism(tm)
+
+    identity = CIQIdentity3_0Instance.from_dict({
+        'name': 'Foo',
+        'specification': {
+            'party_name': {
+                'organisation_names': [
+                    {'name_elements': [{'value': 'Foo Inc.'}]}
+                ]
+            }
+        },
+        'xsi:type': 'stix-ciqidentity:CIQIdentity3.0InstanceType'
+    })
+
+    actor = ThreatActor(title="Passthrough")
+    actor.identity = identity
+
+    package = STIXPackage()
+    package.add(indicator)
+    package.add(actor)
+    return package
+
+
+class PassthroughTests(unittest.TestCase):
+
+    def setUp(self):
+        self.xml = _package().to_xml()
+
+    def _parse(self):
+        with passthrough.passthrough():
+            self.assertTrue(passthrough.is_passthrough())
+            return STIXPackage.from_xml(BytesIO(self.xml))
+
+    def test_restored(self):
+        self._parse()
+        self.assertFalse(passthrough.is_passthrough())
+
+    def test_raw_values(self):
+        package = self._parse()
+        tm = package.indicators[0].test_mechanisms[0]
+        raw = passthrough.raw_value(tm, OpenIOCTestMechanism.ioc)
+
+        self.assertTrue(isinstance(raw, passthrough.RawXML))
+        self.assertTrue(b"evil.exe" in raw.data)
+
+        identity = package.threat_actors[0].identity
+        self.assertTrue(isinstance(identity._specification, passthrough.RawXML))
+
+    def test_disabled(self):
+        package = STIXPackage.from_xml(BytesIO(self.xml))
+        tm = package.indicators[0].test_mechanisms[0]
+        self.assertEqual(passthrough.raw_value(tm, OpenIOCTestMechanism.ioc), None)
+
+    def test_export(self):
+        package = self._parse()
+        xml = package.to_xml()
+
+        self.assertTrue(b"evil.exe" in xml)
+        self.assertTrue(b"Foo Inc." in xml)
+
+        # The raw documents are still unparsed.
+        tm = package.indicators[0].test_mechanisms[0]
+        self.assertTrue(passthrough.raw_value(tm, OpenIOCTestMechanism.ioc) is not None)
+
+        # The exported document parses back into the same content.
+        package2 = STIXPackage.from_xml(BytesIO(xml))
+        self.assertEqual(
+            package2.threat_actors[0].identity.to_dict(),
+            _package().threat_actors[0].identity.to_dict()
+        )
+
+    def test_lazy_parse(self):
+        package = self._parse()
+        tm = package.indicators[0].test_mechanisms[0]
+        ioc = tm.ioc
+
+        self.assertTrue(mixbox.xml.is_element(ioc))
+        self.assertEqual(lxml.etree.QName(ioc).localname, "ioc")
+        self.assertEqual(passthrough.raw_value(tm, OpenIOCTestMechanism.ioc), None)
+
+        spec = package.threat_actors[0].identity.specification
+        self.assertEqual(
+            spec.party_name.organisation_names[0].name_elements[0].value,
+            "Foo Inc."
+        )
+
+    def test_maec(self):
+        # Passes through whether or not the maec library is installed.
+        with passthrough.passthrough():
+            package = STIXPackage.from_xml(StringIO(MAEC_PACKAGE))
+
+        xml = package.to_xml()
+        self.assertTrue(b'<stix-maec:MAEC' in xml)
+        self.assertTrue(b'maecPackage:Malware_Subjects' in xml)
+        self.assertTrue(b'schema_version="2.1"' in xml)
+
+    def test_thread_local(self):
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(passthrough.is_passthrough()))
+
+        with passthrough.passthrough():
+            thread.start()
+            thread.join()
+            self.assertTrue(passthrough.is_passthrough())
+
+        self.assertEqual([False], seen)
+
+    def test_to_dict(self):
+        package = self._parse()
+        d = package.to_dict()
+        tm = d['indicators'][0]['test_mechanisms'][0]
+        self.assertTrue(b"evil.exe" in tm['ioc'])
+
+
+if __name__ == "__main__":
+    unittest.main()
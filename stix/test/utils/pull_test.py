@@ -0,0 +1,89 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+import lxml.etree
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage, STIXHeader
+from stix.common import InformationSource
+from stix.exploit_target import ExploitTarget
+from stix.indicator import Indicator
+from stix.ttp import TTP
+
+try:
+    from stix.utils.pull import EntityPullParser, iter_entities
+    pull_present = True
+except ImportError:
+    pull_present = False
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+
+def _package():
+    header = STIXHeader()
+    header.information_source = InformationSource(description="Pull test")
+
+    package = STIXPackage(stix_header=header)
+    package.add(Observable(Address("192.0.2.1")))
+    package.add(ExploitTarget(title="Exploit target"))
+
+    for idx in range(5):
+        package.add(Indicator(title="Indicator %d" % idx))
+        package.add(TTP(title="TTP %d" % idx))
+
+    return package
+
+
+@unittest.skipIf(condition=pull_present is False, reason="These tests require lxml 3.3 or later.")
+class EntityPullParserTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = _package()
+        self.xml = self.package.to_xml()
+        self.expected = STIXPackage.from_xml(BytesIO(self.xml))
+
+    def _expected_ids(self):
+        ids = []
+        for name in ("observables", "indicators", "ttps", "exploit_targets"):
+            ids.extend(x.id_ for x in getattr(self.expected, name))
+        return ids
+
+    def test_iter_entities(self):
+        entities = list(iter_entities(BytesIO(self.xml), chunk_size=100))
+
+        self.assertEqual([x.id_ for x in entities], self._expected_ids())
+        self.assertEqual(entities[1].to_dict(), self.expected.indicators[0].to_dict())
+
+    def test_incremental(self):
+        parser = EntityPullParser()
+        half = self.xml.index(b"</stix:Indicators>")
+
+        first = parser.feed(self.xml[:half])
+        self.assertEqual(parser.id_, self.package.id_)
+        self.assertEqual(parser.stix_header.information_source.description.value, "Pull test")
+        self.assertEqual(len(first), 1 + 5)
+
+        rest = parser.feed(self.xml[half:]) + parser.close()
+        self.assertEqual(len(rest), 5 + 1)
+
+    def test_comments(self):
+        xml = self.xml.replace(
+            b"<indicator:Title>",
+            b"<!-- A comment --><indicator:Title>"
+        )
+        entities = list(iter_entities(BytesIO(xml)))
+
+        self.assertEqual([x.id_ for x in entities], self._expected_ids())
+        self.assertEqual(entities[1].title, "Indicator 0")
+
+    def test_malformed(self):
+        parser = EntityPullParser()
+        parser.feed(self.xml[:-100])
+        self.assertRaises(lxml.etree.XMLSyntaxError, parser.close)
+
+
+if __name__ == "__main__":
+    unittest.main()
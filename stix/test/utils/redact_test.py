@@ -0,0 +1,135 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix.common.kill_chains import KillChain
+from stix.core import STIXPackage, STIXHeader
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.extensions.marking import ais
+
+try:
+    from stix.utils import redact
+    redact_present = True
+except ImportError:
+    redact_present = False
+
+COMPONENT = "../../../descendant-or-self::node()"
+
+
+def _marking(structure, controlled_structure=COMPONENT):
+    spec = MarkingSpecification(controlled_structure=controlled_structure)
+    spec.marking_structures.append(structure)
+
+    handling = Marking()
+    handling.add_marking(spec)
+    return handling
+
+
+def _ais(consent, color):
+    structure = ais.AISMarkingStructure()
+    structure.not_proprietary = ais.NotProprietary(
+        ais_consent=ais.AISConsentType(consent=consent),
+        tlp_marking=ais.TLPMarkingType(color=color)
+    )
+    return structure
+
+
+@unittest.skipIf(condition=redact_present is False, reason="These tests require lxml 3.1 or later.")
+class FilterPackageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage()
+        self.package.stix_header = STIXHeader()
+        self.package.stix_header.handling = _marking(
+            TLPMarkingStructure(color="GREEN"), "//node()"
+        )
+
+        self.white = Indicator(title="white")
+        self.red = Indicator(title="red")
+        self.red.handling = _marking(TLPMarkingStructure(color="RED"))
+        self.usg = TTP(title="usg")
+        self.usg.handling = _marking(_ais("USG", "GREEN"))
+
+        for x in (self.white, self.red, self.usg):
+            self.package.add(x)
+
+    def _filter(self, *recipients):
+        doc = BytesIO(self.package.to_xml())
+        counts = redact.filter_package(doc, recipients)
+
+        parsed = []
+        for recipient in recipients:
+            recipient.output.seek(0)
+            parsed.append(STIXPackage.from_xml(recipient.output))
+
+        return counts, parsed
+
+    def _ids(self, package):
+        ids = [x.id_ for x in package.indicators or ()]
+        ids.extend(x.id_ for x in package.ttps or ())
+        return sorted(ids)
+
+    def test_filter(self):
+        green = redact.Recipient(BytesIO(), tlp="GREEN")
+        red = redact.Recipient(BytesIO(), tlp="RED", ais_consent="USG")
+        counts, (green_pkg, red_pkg) = self._filter(green, red)
+
+        self.assertEqual(1, counts[green])
+        self.assertEqual(3, counts[red])
+        self.assertEqual([self.white.id_], self._ids(green_pkg))
+        self.assertEqual(
+            sorted([self.white.id_, self.red.id_, self.usg.id_]),
+            self._ids(red_pkg)
+        )
+        self.assertEqual(1, len(green_pkg.stix_header.handling))
+
+    def test_empty_collections_dropped(self):
+        white = redact.Recipient(BytesIO(), tlp="WHITE")
+        counts, (white_pkg,) = self._filter(white)
+
+        self.assertEqual(0, counts[white])
+        self.assertEqual([], self._ids(white_pkg))
+
+    def test_kill_chains(self):
+        # Kill_Chains fall under the header's GREEN marking, but are not
+        # top-level components.
+        kill_chain = KillChain(name="Kill chain")
+        self.package.ttps.kill_chains.append(kill_chain)
+
+        white = redact.Recipient(BytesIO(), tlp="WHITE")
+        green = redact.Recipient(BytesIO(), tlp="GREEN")
+        counts, (white_pkg, green_pkg) = self._filter(white, green)
+
+        self.assertEqual(0, counts[white])
+        self.assertEqual(1, counts[green])
+
+        for package in (white_pkg, green_pkg):
+            self.assertEqual([kill_chain.id_], [x.id_ for x in package.ttps.kill_chains])
+
+    def test_same_clearance(self):
+        first = redact.Recipient(BytesIO(), tlp="AMBER")
+        second = redact.Recipient(BytesIO(), tlp="amber")
+        self._filter(first, second)
+
+        self.assertEqual(first.output.getvalue(), second.output.getvalue())
+
+    def test_restrictions(self):
+        self.assertEqual((0, 0), redact.restrictions([]))
+        self.assertEqual((2, 0), redact.restrictions([], default_tlp="AMBER"))
+
+        structures = [TLPMarkingStructure(color="GREEN"), _ais("NONE", "AMBER")]
+        self.assertEqual((2, 2), redact.restrictions(structures))
+
+    def test_invalid_clearance(self):
+        recipient = redact.Recipient(BytesIO(), tlp="ORANGE")
+        self.assertRaises(ValueError, self._filter, recipient)
+
+
+if __name__ == "__main__":
+    unittest.main()
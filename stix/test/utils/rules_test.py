@@ -0,0 +1,160 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import base64
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import lxml.etree
+import mixbox.xml
+from mixbox.vendor.six import BytesIO, StringIO
+
+from stix.common import EncodedCDATA
+from stix.core import STIXPackage
+from stix.extensions.test_mechanism.open_ioc_2010_test_mechanism import OpenIOCTestMechanism
+from stix.extensions.test_mechanism.snort_test_mechanism import SnortTestMechanism
+from stix.extensions.test_mechanism.yara_test_mechanism import YaraTestMechanism
+from stix.indicator import Indicator
+from stix.ttp import TTP
+
+try:
+    from stix.utils import rules
+    rules_present = True
+except ImportError:
+    rules_present = False
+
+
+SNORT_RULE = 'alert tcp any any -> any any (msg:"Test"; sid:1000001;)'
+YARA_RULE = 'rule test { strings: $a = "evil" condition: $a }'
+IOC = """<ioc xmlns="http://schemas.mandiant.com/2010/ioc" id="ioc-1">
+  <definition>
+    <Indicator operator="OR" id="ioc-2"/>
+  </definition>
+</ioc>"""
+
+
+def _snort(rule, encoded=False):
+    tm = SnortTestMechanism()
+
+    if encoded:
+        rule = base64.b64encode(rule.encode("utf-8")).decode("ascii")
+
+    tm.rules = [EncodedCDATA(rule, encoded=encoded)]
+    tm.event_filters = [EncodedCDATA("event_filter gen_id 1, sig_id 1000001")]
+    return tm
+
+
+def _package():
+    package = STIXPackage()
+
+    first = Indicator(title="First")
+    first.add_test_mechanism(_snort(SNORT_RULE))
+
+    yara = YaraTestMechanism()
+    yara.rule = EncodedCDATA(YARA_RULE)
+    first.add_test_mechanism(yara)
+
+    ioc = OpenIOCTestMechanism()
+    ioc.ioc = lxml.etree.parse(StringIO(IOC), parser=mixbox.xml.get_xml_parser())
+    first.add_test_mechanism(ioc)
+
+    # The same Snort rule, base64 encoded, in a second indicator.
+    second = Indicator(title="Second")
+    second.add_test_mechanism(_snort(SNORT_RULE, encoded=True))
+
+    package.add(first)
+    package.add(TTP(title="TTP"))
+    package.add(second)
+    return package
+
+
+@unittest.skipIf(condition=rules_present is False, reason="These tests require lxml 3.0 or later.")
+class ExtractRulesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = _package()
+        self.ids = [x.id_ for x in self.package.indicators]
+        self.xml = self.package.to_xml()
+
+    def test_extract(self):
+        bundles = rules.extract_rules(BytesIO(self.xml))
+
+        self.assertEqual(list(bundles), list(rules.ENGINES))
+        self.assertEqual(len(bundles[rules.SNORT]), 2)
+        self.assertEqual(bundles[rules.SNORT].indicators(SNORT_RULE), self.ids)
+        self.assertEqual(bundles[rules.YARA].indicators(YARA_RULE), self.ids[:1])
+        self.assertEqual(len(bundles[rules.OVAL]), 0)
+
+        ioc, ids = list(bundles[rules.OPENIOC])[0]
+        self.assertEqual(ids, self.ids[:1])
+        self.assertTrue('id="ioc-2"' in ioc)
+
+    def test_comments(self):
+        xml = self.xml.replace(b'id="ioc-2"/>', b'id="ioc-2"/><!-- A comment -->')
+        bundles = rules.extract_rules(BytesIO(xml))
+
+        ioc, _ = list(bundles[rules.OPENIOC])[0]
+        self.assertTrue('id="ioc-2"' in ioc)
+        self.assertFalse("A comment" in ioc)
+
+    def test_accumulate(self):
+        bundles = rules.extract_rules(BytesIO(self.xml))
+        rules.extract_rules(BytesIO(self.xml), bundles)
+        self.assertEqual(len(bundles[rules.SNORT]), 2)
+        self.assertEqual(bundles[rules.SNORT].indicators(SNORT_RULE), self.ids)
+
+
+@unittest.skipIf(condition=rules_present is False, reason="These tests require lxml 3.0 or later.")
+class ExtractRulesManyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+
+        for idx in range(2):
+            path = os.path.join(self.directory, "package-%d.xml" % idx)
+
+            with open(path, "wb") as f:
+                f.write(_package().to_xml())
+
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _check(self, bundles):
+        self.assertEqual(len(bundles[rules.SNORT]), 2)
+        self.assertEqual(len(bundles[rules.YARA]), 1)
+        self.assertEqual(len(bundles[rules.SNORT].indicators(SNORT_RULE)), 4)
+
+    def test_serial(self):
+        self._check(rules.extract_rules_many(self.paths, processes=1))
+
+    def test_parallel(self):
+        self._check(rules.extract_rules_many(self.paths, processes=2))
+
+    def test_write_bundles(self):
+        bundles = rules.extract_rules_many(self.paths, processes=1)
+        out = os.path.join(self.directory, "out")
+        paths = rules.write_bundles(bundles, out)
+
+        self.assertEqual(len(paths), 4)
+
+        with open(os.path.join(out, "snort.rules")) as f:
+            text = f.read()
+
+        self.assertTrue(SNORT_RULE in text)
+        self.assertTrue(text.startswith("# indicators: "))
+
+        with open(os.path.join(out, "index.json")) as f:
+            index = json.load(f)
+
+        self.assertEqual(sorted(index), ["openioc", "snort", "yara"])
+        self.assertTrue(os.path.exists(os.path.join(out, index["openioc"][0]["file"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
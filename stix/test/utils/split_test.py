@@ -0,0 +1,95 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox import idgen
+from mixbox.namespaces import Namespace
+from mixbox.vendor.six import BytesIO
+
+from stix.core import STIXPackage, STIXHeader
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils.split import split_package
+
+
+def _package(count):
+    package = STIXPackage()
+    package.stix_header = STIXHeader()
+    package.stix_header.handling = Marking()
+
+    spec = MarkingSpecification()
+    spec.controlled_structure = "//node() | //@*"
+    spec.marking_structures.append(TLPMarkingStructure(color="GREEN"))
+    package.stix_header.handling.add_marking(spec)
+
+    for x in range(count):
+        ttp = TTP(title="TTP %d" % x)
+        indicator = Indicator(title="Indicator %d" % x)
+        indicator.add_indicated_ttp(TTP(idref=ttp.id_))
+        package.add(indicator)
+        package.add(ttp)
+
+    return package
+
+
+class SplitTests(unittest.TestCase):
+
+    def test_max_objects(self):
+        package = _package(5)
+        parts = [STIXPackage.from_xml(BytesIO(x)) for x in split_package(package, max_objects=2)]
+
+        self.assertEqual(5, len(parts))
+
+        ids = set()
+        for part in parts:
+            self.assertEqual(1, len(part.indicators))
+            self.assertEqual(1, len(part.ttps))
+            self.assertEqual("GREEN", part.stix_header.handling[0].marking_structures[0].color)
+
+            # Each indicator is kept with the TTP it references.
+            indicated = part.indicators[0].indicated_ttps[0].item
+            self.assertEqual(indicated.idref, part.ttps[0].id_)
+            ids.add(part.indicators[0].id_)
+
+        self.assertEqual(set(x.id_ for x in package.indicators), ids)
+        self.assertEqual(5, len(set(x.id_ for x in parts)))
+
+    def test_max_bytes(self):
+        package = _package(20)
+        parts = list(split_package(BytesIO(package.to_xml()), max_bytes=4096, window=8))
+
+        self.assertTrue(len(parts) > 1)
+        self.assertTrue(all(len(x) <= 4096 for x in parts))
+
+        count = sum(len(STIXPackage.from_xml(BytesIO(x)).indicators or ()) for x in parts)
+        self.assertEqual(20, count)
+
+    def test_empty(self):
+        parts = list(split_package(STIXPackage(), max_objects=10))
+        self.assertEqual(1, len(parts))
+        self.assertFalse(STIXPackage.from_xml(BytesIO(parts[0])).indicators)
+
+    def test_namespace(self):
+        idgen.set_id_namespace(Namespace("http://acme.example.com", "acme"))
+
+        try:
+            xml = _package(3).to_xml()
+        finally:
+            idgen.set_id_namespace(idgen.EXAMPLE_NAMESPACE)
+
+        xml = xml.replace(b"<indicator:Title>", b"<!-- A comment --><indicator:Title>")
+        parts = [STIXPackage.from_xml(BytesIO(x)) for x in split_package(BytesIO(xml), max_objects=2)]
+
+        self.assertEqual(3, len(parts))
+        self.assertTrue(all(x.id_.startswith("acme:Package-") for x in parts))
+        self.assertEqual(3, len(set(x.id_ for x in parts)))
+
+    def test_requires_limit(self):
+        self.assertRaises(ValueError, list, split_package(STIXPackage()))
+
+
+if __name__ == "__main__":
+    unittest.main()
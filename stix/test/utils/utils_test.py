@@ -2,10 +2,18 @@
 # See LICENSE.txt for complete terms.
 
 # stdlib
+import os
+import threading
 import unittest
 
+# external
+from mixbox import binding_utils
+from mixbox.vendor import six
+
 # internal
 from stix import utils
+from stix.core import STIXPackage
+from stix.indicator import Indicator
 
 
 class UtilsTests(unittest.TestCase):
@@ -17,3 +25,73 @@ class UtilsTests(unittest.TestCase):
 
         # Make sure that strings are not sequences.
         self.assertEqual(False, utils.is_sequence("abc"))
+
+
+def _packages(count):
+    packages = []
+
+    for idx in range(count):
+        package = STIXPackage()
+        package.add(Indicator(title=u"Indicator \u00e9 %d" % idx))
+        packages.append(package)
+
+    return packages
+
+
+class ToXMLManyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.packages = _packages(6)
+        self.expected = [x.to_xml() for x in self.packages]
+
+    def test_thread(self):
+        result = utils.to_xml_many(self.packages, workers=3)
+        self.assertEqual(self.expected, result)
+
+    @unittest.skipIf(not hasattr(os, "fork"), "The process executor requires os.fork()")
+    def test_process(self):
+        result = utils.to_xml_many(self.packages, workers=2, executor="process")
+        self.assertEqual(self.expected, result)
+        self.assertEqual(None, utils._WORKER)
+
+    def test_kwargs(self):
+        result = utils.to_xml_many(self.packages, workers=2, encoding=None)
+        self.assertEqual([x.decode("utf-8") for x in self.expected], result)
+
+    def test_invalid_executor(self):
+        self.assertRaises(ValueError, utils.to_xml_many, self.packages, executor="fiber")
+
+    @unittest.skipIf(not six.PY2, "Python 3 bindings do not decode byte strings")
+    def test_byte_strings(self):
+        package = STIXPackage()
+        package.add(Indicator(title=u"\u00e9".encode("latin-1")))
+
+        xml = package.to_xml(encoding="latin-1")
+        self.assertTrue(u"<indicator:Title>\u00e9</indicator:Title>" in xml.decode("latin-1"))
+        self.assertEqual("utf-8", binding_utils.ExternalEncoding)
+
+    def test_concurrent_encodings(self):
+        # to_xml() must not change the global encoding used to decode byte
+        # strings, nor be affected by other threads' output encodings.
+        original = binding_utils.ExternalEncoding
+        encodings = ["utf-8", "utf-16", None, "latin-1"]
+        results = {}
+
+        def serialize(encoding):
+            for package in self.packages:
+                results.setdefault(encoding, []).append(package.to_xml(encoding=encoding))
+
+        threads = [threading.Thread(target=serialize, args=(x,)) for x in encodings]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(original, binding_utils.ExternalEncoding)
+
+        for encoding in encodings:
+            decoded = [x.decode(encoding) if encoding else x for x in results[encoding]]
+            self.assertEqual([x.decode("utf-8") for x in self.expected], decoded)
+
@@ -49,7 +49,7 @@ class MalwareInstance(stix.Entity):
         """
         if self.descriptions is None:
             self.descriptions = StructuredTextList()
-        return next(iter(self.descriptions), None)
+        return self.descriptions.first
 
     @description.setter
     def description(self, value):
@@ -78,7 +78,7 @@ class MalwareInstance(stix.Entity):
         """
         if self.short_descriptions is None:
             self.short_descriptions = []
-        return next(iter(self.short_descriptions), None)
+        return self.short_descriptions.first
 
     @short_description.setter
     def short_description(self, value):
@@ -4,13 +4,18 @@
 import contextlib
 import functools
 import keyword
+import os
+import re
+import threading
 import warnings
 
 import lxml.etree
 
+from mixbox import binding_utils
 from mixbox.entities import Entity, EntityList
 import mixbox.xml
-from mixbox.vendor.six import iteritems, string_types
+from mixbox.vendor import six
+from mixbox.vendor.six import iteritems, string_types, text_type
 
 import stix
 
@@ -22,6 +27,20 @@ CDATA_START = "<![CDATA["
 CDATA_END = "]]>"
 CONFLICTING_NAMES = keyword.kwlist + ['id', 'type', 'range']
 
+# The predefined XML entities, which are unescaped outside of CDATA blocks.
+_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+_ENTITY = re.compile(r"&(amp|lt|gt|quot|apos);")
+
+# Text outside of CDATA blocks which the scanner in strip_cdata() leaves to
+# the XML parser: markup, character references and other entities, and
+# characters which XML parsers normalize or reject.
+_NEEDS_PARSER = re.compile(
+    u"<|]]>|&(?!(?:amp|lt|gt|quot|apos);)|[\x00-\x08\x0b\x0c\x0e-\x1f\r\ufffe\uffff\ud800-\udfff]"
+)
+
+# Characters which XML parsers reject even inside CDATA blocks.
+_ILLEGAL_CHARS = re.compile(u"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff\ud800-\udfff]")
+
 
 @contextlib.contextmanager
 def ignored(*exceptions):
@@ -104,11 +123,85 @@ def strip_cdata(text):
     if not is_cdata(text):
         return text
 
+    stripped = _scan_cdata(text)
+
+    if stripped is None:
+        return _parse_cdata(text)
+
+    return stripped
+
+
+def _parse_cdata(text):
     xml = "<e>{0}</e>".format(text)
     node = lxml.etree.fromstring(xml)
     return node.text
 
 
+def _scan_cdata(text):
+    """Removes the CDATA blocks from `text` without parsing it as XML.
+
+    Returns:
+        The stripped text, or ``None`` if `text` must be parsed to give the
+        same result (or error) as the XML parser.
+
+    """
+    if "\r" in text:
+        return None
+
+    if not isinstance(text, text_type):
+        # Python 2 byte strings are parsed as UTF-8.
+        try:
+            text.decode("ascii")
+        except UnicodeDecodeError:
+            return None
+
+    parts = []
+    pos = 0
+    end = len(text)
+
+    while pos < end:
+        start = text.find(CDATA_START, pos)
+        stop = end if start == -1 else start
+
+        if stop > pos:
+            segment = text[pos:stop]
+
+            if _NEEDS_PARSER.search(segment):
+                return None
+
+            if "&" in segment:
+                segment = _ENTITY.sub(lambda m: _ENTITIES[m.group(1)], segment)
+
+            parts.append(segment)
+
+        if start == -1:
+            break
+
+        start += len(CDATA_START)
+        pos = text.find(CDATA_END, start)
+
+        if pos == -1:
+            return None  # Unterminated.
+
+        content = text[start:pos]
+
+        if _ILLEGAL_CHARS.search(content):
+            return None
+
+        parts.append(content)
+        pos += len(CDATA_END)
+
+    return "".join(parts)
+
+
+def strip_cdata_many(texts):
+    """Returns a list of the values of :func:`strip_cdata` for each item of
+    `texts`.
+
+    """
+    return [strip_cdata(x) for x in texts]
+
+
 def cdata(text):
     """Wraps the input `text` in a ``<![CDATA[ ]]>`` block.
 
@@ -132,6 +225,20 @@ def cdata(text):
     return escaped
 
 
+def cdata_many(texts):
+    """Returns a list of the values of :func:`cdata` for each item of
+    `texts`.
+
+    """
+    texts = list(texts)
+    stripped = strip_cdata_many(texts)
+
+    return [
+        "{0}{1}{2}".format(CDATA_START, x, CDATA_END) if text else text
+        for text, x in zip(texts, stripped)
+    ]
+
+
 def is_stix(entity):
     """Returns true if `entity` is an instance of :class:`.Entity`."""
     return isinstance(entity, stix.Entity)
@@ -328,6 +435,127 @@ def to_dict(entity, skip=()):
     return d
 
 
+#: Executors accepted by :func:`to_xml_many`.
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+# Held while binding_utils.ExternalEncoding is set by save_encoding().
+_ENCODING_LOCK = threading.RLock()
+
+# The entities and to_xml() arguments of a process pool worker. This is only
+# set in the worker processes.
+_WORKER = None
+
+
+@contextlib.contextmanager
+def save_encoding(encoding):
+    """Returns a context manager which sets the character encoding used to
+    decode byte string field values during an export.
+
+    This is a thread-safe form of ``mixbox.binding_utils.save_encoding()``.
+    On Python 2, ``binding_utils.ExternalEncoding`` is set for the duration
+    of the ``with`` block while holding a lock, so exports within such
+    blocks run one at a time. Python 3 bindings do not decode byte strings,
+    so nothing is set there.
+
+    Args:
+        encoding: The character encoding. If ``None``, ``utf-8`` is used.
+
+    """
+    if not six.PY2:
+        yield
+        return
+
+    with _ENCODING_LOCK:
+        with binding_utils.save_encoding(encoding or "utf-8"):
+            yield
+
+
+def _to_xml(entity, kwargs):
+    return entity.to_xml(**kwargs)
+
+
+def _init_worker(entities, kwargs):
+    global _WORKER
+    _WORKER = (entities, kwargs)
+
+
+def _to_xml_worker(idx):
+    entities, kwargs = _WORKER
+    return entities[idx].to_xml(**kwargs)
+
+
+def _fork_pool(processes, entities, kwargs):
+    import multiprocessing
+
+    if not hasattr(os, "fork"):
+        raise ValueError("The process executor requires os.fork().")
+
+    try:
+        context = multiprocessing.get_context("fork")
+    except AttributeError:
+        # Python 2 always forks.
+        context = multiprocessing
+
+    # Forked workers inherit the initializer arguments rather than
+    # unpickling them, since entities cannot be pickled.
+    return context.Pool(processes, initializer=_init_worker, initargs=(entities, kwargs))
+
+
+def to_xml_many(entities, workers=None, executor=THREAD_EXECUTOR, **kwargs):
+    """Serializes each of `entities` to XML.
+
+    Each entity is serialized with ``to_xml(**kwargs)``, which is
+    thread-safe. Threads allow several serializations to be in progress at
+    once (e.g., in a service which serializes packages for many clients),
+    but do not run Python code in parallel. Processes do: they are forked
+    from this process, so the entities are not copied to the workers, and
+    only the serialized documents are sent back.
+
+    Args:
+        entities: An iterable of :class:`stix.Entity` objects.
+        workers: The number of threads or processes. If ``None``, the
+            number of CPUs is used. If ``1``, the entities are serialized in
+            the calling thread.
+        executor: ``"thread"`` or ``"process"``.
+        **kwargs: Keyword arguments passed to ``to_xml()``.
+
+    Returns:
+        A list of the XML documents, in the order of `entities`.
+
+    Raises:
+        ValueError: If `executor` is not ``"thread"`` or ``"process"``, or
+            is ``"process"`` and this platform cannot fork processes.
+
+    """
+    if executor not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+        error = "Unknown executor '{0}'. Expected '{1}' or '{2}'."
+        raise ValueError(error.format(executor, THREAD_EXECUTOR, PROCESS_EXECUTOR))
+
+    entities = list(entities)
+
+    if workers == 1 or len(entities) < 2:
+        return [x.to_xml(**kwargs) for x in entities]
+
+    if executor == THREAD_EXECUTOR:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(workers)
+
+        try:
+            return pool.map(functools.partial(_to_xml, kwargs=kwargs), entities)
+        finally:
+            pool.close()
+            pool.join()
+
+    pool = _fork_pool(workers, entities, kwargs)
+
+    try:
+        return pool.map(_to_xml_worker, range(len(entities)))
+    finally:
+        pool.close()
+        pool.join()
+
+
 def xml_bool(value):
     """Returns ``True`` if `value` is an acceptable xs:boolean ``True`` value.
     Returns ``False`` if `value` is an acceptable xs:boolean ``False`` value.
@@ -381,3 +609,4 @@ from .nsparser import *  # noqa
 from .dates import *  # noqa
 from .parser import *  # noqa
 from .walk import *  # noqa
+from .changes import diff  # noqa
@@ -0,0 +1,292 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for computing the structural differences between two versions of
+a STIX package.
+
+Top-level components are aligned by ``id`` (or by content fingerprint for
+components without an ``id``), and then compared field by field. Subtrees
+with equal fingerprints are skipped without being visited.
+
+Field paths use the same attribute names as :func:`stix.utils.iterpath`,
+joined by ``.``, with ``[n]`` for positions in multi-valued fields.
+
+When diffing successive snapshots of a feed, pass the same `digests`
+dictionary to each call. Component digests are then kept by component
+version (``id`` and ``timestamp``), so only components which changed since
+the previous snapshot are hashed.
+
+Example:
+    >>> from stix.utils import diff
+    >>> for change in diff(yesterday, today):
+    ...     print(change)
+    modified example:indicator-1c4a... title: 'Old' -> 'New'
+    >>> digests = {}
+    >>> changes = diff(monday, tuesday, digests=digests)
+    >>> changes = diff(tuesday, wednesday, digests=digests)
+
+"""
+
+# external
+import mixbox.xml
+from mixbox import entities
+from mixbox.vendor.six import iteritems
+
+# relative
+from . import is_sequence
+from .fingerprint import COLLECTIONS, Fingerprinter
+
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+_ATTR_NAMES = {}
+
+
+class Change(object):
+    """A single difference between two package versions.
+
+    Attributes:
+        kind: One of :data:`ADDED`, :data:`REMOVED` or :data:`MODIFIED`.
+        id_: The id of the top-level component which changed. This is
+            ``None`` for changes to the ``STIX_Header`` and to top-level
+            components without an id.
+        path: The path of the changed field within the component, or ``None``
+            if an entire component was added or removed.
+        old: The old value, or ``None``.
+        new: The new value, or ``None``.
+
+    """
+    __slots__ = ("kind", "id_", "path", "old", "new")
+
+    def __init__(self, kind, id_, path=None, old=None, new=None):
+        self.kind = kind
+        self.id_ = id_
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return "Change(%r, %r, %r)" % (self.kind, self.id_, self.path)
+
+    def __str__(self):
+        text = "%s %s" % (self.kind, self.id_)
+
+        if self.path:
+            text += " %s: %r -> %r" % (self.path, self.old, self.new)
+
+        return text
+
+
+def _attr_names(klass):
+    """Returns a list of ``(attribute name, TypedField)`` tuples for the
+    entity class `klass`.
+
+    """
+    try:
+        return _ATTR_NAMES[klass]
+    except KeyError:
+        pass
+
+    names = sorted(klass.typed_fields_with_attrnames(), key=lambda x: x[0])
+    _ATTR_NAMES[klass] = names
+    return names
+
+
+def _join(path, name):
+    if isinstance(name, int):
+        return "%s[%d]" % (path, name)
+
+    return "%s.%s" % (path, name) if path else name
+
+
+def _is_empty(value):
+    return value is None or (is_sequence(value) and not value)
+
+
+def _is_list(value):
+    return is_sequence(value) and not mixbox.xml.is_element(value)
+
+
+class _Differ(object):
+    def __init__(self, fingerprinter, digests=None):
+        self.fp = fingerprinter
+        self.digests = digests
+        self.changes = []
+
+    def changed(self, old, new):
+        return self.fp.digest(old) != self.fp.digest(new)
+
+    def version_digest(self, component):
+        """Returns the digest of the top-level `component`, looked up by its
+        class, id and timestamp in :attr:`digests` if possible.
+
+        """
+        digests = self.digests
+        timestamp = getattr(component, "timestamp", None)
+
+        if digests is None or not timestamp:
+            return self.fp.digest(component)
+
+        key = (type(component), component.id_, timestamp)
+        digest = digests.get(key)
+
+        if digest is None:
+            # Hash with a new memo, so that the digests do not keep the
+            # snapshot alive.
+            fp = type(self.fp)(ignore=self.fp.ignore, ordered=self.fp.ordered)
+            digest = digests[key] = fp.digest(component)
+
+        return digest
+
+    def compare_component(self, id_, old, new):
+        if self.version_digest(old) != self.version_digest(new):
+            self.compare(id_, None, old, new)
+
+    def compare(self, id_, path, old, new):
+        if not self.changed(old, new):
+            return
+
+        if isinstance(old, entities.Entity) and type(old) is type(new):
+            self.compare_fields(id_, path, old, new)
+        elif _is_list(old) and _is_list(new):
+            self.compare_items(id_, path, old, new)
+        else:
+            self.changes.append(Change(MODIFIED, id_, path, old, new))
+
+    def compare_fields(self, id_, path, old, new):
+        for name, field in _attr_names(type(old)):
+            ov = old._fields.get(field)
+            nv = new._fields.get(field)
+
+            if _is_empty(ov) and _is_empty(nv):
+                continue
+
+            self.compare(id_, _join(path, name), ov, nv)
+
+    def compare_items(self, id_, path, old, new):
+        """Compares the items of two multi-valued fields. Items present in
+        both are ignored. The remaining items are compared pairwise if the
+        same number of items changed on each side.
+
+        """
+        digest = self.fp.digest
+        unmatched = {}
+
+        for item in old:
+            unmatched.setdefault(digest(item), []).append(item)
+
+        remaining = []
+        for idx, item in enumerate(new):
+            matches = unmatched.get(digest(item))
+
+            if matches:
+                matches.pop()
+            else:
+                remaining.append((idx, item))
+
+        removed = [x for items in unmatched.values() for x in items]
+
+        if len(removed) != len(remaining):
+            self.changes.append(Change(MODIFIED, id_, path, old, new))
+            return
+
+        # Keep the document order of the old items.
+        order = dict((id(x), pos) for pos, x in enumerate(old))
+        removed.sort(key=lambda x: order[id(x)])
+
+        for old_item, (idx, new_item) in zip(removed, remaining):
+            self.compare(id_, _join(path, idx), old_item, new_item)
+
+
+def _split(package, fp):
+    """Returns dictionaries of the top-level components of `package` with
+    ids, keyed by id, and without ids, keyed by fingerprint.
+
+    """
+    by_id = {}
+    anonymous = {}
+
+    for name in COLLECTIONS:
+        collection = getattr(package, name, None)
+
+        for component in collection or ():
+            if component.id_:
+                by_id[component.id_] = component
+            else:
+                anonymous[fp.digest(component)] = component
+
+    return by_id, anonymous
+
+
+def diff(old, new, fingerprinter=None, digests=None):
+    """Returns the differences between the `old` and `new` versions of a
+    :class:`.STIXPackage`.
+
+    Args:
+        old: The old :class:`.STIXPackage`.
+        new: The new :class:`.STIXPackage`.
+        fingerprinter: An optional :class:`.Fingerprinter` to use. It
+            should not ignore any fields (e.g., ``Fingerprinter(ignore=())``),
+            otherwise changes to the ignored fields are not reported. By
+            default, a new :class:`.Fingerprinter` is used for this call
+            only.
+        digests: An optional dictionary of top-level component digests,
+            keyed by component class, id and timestamp. It is filled in by
+            this call; pass the same dictionary (and the same `fingerprinter`
+            settings) when diffing the next snapshot. Components whose id
+            and timestamp are unchanged are then compared without being
+            hashed. This assumes that a component is given a new timestamp
+            whenever its content changes, as STIX versioning requires.
+
+    Note:
+        A :class:`.Fingerprinter` memoizes hashes by object identity, so a
+        passed-in instance only saves work for objects it has already
+        hashed (not for reparsed snapshots), keeps those objects alive, and
+        returns stale hashes for objects modified in place since. Call its
+        ``clear()`` method between snapshots if either package may have
+        been modified.
+
+    Returns:
+        A list of :class:`Change` objects. Added and removed components
+        are reported first, followed by modified fields.
+
+    """
+    fp = fingerprinter
+
+    if fp is None:
+        fp = Fingerprinter(ignore=())
+
+    differ = _Differ(fp, digests)
+    changes = differ.changes
+
+    old_by_id, old_anon = _split(old, fp)
+    new_by_id, new_anon = _split(new, fp)
+
+    for id_, component in iteritems(new_by_id):
+        if id_ not in old_by_id:
+            changes.append(Change(ADDED, id_, new=component))
+
+    for id_, component in iteritems(old_by_id):
+        if id_ not in new_by_id:
+            changes.append(Change(REMOVED, id_, old=component))
+
+    for digest, component in iteritems(new_anon):
+        if digest not in old_anon:
+            changes.append(Change(ADDED, None, new=component))
+
+    for digest, component in iteritems(old_anon):
+        if digest not in new_anon:
+            changes.append(Change(REMOVED, None, old=component))
+
+    differ.compare(None, "stix_header", old.stix_header, new.stix_header)
+
+    for id_, component in iteritems(new_by_id):
+        previous = old_by_id.get(id_)
+
+        if previous is not None:
+            differ.compare_component(id_, previous, component)
+
+    return changes
@@ -0,0 +1,349 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Transparent gzip, bz2 and xz compression of STIX documents.
+
+Compressed input is detected by file extension (``.gz``, ``.bz2``, ``.xz``)
+or by the magic bytes at the start of the data, and is decompressed as it is
+read: :meth:`.EntityParser.parse_xml` (and so ``STIXPackage.from_xml()``)
+and :func:`stix.utils.pull.iter_entities` pass the parser a decompressing
+file object, so neither the compressed nor the decompressed document is
+held in memory.
+
+:class:`.PackageWriter` and :class:`.JSONPackageWriter` accept a
+`compression` argument (or a filename whose extension names one) and
+compress the package as it is written.
+
+Example:
+    >>> from stix.core import STIXPackage
+    >>> from stix.core.writer import PackageWriter
+    >>> package = STIXPackage.from_xml("archive/feed.xml.xz")
+    >>> with PackageWriter("out/feed.xml.gz") as writer:
+    ...     writer.write_all(package.indicators)
+
+"""
+
+# stdlib
+import bz2
+import contextlib
+import gzip
+import io
+import os
+
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+# external
+from mixbox.vendor import six
+
+# internal
+import mixbox.xml
+
+
+GZIP = "gzip"
+BZ2 = "bz2"
+XZ = "xz"
+
+#: The supported compression formats.
+FORMATS = (GZIP, BZ2, XZ)
+
+#: File extensions and the compression formats they imply.
+EXTENSIONS = {
+    ".gz": GZIP,
+    ".gzip": GZIP,
+    ".bz2": BZ2,
+    ".xz": XZ,
+}
+
+#: The number of compressed bytes read at a time.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_MAGIC = (
+    (b"\x1f\x8b", GZIP),
+    (b"BZh", BZ2),
+    (b"\xfd7zXZ\x00", XZ),
+)
+
+_MAGIC_SIZE = max(len(x) for x, _ in _MAGIC)
+
+
+def _check(compression):
+    if compression not in FORMATS:
+        error = "Unknown compression '{0}'. Expected one of {1}."
+        raise ValueError(error.format(compression, FORMATS))
+
+    if compression == XZ and lzma is None:
+        raise ValueError("xz compression requires the lzma module (Python 3.3+).")
+
+
+def from_extension(filename):
+    """Returns the compression format implied by the extension of
+    `filename`, or ``None``.
+
+    """
+    lower = filename.lower()
+
+    for extension, compression in EXTENSIONS.items():
+        if lower.endswith(extension):
+            return compression
+
+    return None
+
+
+def from_magic(data):
+    """Returns the compression format whose magic bytes `data` starts with,
+    or ``None``.
+
+    """
+    if not isinstance(data, six.binary_type):
+        return None
+
+    for magic, compression in _MAGIC:
+        if data.startswith(magic):
+            return compression
+
+    return None
+
+
+class _Prefixed(object):
+    """A file-like object which reads `head` and then the rest of `fileobj`.
+    Used to put back the bytes read from non-seekable files to detect their
+    compression.
+
+    """
+    def __init__(self, head, fileobj):
+        self._head = head
+        self._fileobj = fileobj
+
+    def read(self, size=-1):
+        head = self._head
+
+        if not head:
+            return self._fileobj.read(size)
+
+        if size is None or size < 0:
+            self._head = head[:0]
+            return head + self._fileobj.read()
+
+        if size <= len(head):
+            self._head = head[size:]
+            return head[:size]
+
+        self._head = head[:0]
+        return head + self._fileobj.read(size - len(head))
+
+    def close(self):
+        pass
+
+
+def _peek(fileobj):
+    """Returns ``(head, fileobj)``, where `head` is the first bytes of
+    `fileobj` and `fileobj` reads from the start of the data.
+
+    """
+    try:
+        position = fileobj.tell()
+        head = fileobj.read(_MAGIC_SIZE)
+        fileobj.seek(position)
+    except (AttributeError, IOError, OSError, ValueError):
+        head = fileobj.read(_MAGIC_SIZE)
+        fileobj = _Prefixed(head, fileobj)
+
+    return head, fileobj
+
+
+class _StreamReader(object):
+    """Decompresses `fileobj` with decompressors made by `factory` as it is
+    read. Concatenated streams are read in turn.
+
+    Used where the standard library file classes cannot read file objects
+    (``bz2.BZ2File`` on Python 2).
+
+    """
+    def __init__(self, fileobj, factory):
+        self._fileobj = fileobj
+        self._factory = factory
+        self._decompressor = factory()
+        self._buffer = b""
+        self._eof = False
+
+    def _fill(self):
+        data = self._fileobj.read(DEFAULT_CHUNK_SIZE)
+
+        if not data:
+            self._eof = True
+            return
+
+        chunks = [self._buffer]
+
+        while data:
+            chunks.append(self._decompressor.decompress(data))
+            data = self._decompressor.unused_data
+
+            if data:
+                # The start of another stream.
+                self._decompressor = self._factory()
+
+        self._buffer = b"".join(chunks)
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            self._fill()
+
+        if size is None or size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+    def close(self):
+        self._buffer = b""
+
+
+class _StreamWriter(object):
+    """Compresses the data written to it with `compressor` into `fileobj`.
+    Closing it finishes the stream, but does not close `fileobj`.
+
+    """
+    def __init__(self, fileobj, compressor):
+        self._fileobj = fileobj
+        self._compressor = compressor
+
+    def write(self, data):
+        compressed = self._compressor.compress(data)
+
+        if compressed:
+            self._fileobj.write(compressed)
+
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._compressor is not None:
+            self._fileobj.write(self._compressor.flush())
+            self._compressor = None
+
+
+def decompressing(fileobj, compression):
+    """Returns a file-like object which reads the decompressed data of the
+    binary file-like object `fileobj`. Closing it does not close `fileobj`.
+
+    Raises:
+        ValueError: If `compression` is not one of :data:`FORMATS`, or is
+            not supported by this Python.
+
+    """
+    _check(compression)
+
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+
+    if compression == XZ:
+        return lzma.LZMAFile(fileobj, mode="rb")
+
+    if six.PY2:
+        return _StreamReader(fileobj, bz2.BZ2Decompressor)
+
+    return bz2.BZ2File(fileobj, mode="rb")
+
+
+def compressing(fileobj, compression, level=None):
+    """Returns a file-like object which writes the data written to it to the
+    binary file-like object `fileobj`, compressed. It must be closed to
+    finish the compressed stream. Closing it does not close `fileobj`.
+
+    Args:
+        fileobj: A file-like object opened for writing bytes.
+        compression: One of :data:`FORMATS`.
+        level: The compression level (or xz preset). Default is the
+            format's default.
+
+    Raises:
+        ValueError: If `compression` is not one of :data:`FORMATS`, or is
+            not supported by this Python.
+
+    """
+    _check(compression)
+
+    if compression == GZIP:
+        return gzip.GzipFile(
+            fileobj=fileobj, mode="wb",
+            compresslevel=9 if level is None else level
+        )
+
+    if compression == XZ:
+        return lzma.LZMAFile(fileobj, mode="wb", preset=level)
+
+    level = 9 if level is None else level
+
+    if six.PY2:
+        return _StreamWriter(fileobj, bz2.BZ2Compressor(level))
+
+    return bz2.BZ2File(fileobj, mode="wb", compresslevel=level)
+
+
+@contextlib.contextmanager
+def decompressed(source):
+    """Returns a context manager which provides the decompressed form of
+    `source`.
+
+    `source` may be a filename, a file-like object, or a parsed lxml tree or
+    element. Compression is detected by the extension of a filename, or
+    else by the magic bytes at the start of the data. Uncompressed filenames,
+    file-like objects and lxml objects are provided as they are (with any
+    bytes read to detect compression put back). Files opened by this
+    function are closed on exit.
+
+    Raises:
+        ValueError: If the compression format is not supported by this
+            Python.
+
+    """
+    if mixbox.xml.is_etree(source) or mixbox.xml.is_element(source):
+        yield source
+        return
+
+    opened = None
+
+    if isinstance(source, six.string_types):
+        if not os.path.isfile(source):
+            # A URL, or a missing file: let lxml report it.
+            yield source
+            return
+
+        compression = from_extension(source)
+
+        if compression is None:
+            with open(source, "rb") as f:
+                compression = from_magic(f.read(_MAGIC_SIZE))
+
+        if compression is None:
+            # Let lxml open the file itself.
+            yield source
+            return
+
+        opened = fileobj = io.open(source, "rb")
+    else:
+        head, fileobj = _peek(source)
+        compression = from_magic(head)
+
+        if compression is None:
+            yield fileobj
+            return
+
+    try:
+        reader = decompressing(fileobj, compression)
+
+        try:
+            yield reader
+        finally:
+            reader.close()
+    finally:
+        if opened is not None:
+            opened.close()
@@ -0,0 +1,335 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for computing content fingerprints of STIX and CybOX entities, and
+for removing duplicate top-level components from STIX packages.
+
+A fingerprint is a stable hash over the normalized content of an entity: the
+entity class plus the ``TypedField`` values of the entity, keyed by the field
+``key_name`` (the same names used by ``to_dict()``). Fields such as ``id`` and
+``timestamp`` can be excluded so that the same content published by
+different producers has the same fingerprint. By default, multi-valued
+fields are treated as unordered collections.
+
+Example:
+    >>> from stix.utils import fingerprint
+    >>> fingerprint.fingerprint(indicator1) == fingerprint.fingerprint(indicator2)
+    True
+
+"""
+
+# stdlib
+import binascii
+import datetime
+import hashlib
+import numbers
+
+# external
+import dateutil.tz
+import lxml.etree
+from mixbox import entities
+from mixbox.vendor.six import iteritems, itervalues, text_type, binary_type
+import mixbox.xml
+
+# internal
+import stix
+
+# relative
+from . import is_sequence
+from .walk import iterwalk
+
+
+#: ``to_dict()`` key names which are excluded from fingerprints by default.
+DEFAULT_IGNORE = ("id", "timestamp")
+
+_NONE = b"N"
+
+
+def _tagged(tag, data):
+    if isinstance(data, text_type):
+        data = data.encode("utf-8")
+
+    return tag + data
+
+
+def _is_empty(value):
+    """Returns ``True`` if `value` is ``None`` or an empty string or
+    collection. Empty values are excluded from fingerprints, so that, e.g.,
+    an empty ``TestMechanisms`` list and an unset field hash the same.
+
+    """
+    if value is None:
+        return True
+
+    if isinstance(value, (bool, numbers.Number)):
+        return False
+
+    return not value
+
+
+class Fingerprinter(object):
+    """Computes fingerprints of entities, memoizing the hash of every entity
+    subtree it visits.
+
+    Because subtree hashes are memoized, fingerprinting an entity that shares
+    children with an entity fingerprinted earlier only hashes the new content.
+    The memo assumes entities are not modified after they are fingerprinted;
+    call :meth:`forget` or :meth:`clear` after modifying an entity.
+
+    The memo is keyed by object identity and holds a reference to every
+    value it has hashed, so it only helps while those objects are alive and
+    it grows until :meth:`clear` is called. Use one instance per batch of
+    related entities rather than one per process.
+
+    Args:
+        ignore: An iterable of ``to_dict()`` key names to exclude from
+            fingerprints. Default is :data:`DEFAULT_IGNORE`.
+        ordered: If ``True``, the order of items in multi-valued fields is
+            significant. Default is ``False``.
+
+    """
+    def __init__(self, ignore=DEFAULT_IGNORE, ordered=False):
+        self.ignore = frozenset(ignore)
+        self.ordered = ordered
+        self._memo = {}
+
+    def __len__(self):
+        return len(self._memo)
+
+    def clear(self):
+        """Discards all memoized subtree hashes."""
+        self._memo.clear()
+
+    def forget(self, value):
+        """Discards the memoized hash of `value` and all of its
+        descendants.
+
+        """
+        self._memo.pop(id(value), None)
+
+        if isinstance(value, entities.Entity):
+            children = itervalues(value._fields)
+        elif is_sequence(value):
+            children = value
+        else:
+            return
+
+        for child in children:
+            self.forget(child)
+
+    def fingerprint(self, entity):
+        """Returns the fingerprint of `entity` as a hex string."""
+        return binascii.hexlify(self.digest(entity)).decode("ascii")
+
+    def digest(self, value):
+        """Returns the fingerprint of `value` as a ``bytes`` digest.
+
+        Args:
+            value: A ``mixbox.entities.Entity`` (which includes STIX and
+                CybOX entities), collection, or primitive value.
+
+        """
+        if value is None:
+            return _NONE
+
+        if isinstance(value, (entities.Entity, stix.TypedCollection)):
+            key = id(value)
+
+            try:
+                return self._memo[key][1]
+            except KeyError:
+                pass
+
+            if isinstance(value, entities.Entity):
+                digest = self._hash_entity(value)
+            else:
+                digest = self._hash_sequence(value)
+
+            # Keep a reference to the value so that its id() is not reused.
+            self._memo[key] = (value, digest)
+            return digest
+
+        if is_sequence(value) and not mixbox.xml.is_element(value):
+            return self._hash_sequence(value)
+
+        return hashlib.sha1(self._encode(value)).digest()
+
+    def _hash_entity(self, entity):
+        parts = []
+        ignore = self.ignore
+
+        for field, value in iteritems(entity._fields):
+            if field.key_name in ignore:
+                continue
+
+            if _is_empty(value):
+                continue
+
+            name = field.key_name.encode("utf-8")
+            parts.append(name + b"=" + self.digest(value))
+
+        parts.sort()
+
+        klass = type(entity)
+        parts.insert(0, ("%s.%s" % (klass.__module__, klass.__name__)).encode("utf-8"))
+        return hashlib.sha1(b"\x00".join(parts)).digest()
+
+    def _hash_sequence(self, items):
+        digests = [self.digest(x) for x in items]
+
+        if not self.ordered:
+            digests.sort()
+
+        return hashlib.sha1(b"L" + b"".join(digests)).digest()
+
+    def _encode(self, value):
+        """Returns a type-tagged ``bytes`` encoding of a primitive `value`."""
+        if isinstance(value, bool):
+            return b"B1" if value else b"B0"
+
+        if isinstance(value, numbers.Number):
+            return _tagged(b"I", repr(value))
+
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(dateutil.tz.tzutc())
+                value = value.replace(tzinfo=None)
+            return _tagged(b"T", value.isoformat())
+
+        if isinstance(value, datetime.date):
+            return _tagged(b"D", value.isoformat())
+
+        if isinstance(value, binary_type):
+            return b"S" + value
+
+        if mixbox.xml.is_element(value) or mixbox.xml.is_etree(value):
+            return b"X" + lxml.etree.tostring(value, method="c14n")
+
+        return _tagged(b"S", text_type(value))
+
+
+def fingerprint(entity, ignore=DEFAULT_IGNORE, ordered=False):
+    """Returns the fingerprint of `entity` as a hex string.
+
+    See :class:`Fingerprinter` for a description of the arguments. Use a
+    :class:`Fingerprinter` instance directly to reuse memoized subtree
+    hashes across calls.
+
+    """
+    fp = Fingerprinter(ignore=ignore, ordered=ordered)
+    return fp.fingerprint(entity)
+
+
+#: Top-level ``STIXPackage`` collections in the order they are deduplicated.
+#: Components which are commonly referenced by others come first, so that
+#: references can be rewritten before the referencing components are
+#: fingerprinted.
+COLLECTIONS = (
+    "observables",
+    "exploit_targets",
+    "ttps",
+    "courses_of_action",
+    "threat_actors",
+    "campaigns",
+    "incidents",
+    "indicators",
+    "reports",
+)
+
+
+def _components(package, name):
+    collection = getattr(package, name, None)
+
+    if not collection:
+        return ()
+
+    if name == "observables":
+        return collection.observables or ()
+
+    return collection
+
+
+def _rewrite_idrefs(entity, aliases):
+    """Rewrites the ``idref`` values in `entity` which are keys of
+    `aliases`. Returns ``True`` if any were rewritten.
+
+    """
+    rewritten = False
+
+    for node in iterwalk(entity):
+        idref = getattr(node, "idref", None)
+
+        if idref in aliases:
+            node.idref = aliases[idref]
+            rewritten = True
+
+    return rewritten
+
+
+def dedupe(packages, ignore=DEFAULT_IGNORE, fingerprinter=None):
+    """Combines the top-level components of `packages` into a single
+    :class:`.STIXPackage`, keeping only the first component with each
+    fingerprint.
+
+    ``idref`` values which point to a dropped duplicate are rewritten to
+    point to the component that was kept.
+
+    Note:
+        Components are moved, not copied, into the returned package and
+        their ``idref`` values are modified in place.
+
+    Args:
+        packages: An iterable of :class:`.STIXPackage` objects.
+        ignore: The ``to_dict()`` key names to exclude from fingerprints.
+        fingerprinter: An optional :class:`Fingerprinter` to use. This
+            overrides `ignore`. Its memo keeps references to the components
+            of `packages` until it is cleared. By default, a new
+            :class:`Fingerprinter` is used for this call only.
+
+    Returns:
+        A ``(package, aliases)`` tuple, where ``aliases`` maps the id of each
+        dropped duplicate to the id of the component that was kept.
+
+    """
+    from stix.core import STIXPackage
+
+    fp = fingerprinter
+
+    if fp is None:
+        fp = Fingerprinter(ignore=ignore)
+
+    packages = list(packages)
+
+    merged = STIXPackage()
+    aliases = {}
+
+    for name in COLLECTIONS:
+        seen = {}
+
+        for package in packages:
+            for component in _components(package, name):
+                if aliases:
+                    _rewrite_idrefs(component, aliases)
+
+                digest = fp.digest(component)
+                kept = seen.get(digest)
+
+                if kept is None:
+                    seen[digest] = component
+                    merged.add(component)
+                elif component.id_ and kept.id_ != component.id_:
+                    aliases[component.id_] = kept.id_
+
+    if not aliases:
+        return merged, aliases
+
+    # Rewrite references to duplicates which were dropped after the
+    # referencing component was visited (e.g., from a Threat Actor to a
+    # Campaign).
+    for name in COLLECTIONS:
+        for component in _components(merged, name):
+            if _rewrite_idrefs(component, aliases):
+                fp.forget(component)
+
+    return merged, aliases
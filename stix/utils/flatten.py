@@ -0,0 +1,644 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Columnar flattening of STIX components for analytics.
+
+:func:`flatten` walks each top-level component of a package (or of a stream
+of components, such as :func:`stix.utils.pull.iter_entities` returns) once
+and writes one table per top-level collection (``indicators``,
+``observables``, ``ttps``, ...) and a ``relationships`` table to a sink.
+
+Column names are the ``key_name`` of each ``TypedField`` on the path from
+the component to the value, joined with ``"."``. The value of a simple
+field (e.g., a CybOX ``String``) is a column named for the field itself, so
+the address of an Observable is the ``object.properties.address_value``
+column of the ``observables`` table. Multiple-valued fields are a single
+column holding a list of the flattened items. Entities with an
+``xsi:type`` also get an ``xsi:type`` column (e.g.,
+``object.properties.xsi:type``).
+
+Components referenced by ``idref`` or defined inline are not flattened into
+the columns of the component which references them. Each reference is a row
+of the ``relationships`` table instead, with the same edge types as
+:class:`.RelationshipGraph`, and inline components are rows of their own
+tables.
+
+Rows are buffered per table in column-oriented batches of at most
+`batch_size` rows, so memory use is bounded by the batch size rather than
+by the number of components.
+
+Example:
+    >>> from stix.utils.flatten import CSVSink, flatten
+    >>> from stix.utils.pull import iter_entities
+    >>> with open("feed.xml", "rb") as f:
+    ...     flatten(iter_entities(f), CSVSink("tables/"))
+    {'indicators': 150000, 'observables': 150000, 'relationships': 150000}
+
+"""
+
+# stdlib
+import collections
+import csv
+import io
+import json
+import os
+
+# external
+import lxml.etree
+import mixbox.xml
+from mixbox import entities
+from mixbox.vendor import six
+from mixbox.vendor.six import iteritems, text_type
+
+# internal
+from stix.bindings import RawXML
+from stix.common.related import GenericRelationship
+from stix.core import STIXPackage
+from stix.core.writer import COLLECTIONS
+
+# relative
+from . import is_sequence
+from .graph import _NODE_TYPES
+
+
+#: The name of the relationships table.
+RELATIONSHIPS = "relationships"
+
+#: The columns of the relationships table.
+RELATIONSHIP_COLUMNS = ("source_id", "target_id", "type", "relationship", "confidence")
+
+#: The default number of rows buffered per table.
+DEFAULT_BATCH_SIZE = 10000
+
+# Component class -> table name. Subclasses are added as they are seen.
+_TABLES = dict((x[3], x[0]) for x in COLLECTIONS)
+
+
+def _table(entity):
+    """Returns the name of the table for `entity`, or ``None`` if it is not
+    a top-level component.
+
+    """
+    klass = type(entity)
+
+    try:
+        return _TABLES[klass]
+    except KeyError:
+        pass
+
+    table = None
+
+    for base in klass.__mro__:
+        if base in _TABLES:
+            table = _TABLES[base]
+            break
+
+    _TABLES[klass] = table
+    return table
+
+
+# Kinds of entity, by how they are flattened.
+_WALK, _SIMPLE, _NODE, _LIST = range(4)
+
+# Entity class -> kind.
+_KINDS = {}
+
+# Types whose values are used as column values as they are.
+_PRIMITIVES = frozenset(six.string_types + six.integer_types + (bool, float, text_type))
+
+
+def _kind(entity):
+    """Returns the kind of `entity`:
+
+    * ``_NODE``: A component which is referenced or defined inline.
+    * ``_LIST``: An entity list or collection, flattened like a multiple
+      field.
+    * ``_SIMPLE``: A simple value with attributes (e.g., a CybOX property,
+      a vocabulary term or a ``DateTimeWithPrecision``), which has a
+      ``value`` field and no entity fields. The ``to_dict()`` of these
+      leaves out default attributes, so it is used in place of walking
+      their fields.
+    * ``_WALK``: Any other entity.
+
+    """
+    klass = type(entity)
+    kind = _KINDS.get(klass)
+
+    if kind is not None:
+        return kind
+
+    fields = klass.typed_fields()
+
+    if issubclass(klass, _NODE_TYPES):
+        kind = _NODE
+    elif hasattr(klass, "__iter__"):
+        kind = _LIST
+    elif (any(x.key_name == "value" for x in fields) and
+          all(x.type_ is None for x in fields)):
+        kind = _SIMPLE
+    else:
+        kind = _WALK
+
+    _KINDS[klass] = kind
+    return kind
+
+
+def _items(values):
+    """Returns the ``list`` which holds the items of a ``TypedList``,
+    ``EntityList`` or ``TypedCollection``, to avoid iterating through their
+    ``__getitem__()``.
+
+    """
+    inner = getattr(values, "_inner", None)
+
+    while inner is not None:
+        values = inner
+        inner = getattr(values, "_inner", None)
+
+    return values
+
+
+def _leaf(field, value):
+    """Returns the column value for a non-entity field value."""
+    if isinstance(value, RawXML):
+        return value.data.decode("utf-8")
+
+    if mixbox.xml.is_element(value):
+        return lxml.etree.tostring(value, encoding="unicode", with_tail=False)
+
+    value = field.dict_value(value)
+
+    if isinstance(value, six.binary_type):
+        return value.decode("utf-8")
+
+    return value
+
+
+class _Table(object):
+    """A buffer of rows, taken as column-oriented batches.
+
+    Columns are kept in the order they were first seen. Columns are never
+    dropped between batches, so the columns of each batch start with the
+    columns of the previous one.
+
+    """
+    __slots__ = ("name", "columns", "known", "rows")
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = []
+        self.known = set()
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, pairs):
+        """Adds a row of ``(column, value)`` pairs."""
+        row = dict(pairs)
+
+        if not self.known.issuperset(row):
+            for column, _ in pairs:
+                if column not in self.known:
+                    self.known.add(column)
+                    self.columns.append(column)
+
+        self.rows.append(row)
+
+    def take(self):
+        """Returns the buffered rows as ``(columns, arrays)`` and empties
+        the buffer.
+
+        """
+        rows = self.rows
+        arrays = dict((x, [r.get(x) for r in rows]) for x in self.columns)
+        self.rows = []
+        return list(self.columns), arrays
+
+
+class _Flattener(object):
+    """Flattens components into the rows of :class:`_Table` buffers."""
+
+    def __init__(self):
+        self.tables = collections.OrderedDict()
+
+    def buffer(self, name):
+        table = self.tables.get(name)
+
+        if table is None:
+            table = self.tables[name] = _Table(name)
+
+        return table
+
+    def component(self, component):
+        """Adds a row for `component`, and for the inline components and
+        references it contains.
+
+        """
+        table = _table(component)
+
+        if table is None:
+            error = "Cannot flatten type '{0}': not a top-level component"
+            raise TypeError(error.format(type(component)))
+
+        row = [("id", component.id_)]
+
+        if component.idref:
+            row.append(("idref", component.idref))
+
+        self.walk(component, "", row, component.id_, None, None, None)
+        self.buffer(table).add(row)
+
+    def reference(self, value, source, type_, relationship, confidence):
+        """Records a relationship if `value` has an ``id`` or ``idref``.
+        Returns ``True`` if it does.
+
+        """
+        idref = getattr(value, "idref", None)
+        target = idref or getattr(value, "id_", None)
+
+        if not target:
+            return False
+
+        if source:
+            self.buffer(RELATIONSHIPS).add((
+                ("source_id", source),
+                ("target_id", target),
+                ("type", type_),
+                ("relationship", relationship),
+                ("confidence", confidence),
+            ))
+
+        if not idref and _table(value) is not None:
+            self.component(value)
+
+        return True
+
+    def walk(self, entity, prefix, row, source, type_, relationship, confidence):
+        """Appends the ``(column, value)`` pairs of the fields of `entity` to
+        `row`. `type_` is ``None`` for a top-level component.
+
+        """
+        if isinstance(entity, GenericRelationship):
+            relationship = entity.relationship
+            relationship = text_type(relationship) if relationship else None
+            confidence = entity.confidence
+            confidence = text_type(confidence.value) if confidence and confidence.value else None
+
+        xsi_type = getattr(entity, "_XSI_TYPE", None)
+
+        if xsi_type:
+            row.append((prefix + "xsi:type", xsi_type))
+
+        for field, value in iteritems(entity._fields):
+            if value is None:
+                continue
+
+            name = field.key_name
+            key = prefix + name
+
+            # Edges are typed by the top-level field they appear under.
+            if type_ is None:
+                if name in ("id", "idref"):
+                    continue
+
+                edge = name
+            else:
+                edge = type_
+
+            if field.multiple:
+                self.items(field, value, key, row, source, edge, relationship, confidence)
+            elif type(value) in _PRIMITIVES:
+                row.append((key, value))
+            elif isinstance(value, entities.Entity):
+                self.entity(field, value, key, row, source, edge, relationship, confidence)
+            elif is_sequence(value) and not mixbox.xml.is_element(value):
+                # e.g., a StructuredTextList.
+                self.items(field, value, key, row, source, edge, relationship, confidence)
+            else:
+                row.append((key, _leaf(field, value)))
+
+    def entity(self, field, value, key, row, source, type_, relationship, confidence):
+        """Appends the ``(column, value)`` pairs of the entity `value` to
+        `row`.
+
+        """
+        kind = _kind(value)
+
+        if kind == _SIMPLE:
+            # The value is the column, and any other attributes are columns
+            # of their own.
+            simple = value.to_dict()
+
+            if not isinstance(simple, dict):
+                row.append((key, simple))
+                return
+
+            simple = dict(simple)
+            row.append((key, simple.pop("value", None)))
+
+            for name in sorted(simple):
+                row.append((key + "." + name, simple[name]))
+
+        elif kind == _LIST:
+            self.items(field, value, key, row, source, type_, relationship, confidence)
+        elif kind != _NODE or not self.reference(value, source, type_, relationship, confidence):
+            self.walk(value, key + ".", row, source, type_, relationship, confidence)
+
+    def items(self, field, values, key, row, source, type_, relationship, confidence):
+        """Appends a column holding the list of flattened items of `values`
+        to `row`. References are left out.
+
+        """
+        items = []
+
+        for value in _items(values):
+            if value is None:
+                continue
+
+            if type(value) in _PRIMITIVES:
+                items.append(value)
+                continue
+
+            if not isinstance(value, entities.Entity):
+                items.append(_leaf(field, value))
+                continue
+
+            kind = _kind(value)
+
+            if kind == _SIMPLE:
+                items.append(value.to_dict())
+            elif kind == _LIST:
+                nested = []
+                self.items(field, value, key, nested, source, type_, relationship, confidence)
+                items.extend(x for _, x in nested)
+            elif kind != _NODE or not self.reference(value, source, type_, relationship, confidence):
+                columns = []
+                self.walk(value, "", columns, source, type_, relationship, confidence)
+
+                if columns:
+                    items.append(collections.OrderedDict(columns))
+
+        if items:
+            row.append((key, items))
+
+
+def _components(source):
+    if isinstance(source, STIXPackage):
+        for collection in COLLECTIONS:
+            for component in getattr(source, collection[0]) or ():
+                yield component
+    else:
+        for component in source:
+            yield component
+
+
+def iter_batches(source, batch_size=DEFAULT_BATCH_SIZE):
+    """Flattens the components of `source` into column-oriented batches.
+
+    Args:
+        source: A :class:`.STIXPackage` or an iterable of top-level
+            components.
+        batch_size: The maximum number of rows in a batch.
+
+    Yields:
+        ``(table, columns, arrays)`` tuples, where `columns` is a list of
+        column names and `arrays` is a dictionary of column names to lists
+        of values, one per row. Missing values are ``None``.
+
+    Raises:
+        TypeError: If `source` contains an entity which is not a top-level
+            component.
+
+    """
+    flattener = _Flattener()
+
+    for component in _components(source):
+        flattener.component(component)
+
+        for table in flattener.tables.values():
+            if len(table) >= batch_size:
+                columns, arrays = table.take()
+                yield table.name, columns, arrays
+
+    for table in flattener.tables.values():
+        if len(table):
+            columns, arrays = table.take()
+            yield table.name, columns, arrays
+
+
+def flatten(source, sink, batch_size=DEFAULT_BATCH_SIZE):
+    """Flattens the components of `source` and writes the tables to `sink`.
+
+    Args:
+        source: A :class:`.STIXPackage` or an iterable of top-level
+            components.
+        sink: A :class:`CSVSink`, :class:`NDJSONSink` or
+            :class:`ParquetSink`. It is closed once all rows are written.
+        batch_size: The maximum number of rows buffered per table.
+
+    Returns:
+        A dictionary of table names to row counts.
+
+    """
+    counts = collections.OrderedDict()
+
+    try:
+        for table, columns, arrays in iter_batches(source, batch_size):
+            sink.write(table, columns, arrays)
+            counts[table] = counts.get(table, 0) + len(arrays[columns[0]])
+    finally:
+        sink.close()
+
+    return counts
+
+
+def _text(value):
+    """Returns `value` as a string column value. Lists and dictionaries are
+    JSON encoded.
+
+    """
+    if value is None or isinstance(value, six.string_types):
+        return value
+
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=text_type)
+
+    return text_type(value)
+
+
+class _Sink(object):
+    """Writes each table to files in `directory`.
+
+    Attributes:
+        paths: The paths of the files written.
+
+    """
+    extension = None
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.paths = []
+        self._parts = {}
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, table, part):
+        if part:
+            filename = "%s.%d.%s" % (table, part, self.extension)
+        else:
+            filename = "%s.%s" % (table, self.extension)
+
+        path = os.path.join(self.directory, filename)
+        self.paths.append(path)
+        return path
+
+    def close(self):
+        pass
+
+
+class _PartSink(_Sink):
+    """A sink for formats with a fixed set of columns per file. When a batch
+    has new columns, the table continues in a new file, ``<table>.<n>.<ext>``,
+    whose columns are the columns of that batch.
+
+    """
+    def write(self, table, columns, arrays):
+        part = self._parts.get(table)
+
+        if part is None or len(columns) > len(part[1]):
+            number = 0 if part is None else part[0] + 1
+
+            if part is not None:
+                self._close_part(part[2])
+
+            handle = self._open_part(self._path(table, number), columns)
+            part = self._parts[table] = (number, columns, handle)
+
+        self._write_part(part[2], part[1], arrays)
+
+    def close(self):
+        for _, _, handle in self._parts.values():
+            self._close_part(handle)
+
+        self._parts.clear()
+
+
+class CSVSink(_PartSink):
+    """Writes each table to a UTF-8 CSV file with a header row. Missing
+    values are empty and lists are JSON encoded.
+
+    Args:
+        directory: The output directory. It is created if it does not exist.
+
+    """
+    extension = "csv"
+
+    def _open_part(self, path, columns):
+        if six.PY2:
+            f = open(path, "wb")
+        else:
+            f = io.open(path, "w", encoding="utf-8", newline="")
+
+        writer = csv.writer(f)
+        writer.writerow(self._encode(columns))
+        return f, writer
+
+    def _encode(self, values):
+        if six.PY2:
+            return [x.encode("utf-8") if isinstance(x, text_type) else x for x in values]
+
+        return values
+
+    def _write_part(self, handle, columns, arrays):
+        _, writer = handle
+        count = len(arrays[columns[0]])
+
+        for idx in range(count):
+            row = [_text(arrays[x][idx]) if x in arrays else None for x in columns]
+            writer.writerow(self._encode(["" if x is None else x for x in row]))
+
+    def _close_part(self, handle):
+        handle[0].close()
+
+
+class NDJSONSink(_Sink):
+    """Writes each table to a newline-delimited JSON file of one object per
+    row. Missing values are omitted.
+
+    Args:
+        directory: The output directory. It is created if it does not exist.
+
+    """
+    extension = "ndjson"
+
+    def write(self, table, columns, arrays):
+        f = self._parts.get(table)
+
+        if f is None:
+            f = self._parts[table] = open(self._path(table, 0), "wb")
+
+        count = len(arrays[columns[0]])
+
+        for idx in range(count):
+            row = collections.OrderedDict()
+
+            for column in columns:
+                value = arrays[column][idx]
+
+                if value is not None:
+                    row[column] = value
+
+            f.write(json.dumps(row, default=text_type).encode("utf-8"))
+            f.write(b"\n")
+
+    def close(self):
+        for f in self._parts.values():
+            f.close()
+
+        self._parts.clear()
+
+
+class ParquetSink(_PartSink):
+    """Writes each table to a Parquet file of string columns. Lists are JSON
+    encoded.
+
+    This sink requires the ``pyarrow`` library.
+
+    Args:
+        directory: The output directory. It is created if it does not exist.
+
+    Raises:
+        ImportError: If ``pyarrow`` is not installed.
+
+    """
+    extension = "parquet"
+
+    def __init__(self, directory):
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pyarrow = pyarrow
+        super(ParquetSink, self).__init__(directory)
+
+    def _open_part(self, path, columns):
+        pa = self._pyarrow
+        schema = pa.schema([(x, pa.string()) for x in columns])
+        return pa.parquet.ParquetWriter(path, schema)
+
+    def _write_part(self, handle, columns, arrays):
+        pa = self._pyarrow
+        count = len(arrays[columns[0]])
+        empty = [None] * count
+
+        data = [
+            pa.array([_text(x) for x in arrays.get(column, empty)], type=pa.string())
+            for column in columns
+        ]
+
+        handle.write_table(pa.Table.from_arrays(data, schema=handle.schema))
+
+    def _close_part(self, handle):
+        handle.close()
@@ -0,0 +1,434 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+A seeded generator of synthetic STIX content, for load and scale testing.
+
+The same seed and settings always produce the same content, including
+component ids. Components are generated one at a time, so a generated
+package can be streamed to XML or JSON with a bounded amount of memory
+regardless of its size.
+
+Example:
+    >>> from stix.utils.generator import CorpusGenerator
+    >>> gen = CorpusGenerator(seed=42, counts={"indicators": 10 ** 6, "ttps": 1000})
+    >>> with open("corpus.xml", "wb") as f:
+    ...     gen.write_xml(f)
+    1001000
+
+"""
+
+# stdlib
+import datetime
+import hashlib
+import random
+import uuid
+
+# external
+import dateutil.tz
+from cybox.common import Hash
+from cybox.core import Object, Observable, ObservableComposition
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+from mixbox import idgen
+
+# internal
+from stix.campaign import Campaign
+from stix.coa import CourseOfAction
+from stix.common import Confidence, InformationSource, Statement
+from stix.common import vocabs
+from stix.common.related import RelatedTTP
+from stix.core import STIXPackage, STIXHeader
+from stix.core.writer import COLLECTIONS, PackageWriter, JSONPackageWriter
+from stix.data_marking import Marking, MarkingSpecification
+from stix.exploit_target import ExploitTarget, Vulnerability
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.incident import Incident
+from stix.indicator import Indicator, ValidTime
+from stix.report import Report
+from stix.report.header import Header
+from stix.threat_actor import ThreatActor
+from stix.ttp import TTP
+
+
+#: The number of components of each top-level collection generated by
+#: default.
+DEFAULT_COUNTS = {
+    "observables": 20,
+    "indicators": 100,
+    "ttps": 20,
+    "exploit_targets": 10,
+    "incidents": 10,
+    "courses_of_action": 5,
+    "campaigns": 2,
+    "threat_actors": 2,
+    "reports": 1,
+}
+
+
+def _uniform(vocab):
+    return [(x, 1) for x in sorted(vocab._ALLOWED_VALUES)]
+
+
+#: The default distribution of each generated vocabulary field. Each value
+#: is a list of ``(term, weight)`` tuples.
+DEFAULT_VOCABS = {
+    "indicator_types": _uniform(vocabs.IndicatorType),
+    "incident_categories": _uniform(vocabs.IncidentCategory),
+    "threat_actor_types": _uniform(vocabs.ThreatActorType),
+    "intended_effects": _uniform(vocabs.IntendedEffect),
+    "coa_types": _uniform(vocabs.CourseOfActionType),
+    "confidence": [("High", 1), ("Medium", 2), ("Low", 1)],
+    "tlp": [("WHITE", 2), ("GREEN", 4), ("AMBER", 2), ("RED", 1)],
+}
+
+_WORDS = (
+    "actor", "attack", "beacon", "botnet", "campaign", "command", "control",
+    "credential", "domain", "dropper", "exfiltration", "exploit", "host",
+    "implant", "indicator", "lateral", "loader", "malware", "network",
+    "payload", "persistence", "phishing", "ransomware", "server", "spear",
+    "target", "traffic", "victim", "vulnerability", "watchlist",
+)
+
+_EPOCH = datetime.datetime(2017, 1, 1, tzinfo=dateutil.tz.tzutc())
+_YEAR = 365 * 86400
+
+
+class CorpusGenerator(object):
+    """Generates synthetic STIX packages.
+
+    Args:
+        seed: The random seed.
+        counts: A dictionary of the number of components to generate for
+            each ``STIXPackage`` collection (e.g., ``{"indicators": 1000}``).
+            Collections which are not given use :data:`DEFAULT_COUNTS`.
+        relationship_density: The average number of relationships (e.g.,
+            an Indicator's indicated TTPs) generated for each component.
+        description_size: A ``(min, max)`` tuple of description lengths, in
+            characters.
+        observables_per_indicator: A ``(min, max)`` tuple of the number of
+            CybOX observables embedded in each Indicator.
+        marking_ratio: The fraction of components with a TLP data marking.
+        vocabs: A dictionary which overrides entries of
+            :data:`DEFAULT_VOCABS`.
+
+    """
+    def __init__(self, seed=0, counts=None, relationship_density=1.0,
+                 description_size=(64, 512), observables_per_indicator=(1, 3),
+                 marking_ratio=0.25, vocabs=None):
+        self.seed = seed
+        self.counts = dict(DEFAULT_COUNTS)
+        self.counts.update(counts or {})
+        self.relationship_density = relationship_density
+        self.description_size = description_size
+        self.observables_per_indicator = observables_per_indicator
+        self.marking_ratio = marking_ratio
+        self.vocabs = dict(DEFAULT_VOCABS)
+        self.vocabs.update(vocabs or {})
+
+        self._rng = None
+        self._cumulative = {}
+
+    def __len__(self):
+        return sum(self.counts.get(x[0], 0) for x in COLLECTIONS)
+
+    def id_(self, collection, index):
+        """Returns the id of the `index`-th component generated for the
+        `collection`. Ids do not depend on the generation order, so
+        components can reference components which are generated later.
+
+        """
+        klass = _CLASSES[collection]
+        prefix = getattr(klass, "_ID_PREFIX", None) or klass.__name__
+
+        key = "%s:%s:%d" % (self.seed, collection, index)
+        digest = hashlib.md5(key.encode("utf-8")).digest()
+        value = uuid.UUID(bytes=digest, version=4)
+
+        return "%s:%s-%s" % (idgen.get_id_namespace_prefix(), prefix, value)
+
+    def package(self):
+        """Returns a :class:`.STIXPackage` containing all of the generated
+        components. Use :meth:`write_xml` or :meth:`write_json` for
+        packages which do not fit in memory.
+
+        """
+        package = self._package()
+
+        for component in self.components():
+            package.add(component)
+
+        return package
+
+    def components(self):
+        """Returns a generator of the top-level components, in the order of
+        the ``STIXPackage`` collections.
+
+        """
+        self._rng = random.Random(self.seed)
+
+        for collection in COLLECTIONS:
+            name = collection[0]
+            build = getattr(self, "_build_%s" % name)
+
+            for index in range(self.counts.get(name, 0)):
+                component = build(self.id_(name, index))
+                self._mark(component)
+                yield component
+
+    def write_xml(self, fileobj, pretty=True):
+        """Writes the generated package to `fileobj` as XML.
+
+        Returns:
+            The number of components written.
+
+        """
+        with PackageWriter(fileobj, self._package(), pretty=pretty) as writer:
+            writer.write_all(self.components())
+
+        return writer.count
+
+    def write_json(self, fileobj):
+        """Writes the generated package to `fileobj` as JSON.
+
+        Returns:
+            The number of components written.
+
+        """
+        with JSONPackageWriter(fileobj, self._package()) as writer:
+            writer.write_all(self.components())
+
+        return writer.count
+
+    def _package(self):
+        header = STIXHeader()
+        header.information_source = InformationSource(
+            description="Synthetic corpus (seed %s)" % self.seed
+        )
+
+        package = STIXPackage(id_=self.id_("package", 0), stix_header=header)
+        return package
+
+    # Random values
+
+    def _choice(self, field):
+        weights = self.vocabs[field]
+        cumulative = self._cumulative.get(field)
+
+        if cumulative is None:
+            total = 0
+            cumulative = []
+            for _, weight in weights:
+                total += weight
+                cumulative.append(total)
+            self._cumulative[field] = cumulative
+
+        point = self._rng.random() * cumulative[-1]
+
+        for idx, limit in enumerate(cumulative):
+            if point < limit:
+                return weights[idx][0]
+
+        return weights[-1][0]
+
+    def _confidence(self):
+        return Confidence(self._choice("confidence"), timestamp=self._timestamp())
+
+    def _statement(self, field, vocab):
+        return Statement(vocab(self._choice(field)), timestamp=self._timestamp())
+
+    def _count(self, bounds):
+        return self._rng.randint(bounds[0], bounds[1])
+
+    def _relationships(self, collection):
+        """Returns a list of ids of `collection` components to relate to the
+        component being generated.
+
+        """
+        available = self.counts.get(collection, 0)
+
+        if not available:
+            return []
+
+        density = self.relationship_density
+        count = int(density)
+
+        if self._rng.random() < density - count:
+            count += 1
+
+        return [self.id_(collection, self._rng.randrange(available)) for _ in range(count)]
+
+    def _text(self):
+        size = self._count(self.description_size)
+        words = []
+        length = 0
+
+        while length < size:
+            word = self._rng.choice(_WORDS)
+            words.append(word)
+            length += len(word) + 1
+
+        return " ".join(words)[:size]
+
+    def _timestamp(self):
+        return _EPOCH + datetime.timedelta(seconds=self._rng.randrange(_YEAR))
+
+    def _uuid(self):
+        return uuid.UUID(int=self._rng.getrandbits(128), version=4)
+
+    def _nested_id(self, prefix):
+        return "%s:%s-%s" % (idgen.get_id_namespace_prefix(), prefix, self._uuid())
+
+    def _mark(self, component):
+        if self._rng.random() >= self.marking_ratio:
+            return
+
+        spec = MarkingSpecification(controlled_structure="../../../descendant-or-self::node()")
+        spec.marking_structures.append(TLPMarkingStructure(color=self._choice("tlp")))
+
+        if isinstance(component, Report):
+            component.header.handling = Marking(spec)
+        elif isinstance(component, Observable):
+            return
+        else:
+            component.handling = Marking(spec)
+
+    # Builders
+
+    def _object(self):
+        rng = self._rng
+        kind = rng.randrange(4)
+
+        if kind == 0:
+            properties = File()
+            properties.file_name = "%s.exe" % rng.choice(_WORDS)
+            properties.add_hash(Hash("%032x" % rng.getrandbits(128)))
+        elif kind == 1:
+            value = "%d.%d.%d.%d" % tuple(rng.randrange(1, 255) for _ in range(4))
+            properties = Address(value, Address.CAT_IPV4)
+        elif kind == 2:
+            properties = DomainName()
+            properties.value = "%s.%s.example" % (rng.choice(_WORDS), rng.choice(_WORDS))
+        else:
+            url = "http://%s.example/%s" % (rng.choice(_WORDS), rng.choice(_WORDS))
+            properties = URI(url, URI.TYPE_URL)
+
+        prefix = properties.__class__.__name__
+        return Object(properties, id_=self._nested_id(prefix))
+
+    def _build_observables(self, id_):
+        return Observable(self._object(), id_=id_)
+
+    def _build_indicators(self, id_):
+        indicator = Indicator(id_=id_, timestamp=self._timestamp())
+        indicator.title = "Indicator %s" % self._rng.choice(_WORDS)
+        indicator.description = self._text()
+        indicator.add_indicator_type(self._choice("indicator_types"))
+        indicator.confidence = self._confidence()
+
+        start = self._timestamp()
+        indicator.add_valid_time_position(
+            ValidTime(start, start + datetime.timedelta(days=self._rng.randrange(1, 365)))
+        )
+
+        observables = [
+            Observable(self._object(), id_=self._nested_id("Observable"))
+            for _ in range(self._count(self.observables_per_indicator))
+        ]
+
+        if len(observables) == 1:
+            indicator.observable = observables[0]
+        elif observables:
+            # Build the composition here so its Observable gets a seeded id.
+            composition = ObservableComposition(operator="OR")
+            for observable in observables:
+                composition.add(observable)
+
+            indicator.observable = Observable(id_=self._nested_id("Observable"))
+            indicator.observable.observable_composition = composition
+
+        for ttp_id in self._relationships("ttps"):
+            indicator.add_indicated_ttp(TTP(idref=ttp_id))
+
+        return indicator
+
+    def _build_ttps(self, id_):
+        ttp = TTP(id_=id_, timestamp=self._timestamp())
+        ttp.title = "TTP %s" % self._rng.choice(_WORDS)
+        ttp.description = self._text()
+        ttp.add_intended_effect(self._statement("intended_effects", vocabs.IntendedEffect))
+
+        for et_id in self._relationships("exploit_targets"):
+            ttp.add_exploit_target(ExploitTarget(idref=et_id))
+
+        return ttp
+
+    def _build_exploit_targets(self, id_):
+        target = ExploitTarget(id_=id_, timestamp=self._timestamp())
+        target.title = "Exploit target %s" % self._rng.choice(_WORDS)
+        target.description = self._text()
+
+        vulnerability = Vulnerability()
+        vulnerability.cve_id = "CVE-%d-%04d" % (self._rng.randrange(1999, 2018), self._rng.randrange(10000))
+        target.add_vulnerability(vulnerability)
+
+        return target
+
+    def _build_incidents(self, id_):
+        incident = Incident(id_=id_, timestamp=self._timestamp())
+        incident.title = "Incident %s" % self._rng.choice(_WORDS)
+        incident.description = self._text()
+        incident.add_category(self._choice("incident_categories"))
+        incident.confidence = self._confidence()
+
+        for indicator_id in self._relationships("indicators"):
+            incident.add_related_indicator(Indicator(idref=indicator_id))
+
+        for ttp_id in self._relationships("ttps"):
+            incident.add_leveraged_ttps(TTP(idref=ttp_id))
+
+        return incident
+
+    def _build_courses_of_action(self, id_):
+        coa = CourseOfAction(id_=id_, timestamp=self._timestamp())
+        coa.title = "Course of action %s" % self._rng.choice(_WORDS)
+        coa.description = self._text()
+        coa.type_ = self._choice("coa_types")
+        return coa
+
+    def _build_campaigns(self, id_):
+        campaign = Campaign(id_=id_, timestamp=self._timestamp())
+        campaign.title = "Campaign %s" % self._rng.choice(_WORDS)
+        campaign.description = self._text()
+        campaign.confidence = self._confidence()
+
+        for ttp_id in self._relationships("ttps"):
+            campaign.related_ttps.append(RelatedTTP(TTP(idref=ttp_id)))
+
+        return campaign
+
+    def _build_threat_actors(self, id_):
+        actor = ThreatActor(id_=id_, timestamp=self._timestamp())
+        actor.title = "Threat actor %s" % self._rng.choice(_WORDS)
+        actor.description = self._text()
+        actor.add_type(self._statement("threat_actor_types", vocabs.ThreatActorType))
+
+        for ttp_id in self._relationships("ttps"):
+            actor.observed_ttps.append(RelatedTTP(TTP(idref=ttp_id)))
+
+        return actor
+
+    def _build_reports(self, id_):
+        header = Header(title="Report %s" % self._rng.choice(_WORDS), description=self._text())
+        report = Report(id_=id_, timestamp=self._timestamp(), header=header)
+
+        for indicator_id in self._relationships("indicators"):
+            report.add_indicator(Indicator(idref=indicator_id))
+
+        return report
+
+
+_CLASSES = dict((x[0], x[3]) for x in COLLECTIONS)
+_CLASSES["package"] = STIXPackage
@@ -0,0 +1,446 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+A relationship graph over the components of STIX packages.
+
+STIX 1.x relationships are expressed through many different fields
+(``Related_Indicators``, ``Indicated_TTP``, ``Attributed_Threat_Actors``,
+``Leveraged_TTPs``, ``Associated_Campaigns``, ``Potential_COAs``, ...).
+A :class:`RelationshipGraph` walks each component once and records an edge
+from a component to every component it references by ``idref`` or defines
+inline, using the name of the top-level field the reference appears under
+as the edge type (e.g., ``"indicated_ttps"``).
+
+Nodes are assigned integer ids and edges are stored in compressed sparse row
+(CSR) form: an array of per-node offsets into flat arrays of edge targets,
+edge type codes and confidence codes. A reverse CSR is stored as well, so
+both outgoing and incoming neighbors are found with two array lookups.
+
+Example:
+    >>> from stix.utils.graph import RelationshipGraph
+    >>> graph = RelationshipGraph.from_package(package)
+    >>> graph.neighbors(indicator.id_)
+    ['example:ttp-dd4e...']
+    >>> graph.expand([indicator.id_], hops=2)
+    set(['example:indicator-1c4a...', 'example:ttp-dd4e...', ...])
+
+"""
+
+# stdlib
+from array import array
+import collections
+
+# external
+import mixbox.xml
+from cybox.core import Observable
+from mixbox import entities
+from mixbox.vendor.six import iteritems, itervalues, moves
+
+# internal
+import stix
+from stix.common import CampaignRef
+from stix.common.related import GenericRelationship
+
+# relative
+from . import is_sequence
+
+
+#: Edge directions accepted by traversal methods.
+OUTGOING = "out"
+INCOMING = "in"
+BOTH = "both"
+
+#: Confidence codes stored for each edge. Edges without a confidence are
+#: stored as ``0``.
+CONFIDENCE_CODES = {
+    "Unknown": 0,
+    "None": 0,
+    "Low": 1,
+    "Medium": 2,
+    "High": 3,
+}
+
+#: Top-level ``STIXPackage`` collections which are walked.
+COLLECTIONS = (
+    "observables",
+    "indicators",
+    "ttps",
+    "exploit_targets",
+    "incidents",
+    "campaigns",
+    "threat_actors",
+    "courses_of_action",
+    "reports",
+)
+
+# Entities which are graph nodes when they have an id or idref.
+_NODE_TYPES = (stix.BaseCoreComponent, Observable, CampaignRef)
+
+
+def _confidence(relationship):
+    confidence = relationship.confidence
+
+    if confidence is None or confidence.value is None:
+        return 0
+
+    return CONFIDENCE_CODES.get(str(confidence.value), 0)
+
+
+def _csr(count, sources, targets, *columns):
+    """Sorts the edges by source node and returns a tuple containing the
+    offsets array, the targets array and each of the `columns` arrays in
+    the same order.
+
+    """
+    offsets = array('l', [0] * (count + 1))
+
+    for src in sources:
+        offsets[src + 1] += 1
+
+    for idx in moves.range(count):
+        offsets[idx + 1] += offsets[idx]
+
+    cursor = array('l', offsets[:-1])
+    order = array('l', [0] * len(sources))
+
+    for pos, src in enumerate(sources):
+        order[cursor[src]] = pos
+        cursor[src] += 1
+
+    result = [offsets, array('l', (targets[x] for x in order))]
+
+    for column in columns:
+        result.append(array(column.typecode, (column[x] for x in order)))
+
+    return tuple(result)
+
+
+class RelationshipGraph(object):
+    """A directed graph of relationships between STIX components.
+
+    Nodes are identified by component id. Components which are referenced
+    but not defined in the input packages are included as nodes with a
+    ``None`` type.
+
+    Attributes:
+        edge_types: A list of edge type names, indexed by edge type code.
+
+    """
+    def __init__(self):
+        self.edge_types = []
+
+        self._ids = []
+        self._index = {}
+        self._types = []
+        self._type_codes = {}
+
+        self._offsets = array('l', [0])
+        self._targets = array('l')
+        self._edge_types = array('H')
+        self._confidences = array('H')
+
+        self._in_offsets = array('l', [0])
+        self._in_sources = array('l')
+        self._in_edge_types = array('H')
+        self._in_confidences = array('H')
+
+    @classmethod
+    def from_package(cls, package):
+        """Returns the relationship graph of the components in `package`."""
+        return cls.from_packages((package,))
+
+    @classmethod
+    def from_packages(cls, packages):
+        """Returns the relationship graph of the components in each of the
+        `packages`.
+
+        """
+        graph = cls()
+        builder = _Builder(graph)
+
+        for package in packages:
+            for name in COLLECTIONS:
+                for component in getattr(package, name, None) or ():
+                    builder.scan(component)
+
+        builder.finish()
+        return graph
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, id_):
+        return id_ in self._index
+
+    @property
+    def edge_count(self):
+        """The number of edges in the graph."""
+        return len(self._targets)
+
+    @property
+    def ids(self):
+        """A list of node ids, indexed by integer node id."""
+        return list(self._ids)
+
+    def node(self, id_):
+        """Returns the integer node id of the component `id_`."""
+        return self._index[id_]
+
+    def node_type(self, id_):
+        """Returns the class name of the component `id_`, or ``None`` if the
+        component is only referenced.
+
+        """
+        return self._types[self._index[id_]]
+
+    def edges(self, id_, direction=OUTGOING):
+        """Returns a list of ``(id, edge type, confidence code)`` tuples for
+        the edges of the component `id_`.
+
+        """
+        node = self._index[id_]
+        result = []
+
+        for nodes, types, confidences in self._adjacent(node, direction):
+            for other, type_, confidence in moves.zip(nodes, types, confidences):
+                result.append((self._ids[other], self.edge_types[type_], confidence))
+
+        return result
+
+    def neighbors(self, id_, direction=BOTH, edge_type=None):
+        """Returns a list of the ids of components adjacent to `id_`.
+
+        Args:
+            id_: A component id.
+            direction: :data:`OUTGOING`, :data:`INCOMING` or :data:`BOTH`.
+            edge_type: An optional edge type name to restrict the edges
+                followed.
+
+        """
+        ids = self._ids
+        code = self._edge_type_code(edge_type)
+        result = []
+
+        for nodes, types, _ in self._adjacent(self._index[id_], direction):
+            if code is None:
+                result.extend(ids[x] for x in nodes)
+            else:
+                result.extend(ids[x] for x, t in moves.zip(nodes, types) if t == code)
+
+        return result
+
+    def expand(self, ids, hops=1, direction=BOTH, edge_type=None):
+        """Returns the set of ids of components within `hops` edges of any
+        of the components in `ids`, including `ids`.
+
+        """
+        code = self._edge_type_code(edge_type)
+        seen = set(self._index[x] for x in ids)
+        frontier = list(seen)
+
+        for _ in moves.range(hops):
+            next_frontier = []
+
+            for node in frontier:
+                for other in self._adjacent_nodes(node, direction, code):
+                    if other not in seen:
+                        seen.add(other)
+                        next_frontier.append(other)
+
+            if not next_frontier:
+                break
+
+            frontier = next_frontier
+
+        return set(self._ids[x] for x in seen)
+
+    def shortest_path(self, source, target, direction=BOTH):
+        """Returns a list of the component ids on a shortest path from
+        `source` to `target` (inclusive), or ``None`` if there is no path.
+
+        """
+        start = self._index[source]
+        end = self._index[target]
+
+        parents = {start: None}
+        queue = collections.deque([start])
+
+        while queue:
+            node = queue.popleft()
+
+            if node == end:
+                path = []
+                while node is not None:
+                    path.append(self._ids[node])
+                    node = parents[node]
+                return path[::-1]
+
+            for other in self._adjacent_nodes(node, direction, None):
+                if other not in parents:
+                    parents[other] = node
+                    queue.append(other)
+
+        return None
+
+    def components(self):
+        """Returns a list of the connected components of the graph, ignoring
+        edge direction. Each connected component is a set of ids.
+
+        """
+        labels = array('l', [-1] * len(self._ids))
+        result = []
+
+        for start in moves.range(len(self._ids)):
+            if labels[start] != -1:
+                continue
+
+            label = len(result)
+            labels[start] = label
+            members = [start]
+            stack = [start]
+
+            while stack:
+                node = stack.pop()
+
+                for other in self._adjacent_nodes(node, BOTH, None):
+                    if labels[other] == -1:
+                        labels[other] = label
+                        members.append(other)
+                        stack.append(other)
+
+            result.append(set(self._ids[x] for x in members))
+
+        return result
+
+    def _edge_type_code(self, edge_type):
+        if edge_type is None:
+            return None
+
+        try:
+            return self.edge_types.index(edge_type)
+        except ValueError:
+            return -1
+
+    def _adjacent(self, node, direction):
+        """Yields ``(nodes, edge types, confidences)`` array slices for the
+        edges of `node` in `direction`.
+
+        """
+        if direction in (OUTGOING, BOTH):
+            lo, hi = self._offsets[node], self._offsets[node + 1]
+            yield self._targets[lo:hi], self._edge_types[lo:hi], self._confidences[lo:hi]
+
+        if direction in (INCOMING, BOTH):
+            lo, hi = self._in_offsets[node], self._in_offsets[node + 1]
+            yield self._in_sources[lo:hi], self._in_edge_types[lo:hi], self._in_confidences[lo:hi]
+
+        if direction not in (OUTGOING, INCOMING, BOTH):
+            raise ValueError("Unknown direction: %s" % direction)
+
+    def _adjacent_nodes(self, node, direction, code):
+        for nodes, types, _ in self._adjacent(node, direction):
+            if code is None:
+                for other in nodes:
+                    yield other
+            else:
+                for other, type_ in moves.zip(nodes, types):
+                    if type_ == code:
+                        yield other
+
+
+class _Builder(object):
+    """Collects the nodes and edges of a :class:`RelationshipGraph`."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.sources = array('l')
+        self.targets = array('l')
+        self.types = array('H')
+        self.confidences = array('H')
+        self.scanned = set()
+
+    def node(self, id_, entity=None):
+        graph = self.graph
+        node = graph._index.get(id_)
+
+        if node is None:
+            node = len(graph._ids)
+            graph._index[id_] = node
+            graph._ids.append(id_)
+            graph._types.append(None)
+
+        if entity is not None and graph._types[node] is None:
+            graph._types[node] = type(entity).__name__
+
+        return node
+
+    def edge_type(self, name):
+        codes = self.graph._type_codes
+        code = codes.get(name)
+
+        if code is None:
+            code = len(self.graph.edge_types)
+            codes[name] = code
+            self.graph.edge_types.append(name)
+
+        return code
+
+    def scan(self, component):
+        """Records the edges of the top-level or inline `component`."""
+        id_ = component.id_
+
+        if not id_ or id_ in self.scanned:
+            return
+
+        self.scanned.add(id_)
+        source = self.node(id_, component)
+
+        for field, value in iteritems(component._fields):
+            if value is None or field.key_name in ("id", "idref"):
+                continue
+
+            self.descend(value, source, self.edge_type(field.key_name), 0)
+
+    def descend(self, value, source, type_, confidence):
+        if is_sequence(value) and not mixbox.xml.is_element(value):
+            for item in value:
+                self.descend(item, source, type_, confidence)
+            return
+
+        if not isinstance(value, entities.Entity):
+            return
+
+        if isinstance(value, _NODE_TYPES):
+            idref = getattr(value, "idref", None)
+            target = idref or getattr(value, "id_", None)
+
+            if target:
+                self.sources.append(source)
+                self.targets.append(self.node(target, None if idref else value))
+                self.types.append(type_)
+                self.confidences.append(confidence)
+
+                if not idref:
+                    self.scan(value)
+
+                return
+
+        if isinstance(value, GenericRelationship):
+            confidence = _confidence(value)
+
+        for child in itervalues(value._fields):
+            if child is not None:
+                self.descend(child, source, type_, confidence)
+
+    def finish(self):
+        graph = self.graph
+        count = len(graph._ids)
+
+        (graph._offsets, graph._targets, graph._edge_types,
+         graph._confidences) = _csr(count, self.sources, self.targets,
+                                    self.types, self.confidences)
+
+        (graph._in_offsets, graph._in_sources, graph._in_edge_types,
+         graph._in_confidences) = _csr(count, self.targets, self.sources,
+                                       self.types, self.confidences)
@@ -0,0 +1,412 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Memory-mapped parsing of, and random access to, local STIX documents.
+
+:func:`parse_file` (and ``EntityParser.parse_xml(path, mmap=True)``) maps
+a file read-only and passes the mapping to lxml as a buffer, so the
+document is not read into a ``bytes`` object first. The mapping is backed
+by the operating system's page cache: every process which maps the same
+file shares its pages, rather than each reading a private copy.
+
+:class:`MappedDocument` indexes the byte offsets of the top-level
+components of a mapped document and parses individual components on
+demand, reading them directly from the mapping. Only the component being
+parsed is held in memory.
+
+This module builds components with :mod:`stix.utils.pull`, so it also
+requires lxml 3.3 or later.
+
+Example:
+    >>> from stix.utils.mapped import MappedDocument
+    >>> with MappedDocument("big.xml") as document:
+    ...     indicator = document.get("example:indicator-1")
+    ...     for entity in document.components("ttps"):
+    ...         print(entity.title)
+
+"""
+
+# stdlib
+import collections
+import contextlib
+import mmap
+import re
+
+# external
+import lxml.etree
+import mixbox.xml
+from mixbox.vendor.six.moves import range
+
+# internal
+from stix.core.writer import COLLECTIONS
+
+# relative
+from . import compression
+from .pull import _CONTAINERS, _build
+
+
+#: The number of bytes passed to the parser at a time when a buffer cannot
+#: be parsed in place.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Markup which may contain "<" or ">" but is not an element tag.
+_SKIP = br"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<!DOCTYPE(?:[^>\[]|\[.*?\])*>"
+
+# The attributes of a tag, including a trailing "/" if it is empty. Runs of
+# unquoted characters are matched at once, without ambiguity, so failed
+# matches do not backtrack.
+_ATTRS = br"""([^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*)"""
+
+# Groups: end tag slash, qualified name, attributes.
+_TAG = re.compile(_SKIP + br"|<(/?)([^\s/>!?]+)" + _ATTRS + br">", re.S)
+
+# Attributes follow whitespace after the element name.
+_ID = re.compile(br"""\sid\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+# Collection element local name -> (STIXPackage attribute, component
+# element local name).
+_COLLECTIONS = dict(
+    (x[1].encode("ascii"), (x[0], x[2].encode("ascii"))) for x in COLLECTIONS
+)
+
+# Qualified name -> pattern which matches its start and end tags.
+_ELEMENT_PATTERNS = {}
+
+
+class ComponentOffset(collections.namedtuple("ComponentOffset", "id_ collection start end")):
+    """The location of a top-level component in a document.
+
+    Attributes:
+        id_: The ``id`` of the component, or ``None``.
+        collection: The ``STIXPackage`` attribute of its collection (e.g.,
+            ``"indicators"``).
+        start: The byte offset of its start tag.
+        end: The byte offset following its end tag.
+
+    """
+    __slots__ = ()
+
+
+def _localname(qname):
+    return qname.rpartition(b":")[2]
+
+
+def _id(attrs):
+    match = _ID.search(attrs)
+
+    if match is None:
+        return None
+
+    return (match.group(1) or match.group(2)).decode("utf-8")
+
+
+def _element_end(buffer, qname, pos):
+    """Returns the offset following the end tag of the `qname` element
+    whose start tag ends at `pos`.
+
+    """
+    pattern = _ELEMENT_PATTERNS.get(qname)
+
+    if pattern is None:
+        pattern = re.compile(
+            _SKIP + br"|<(/?)" + re.escape(qname) + br"(?=[\s/>])" + _ATTRS + br">",
+            re.S
+        )
+        _ELEMENT_PATTERNS[qname] = pattern
+
+    depth = 1
+
+    for match in pattern.finditer(buffer, pos):
+        slash, attrs = match.group(1, 2)
+
+        if slash is None:
+            continue
+        elif slash:
+            depth -= 1
+
+            if depth == 0:
+                return match.end()
+        elif not attrs.endswith(b"/"):
+            depth += 1
+
+    error = "The '{0}' element is not closed."
+    raise ValueError(error.format(qname.decode("utf-8")))
+
+
+def _next_tag(buffer, pos):
+    """Returns the next element tag match at or after `pos`."""
+    while True:
+        match = _TAG.search(buffer, pos)
+
+        if match is None:
+            raise ValueError("The document is incomplete.")
+
+        if match.group(2) is not None:
+            return match
+
+        pos = match.end()
+
+
+class _Layout(object):
+    """The result of scanning a document: the markup needed to parse its
+    components on their own, and the component offsets.
+
+    """
+    def __init__(self, buffer):
+        self.declaration = b""
+        self.containers = {}
+        self.offsets = []
+
+        match = _TAG.search(buffer)
+
+        while match is not None and match.group(2) is None:
+            if match.start() == 0 and match.group(0).startswith(b"<?xml"):
+                self.declaration = match.group(0)
+
+            match = _TAG.search(buffer, match.end())
+
+        if match is None:
+            raise ValueError("The document has no root element.")
+
+        self.root = match.group(0)
+        self.root_qname = match.group(2)
+
+        if not match.group(3).endswith(b"/"):
+            self._scan_root(buffer, match.end())
+
+    def _scan_root(self, buffer, pos):
+        while True:
+            match = _next_tag(buffer, pos)
+            pos = match.end()
+            slash, qname, attrs = match.group(1, 2, 3)
+
+            if slash:
+                return
+
+            if attrs.endswith(b"/"):
+                continue
+
+            container = _COLLECTIONS.get(_localname(qname))
+
+            if container is None:
+                # The STIX_Header, Related_Packages, etc.
+                pos = _element_end(buffer, qname, pos)
+                continue
+
+            self.containers[container[0]] = (match.group(0), qname)
+            pos = self._scan_container(buffer, pos, container)
+
+    def _scan_container(self, buffer, pos, container):
+        collection, component = container
+
+        while True:
+            match = _next_tag(buffer, pos)
+            pos = match.end()
+            slash, qname, attrs = match.group(1, 2, 3)
+
+            if slash:
+                return pos
+
+            if not attrs.endswith(b"/"):
+                pos = _element_end(buffer, qname, pos)
+
+            if _localname(qname) == component:
+                offset = ComponentOffset(_id(attrs), collection, match.start(), pos)
+                self.offsets.append(offset)
+
+
+def index_components(buffer):
+    """Returns a list of the :class:`ComponentOffset` of each top-level
+    component of the STIX document in `buffer` (e.g., a mapping returned
+    by :func:`open_mapping`), in document order.
+
+    The document is scanned for tags, without being parsed.
+
+    Raises:
+        ValueError: If the document is incomplete.
+
+    """
+    return _Layout(buffer).offsets
+
+
+def open_mapping(path):
+    """Returns a read-only ``mmap.mmap`` of the file at `path`.
+
+    Raises:
+        ValueError: If the file is empty.
+
+    """
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_buffer(buffer, encoding=None):
+    """Returns an lxml ``ElementTree`` parsed from `buffer`, an object which
+    supports the buffer protocol (e.g., a mapping returned by
+    :func:`open_mapping`).
+
+    lxml 5 and later parse the buffer in place. Older versions are fed the
+    buffer :data:`DEFAULT_CHUNK_SIZE` bytes at a time.
+
+    """
+    parser = mixbox.xml.get_xml_parser(encoding=encoding)
+
+    try:
+        root = lxml.etree.fromstring(buffer, parser)
+    except (TypeError, ValueError):
+        # Only str and bytes are accepted.
+        parser = mixbox.xml.get_xml_parser(encoding=encoding)
+
+        for pos in range(0, len(buffer), DEFAULT_CHUNK_SIZE):
+            parser.feed(buffer[pos:pos + DEFAULT_CHUNK_SIZE])
+
+        root = parser.close()
+
+    return root.getroottree()
+
+
+def parse_file(path, encoding=None):
+    """Returns an lxml ``ElementTree`` parsed from a memory-mapped file.
+
+    gzip, bz2 and xz compressed files are decompressed from the mapping.
+
+    """
+    with contextlib.closing(open_mapping(path)) as mapping:
+        with compression.decompressed(mapping) as source:
+            if source is mapping:
+                return parse_buffer(mapping, encoding)
+
+            return mixbox.xml.get_etree(source, encoding=encoding)
+
+
+class MappedDocument(object):
+    """A memory-mapped STIX document whose top-level components can be
+    parsed individually.
+
+    The document is scanned for component offsets the first time they are
+    needed. :meth:`get` and :meth:`components` parse each component from
+    its byte range of the mapping, so only the component being parsed is
+    held in memory.
+
+    Args:
+        path: The path of an uncompressed STIX document.
+
+    Attributes:
+        path: The path of the document.
+        mapping: The read-only ``mmap.mmap`` of the document.
+
+    Raises:
+        ValueError: If the file is empty or compressed.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self.mapping = open_mapping(path)
+        self._layout = None
+        self._index = None
+        self._bindings = {}
+
+        if compression.from_magic(self.mapping[:8]) is not None:
+            self.close()
+            raise ValueError("Compressed documents cannot be memory-mapped.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, id_):
+        return id_ in self.index
+
+    def close(self):
+        """Unmaps the document."""
+        self.mapping.close()
+
+    def _get_layout(self):
+        if self._layout is None:
+            self._layout = _Layout(self.mapping)
+        return self._layout
+
+    @property
+    def offsets(self):
+        """The list of :class:`ComponentOffset` objects of the top-level
+        components, in document order.
+
+        """
+        return self._get_layout().offsets
+
+    @property
+    def index(self):
+        """An ordered dictionary of component ids to
+        :class:`ComponentOffset` objects.
+
+        """
+        if self._index is None:
+            self._index = collections.OrderedDict(
+                (x.id_, x) for x in self.offsets if x.id_ is not None
+            )
+        return self._index
+
+    def parse(self, check_version=True, check_root=True, encoding=None):
+        """Returns the :class:`.STIXPackage` parsed from the whole
+        document.
+
+        """
+        from .parser import EntityParser
+
+        return EntityParser().parse_xml(
+            parse_buffer(self.mapping, encoding),
+            check_version=check_version,
+            check_root=check_root
+        )
+
+    def parse_component(self, offset):
+        """Returns the entity for the component at `offset`, a
+        :class:`ComponentOffset` of this document.
+
+        The component is parsed within the namespace declarations of the
+        ``STIX_Package`` and collection elements, so it need not declare the
+        namespaces it uses.
+
+        """
+        layout = self._get_layout()
+        start_tag, qname = layout.containers[offset.collection]
+
+        parser = mixbox.xml.get_xml_parser()
+        parser.feed(layout.declaration + layout.root + start_tag)
+
+        for pos in range(offset.start, offset.end, DEFAULT_CHUNK_SIZE):
+            parser.feed(self.mapping[pos:min(pos + DEFAULT_CHUNK_SIZE, offset.end)])
+
+        parser.feed(b"</" + qname + b"></" + layout.root_qname + b">")
+
+        container = parser.close()[0]
+        return _build(container[0], _CONTAINERS[container.tag], self._bindings).convert()
+
+    def get(self, id_):
+        """Returns the entity for the top-level component with the id
+        `id_`.
+
+        Raises:
+            KeyError: If there is no such component.
+
+        """
+        return self.parse_component(self.index[id_])
+
+    def components(self, collection=None):
+        """Yields the entity for each top-level component, in document
+        order.
+
+        Args:
+            collection: Only yield the components of this ``STIXPackage``
+                collection (e.g., ``"indicators"``).
+
+        """
+        for offset in self.offsets:
+            if collection is None or offset.collection == collection:
+                yield self.parse_component(offset)
@@ -0,0 +1,242 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for computing which data markings apply to which parts of a STIX
+document.
+
+STIX 1.x data markings select the content they apply to with the XPath
+expression found in the ``Controlled_Structure`` field of a
+:class:`stix.data_marking.MarkingSpecification`. The expression is evaluated
+with the ``Controlled_Structure`` element as the context node, so
+component-level markings typically use relative expressions such as
+``../../../descendant-or-self::node()`` while package-level markings (e.g.,
+those written by :func:`stix.extensions.marking.ais.add_ais_marking`) use
+absolute expressions like ``//node() | //@*``.
+
+Example:
+    >>> from stix.utils import marking
+    >>> markings = marking.resolve(package)
+    >>> markings[indicator.id_]
+    (<stix.extensions.marking.tlp.TLPMarkingStructure object at ...>,)
+
+"""
+
+# external
+import lxml.etree
+from mixbox.vendor.six import iteritems, string_types
+import mixbox.xml
+
+# internal
+from stix.data_marking import MarkingSpecification
+import stix.bindings.data_marking as stix_data_marking_binding
+
+# relative
+from .nsparser import NS_MARKING_OBJECT
+
+
+TAG_MARKING = "{%s}Marking" % NS_MARKING_OBJECT.name
+TAG_CONTROLLED_STRUCTURE = "{%s}Controlled_Structure" % NS_MARKING_OBJECT.name
+
+#: XPath applied when a marking has no ``Controlled_Structure``. This selects
+#: the component which contains the ``Handling`` field the marking belongs to.
+DEFAULT_CONTROLLED_STRUCTURE = "../../descendant-or-self::node()"
+
+# Compiled XPath expressions, keyed on (expression, namespaces) pairs.
+_XPATH_CACHE = {}
+
+
+def compile_xpath(expression, namespaces=None):
+    """Returns a compiled ``lxml.etree.XPath`` for `expression`.
+
+    Compiled expressions are cached so that expressions which appear in many
+    documents (or many times in one document) are only compiled once.
+
+    Args:
+        expression: An XPath expression string.
+        namespaces: A dictionary of prefix-to-namespace mappings used to
+            resolve prefixes found in `expression`. The default namespace
+            (``None`` key) is ignored, as XPath 1.0 does not support it.
+
+    Returns:
+        An ``lxml.etree.XPath`` instance.
+
+    Raises:
+        lxml.etree.XPathSyntaxError: If `expression` is not a valid XPath.
+
+    """
+    if namespaces:
+        namespaces = tuple(sorted(
+            (k, v) for k, v in iteritems(namespaces) if k
+        ))
+    else:
+        namespaces = ()
+
+    key = (expression, namespaces)
+
+    try:
+        return _XPATH_CACHE[key]
+    except KeyError:
+        xpath = lxml.etree.XPath(expression, namespaces=dict(namespaces))
+        _XPATH_CACHE[key] = xpath
+        return xpath
+
+
+def _parse_marking(node):
+    """Builds a :class:`.MarkingSpecification` from the ``marking:Marking``
+    etree element `node`.
+
+    """
+    obj = stix_data_marking_binding.MarkingSpecificationType.factory()
+    obj.build(node)
+    return MarkingSpecification.from_obj(obj)
+
+
+def _controlled_structure(node):
+    """Returns a tuple containing the XPath expression and context node for
+    the ``marking:Marking`` element `node`.
+
+    """
+    for child in node.iterchildren(TAG_CONTROLLED_STRUCTURE):
+        if child.text and child.text.strip():
+            return child.text.strip(), child
+
+    return DEFAULT_CONTROLLED_STRUCTURE, node
+
+
+def _apply(direct, node, structures):
+    """Appends the `structures` to the list of markings directly applied to
+    the element `node`.
+
+    """
+    try:
+        applied = direct[node]
+    except KeyError:
+        direct[node] = list(structures)
+        return
+
+    seen = set(id(x) for x in applied)
+    applied.extend(x for x in structures if id(x) not in seen)
+
+
+def _inherit(root, direct):
+    """Returns a mapping of every marked element under `root` to its own
+    markings combined with the markings of its ancestors.
+
+    Elements which do not add any markings of their own share the marking
+    tuple of their parent.
+
+    """
+    effective = {}
+
+    for node in root.iter():
+        # Skip comments and processing instructions. iter() only filters
+        # them out itself since lxml 3.0.
+        if not isinstance(node.tag, string_types):
+            continue
+
+        parent = node.getparent()
+        inherited = effective.get(parent, ()) if parent is not None else ()
+        own = direct.get(node)
+
+        if own:
+            seen = set(id(x) for x in inherited)
+            new = tuple(x for x in own if id(x) not in seen)
+            effective[node] = (inherited + new) if new else inherited
+        elif inherited:
+            effective[node] = inherited
+
+    return effective
+
+
+def resolve_xml(doc, inherit=True):
+    """Computes the data markings which apply to each element in a STIX
+    document.
+
+    Every ``Controlled_Structure`` expression in `doc` is compiled once (see
+    :func:`compile_xpath`) and evaluated once, and every marking is parsed
+    once. The resulting marking structure objects are shared between all the
+    elements they apply to.
+
+    Note:
+        Only elements are included in the result. Attributes and text nodes
+        selected by an expression carry the markings of their element.
+
+    Args:
+        doc: A filename, file-like object, ``etree._Element`` or
+            ``etree._ElementTree`` containing a STIX document.
+        inherit: If ``True``, elements also carry the markings applied to
+            their ancestors. If ``False``, only the markings whose
+            ``Controlled_Structure`` selects an element are returned for it.
+
+    Returns:
+        A dictionary mapping ``etree._Element`` instances to tuples of
+        :class:`.MarkingStructure` instances. Unmarked elements are not
+        included.
+
+    """
+    root = mixbox.xml.get_etree_root(doc)
+    direct = {}
+
+    for node in root.iter(TAG_MARKING):
+        spec = _parse_marking(node)
+        structures = [x for x in spec.marking_structures if x is not None]
+
+        if not structures:
+            continue
+
+        expression, context = _controlled_structure(node)
+        xpath = compile_xpath(expression, context.nsmap)
+
+        for selected in xpath(context):
+            if lxml.etree.iselement(selected):
+                _apply(direct, selected, structures)
+
+    if inherit:
+        return _inherit(root, direct)
+
+    return dict((k, tuple(v)) for k, v in iteritems(direct))
+
+
+def resolve(entity, inherit=True):
+    """Computes the data markings which apply to each identified component of
+    the in-memory STIX `entity` (e.g., a :class:`.STIXPackage`).
+
+    The `entity` is serialized once and the markings are resolved with
+    :func:`resolve_xml`.
+
+    Args:
+        entity: A :class:`stix.Entity` instance.
+        inherit: If ``True``, components also carry the markings applied to
+            their ancestors.
+
+    Returns:
+        A dictionary mapping ``id`` values to tuples of
+        :class:`.MarkingStructure` instances. Components without an ``id``
+        or without any markings are not included.
+
+    """
+    root = lxml.etree.fromstring(entity.to_xml())
+    markings = resolve_xml(root, inherit=inherit)
+
+    return dict(
+        (node.get("id"), structures)
+        for node, structures in iteritems(markings)
+        if node.get("id")
+    )
+
+
+def get_markings(markings, entity):
+    """Returns the data markings that apply to `entity` from the `markings`
+    mapping returned by :func:`resolve`.
+
+    Args:
+        markings: A dictionary returned by :func:`resolve`.
+        entity: A :class:`stix.Entity` instance or ``id`` string.
+
+    Returns:
+        A tuple of :class:`.MarkingStructure` instances.
+
+    """
+    id_ = entity if isinstance(entity, string_types) else getattr(entity, "id_", None)
+    return markings.get(id_, ())
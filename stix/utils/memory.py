@@ -0,0 +1,267 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for measuring the memory used by STIX and CybOX entities.
+
+:func:`memory_report` walks an entity graph once and attributes the size of
+every object it reaches to the nearest enclosing entity (or retained binding
+object), so the cost of strings, lists, dictionaries and dates is charged to
+the entity class which holds them. Each object is counted once, even if it
+is reachable from several entities.
+
+Objects shared with the rest of the program are not counted: classes,
+functions, modules, field descriptors, ``None``/``True``/``False``, small
+integers and identifier-like dictionary keys such as attribute names (which
+are interned).
+
+lxml elements retained by entities (e.g., OpenIOC or OVAL test mechanism
+content) keep their whole document alive in libxml2 memory, which
+``sys.getsizeof`` does not see. Its size is estimated once per document from
+the number of nodes and the length of their names, text and attributes.
+
+Example:
+    >>> from stix.utils.memory import memory_report
+    >>> report = memory_report(package)
+    >>> print(report.format(limit=5))
+    type                                  count        bytes
+    Indicator                             10000     52428800
+    ...
+
+"""
+
+# stdlib
+import gc
+import re
+import sys
+import types
+
+# external
+import mixbox.xml
+from mixbox import entities, fields
+from mixbox.vendor.six import iteritems
+
+# relative
+from .fingerprint import COLLECTIONS
+
+
+#: The estimated libxml2 overhead of one element or attribute node, in bytes.
+LXML_NODE_SIZE = 120
+
+#: The report row for lxml documents retained by entities.
+LXML = "<lxml>"
+
+_SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    fields.TypedField,
+)
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_SINGLETONS = frozenset(id(x) for x in (None, True, False, Ellipsis, NotImplemented))
+
+
+class MemoryReport(object):
+    """The result of :func:`memory_report`.
+
+    Attributes:
+        total: The total number of bytes attributed.
+        by_type: A dictionary of row names to ``[count, bytes]`` lists. Rows
+            are entity class names, ``"binding:<class name>"`` for
+            retained binding objects and :data:`LXML` for retained lxml
+            documents, whose count is the number of nodes.
+        by_collection: A dictionary of top-level ``STIXPackage`` collection
+            names (and ``"stix_header"`` and ``"package"`` for everything
+            else) to bytes. This is empty unless the report is for a
+            package.
+
+    """
+    def __init__(self):
+        self.total = 0
+        self.by_type = {}
+        self.by_collection = {}
+
+    def rows(self, key="bytes"):
+        """Returns a list of ``(name, count, bytes)`` tuples, largest first.
+
+        Args:
+            key: The column to sort by: ``"bytes"``, ``"count"`` or
+                ``"name"``.
+
+        """
+        rows = [(name, x[0], x[1]) for name, x in iteritems(self.by_type)]
+        column = ("name", "count", "bytes").index(key)
+
+        return sorted(rows, key=lambda x: x[column], reverse=(key != "name"))
+
+    def format(self, limit=None, key="bytes"):
+        """Returns the report as a text table. See :meth:`rows`."""
+        lines = ["%-40s %10s %14s" % ("type", "count", "bytes")]
+        rows = self.rows(key)
+
+        for name, count, nbytes in rows[:limit]:
+            lines.append("%-40s %10d %14d" % (name, count, nbytes))
+
+        lines.append("%-40s %10s %14d" % ("total", "", self.total))
+
+        if self.by_collection:
+            lines.append("")
+            lines.append("%-40s %10s %14s" % ("collection", "", "bytes"))
+
+            for name, nbytes in sorted(iteritems(self.by_collection), key=lambda x: -x[1]):
+                lines.append("%-40s %10s %14d" % (name, "", nbytes))
+
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+def _is_name(obj):
+    return type(obj) is str and len(obj) < 64 and _IDENTIFIER.match(obj) is not None
+
+
+def _is_binding(obj):
+    module = type(obj).__module__ or ""
+    return ".bindings" in module and hasattr(obj, "export")
+
+
+def _lxml_size(root):
+    """Returns a ``(node count, estimated bytes)`` tuple for the lxml
+    document containing `root`.
+
+    """
+    count = 0
+    nbytes = 0
+
+    for node in root.iter():
+        count += 1
+        nbytes += LXML_NODE_SIZE
+        nbytes += len(node.tag) if isinstance(node.tag, str) else 0
+        nbytes += len(node.text or "") + len(node.tail or "")
+
+        for name, value in node.attrib.items():
+            nbytes += LXML_NODE_SIZE + len(name) + len(value)
+
+    return count, nbytes
+
+
+class _Walker(object):
+    def __init__(self, report):
+        self.report = report
+        self.seen = set(_SINGLETONS)
+        self.documents = set()
+        self.roots = []
+
+    def add(self, row, count, nbytes):
+        counts = self.report.by_type.get(row)
+
+        if counts is None:
+            counts = self.report.by_type[row] = [0, 0]
+
+        counts[0] += count
+        counts[1] += nbytes
+        self.report.total += nbytes
+
+    def walk(self, root):
+        """Attributes the objects reachable from `root` which have not been
+        seen yet, and returns the number of bytes attributed.
+
+        """
+        seen = self.seen
+        getsizeof = sys.getsizeof
+        total = 0
+        stack = [(root, None)]
+
+        while stack:
+            obj, owner = stack.pop()
+            oid = id(obj)
+
+            if oid in seen:
+                continue
+
+            seen.add(oid)
+
+            if isinstance(obj, _SHARED_TYPES) or (type(obj) is int and -5 <= obj <= 256):
+                continue
+
+            if mixbox.xml.is_element(obj) or mixbox.xml.is_etree(obj):
+                total += self.document(obj)
+                continue
+
+            if isinstance(obj, entities.Entity):
+                owner = type(obj).__name__
+                self.add(owner, 1, 0)
+            elif _is_binding(obj):
+                owner = "binding:%s" % type(obj).__name__
+                self.add(owner, 1, 0)
+
+            size = getsizeof(obj)
+            total += size
+            self.add(owner or type(obj).__name__, 0, size)
+
+            referents = gc.get_referents(obj)
+
+            if type(obj) is dict:
+                # Attribute names and other identifier-like keys are
+                # usually interned and shared with the rest of the program.
+                referents = [x for x in referents if not _is_name(x)]
+
+            for child in referents:
+                if id(child) not in seen:
+                    stack.append((child, owner))
+
+        return total
+
+    def document(self, node):
+        if mixbox.xml.is_etree(node):
+            root = node.getroot()
+        else:
+            root = node.getroottree().getroot()
+
+        if root is None or id(root) in self.documents:
+            return 0
+
+        # Keep the proxy alive so its id is not reused during the walk.
+        self.documents.add(id(root))
+        self.roots.append(root)
+
+        count, nbytes = _lxml_size(root)
+        self.add(LXML, count, nbytes)
+        return nbytes
+
+
+def memory_report(entity):
+    """Returns a :class:`MemoryReport` of the memory used by `entity` and
+    everything it references.
+
+    If `entity` is a :class:`.STIXPackage`, the report also attributes the
+    memory of each top-level collection. Collections are walked first, in
+    :data:`stix.utils.fingerprint.COLLECTIONS` order, and objects shared
+    between collections are charged to the first collection which reaches
+    them.
+
+    """
+    report = MemoryReport()
+    walker = _Walker(report)
+
+    if hasattr(entity, "stix_header"):
+        for name in COLLECTIONS:
+            collection = getattr(entity, name, None)
+
+            if collection is not None:
+                report.by_collection[name] = walker.walk(collection)
+
+        report.by_collection["stix_header"] = walker.walk(entity.stix_header)
+
+    remainder = walker.walk(entity)
+
+    if report.by_collection:
+        report.by_collection["package"] = remainder
+
+    return report
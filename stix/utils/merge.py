@@ -0,0 +1,202 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for merging updated top-level components into a STIX package.
+
+Components are matched by ``id``. When an update contains a component whose
+``id`` already exists in the base package, the merge policy decides whether
+the existing component is replaced. Under the default ``"newest"`` policy,
+the component with the most recent ``timestamp`` wins, following the STIX
+1.x versioning convention.
+
+Example:
+    >>> from stix.utils.merge import merge_packages
+    >>> report = merge_packages(master, update1, update2)
+    >>> report.replaced
+    ['example:indicator-1c4a...']
+
+"""
+
+# stdlib
+import datetime
+
+# external
+import dateutil.tz
+
+# relative
+from .fingerprint import COLLECTIONS
+
+
+#: Replace a component if the update has a more recent ``timestamp``.
+POLICY_NEWEST = "newest"
+
+#: Always replace a component with the update.
+POLICY_UPDATE = "update"
+
+#: Never replace a component; only add components with new ids.
+POLICY_KEEP = "keep"
+
+POLICIES = (POLICY_NEWEST, POLICY_UPDATE, POLICY_KEEP)
+
+_UTC = dateutil.tz.tzutc()
+_OLDEST = datetime.datetime.min.replace(tzinfo=_UTC)
+
+
+class MergeReport(object):
+    """The changes made to a package by :func:`merge_packages`.
+
+    Attributes:
+        added: A list of ids of components added to the base package.
+        replaced: A list of ids of base package components which were
+            replaced by an update.
+        skipped: A list of ids of update components which were not merged
+            because the base package component was kept.
+
+    """
+    def __init__(self):
+        self.added = []
+        self.replaced = []
+        self.skipped = []
+
+    def __nonzero__(self):
+        return bool(self.added or self.replaced)
+
+    __bool__ = __nonzero__
+
+    def __repr__(self):
+        return "MergeReport(added=%d, replaced=%d, skipped=%d)" % (
+            len(self.added), len(self.replaced), len(self.skipped)
+        )
+
+
+def _timestamp(component):
+    """Returns the timezone-aware timestamp of `component`. Components
+    without a timestamp are considered the oldest.
+
+    """
+    value = getattr(component, "timestamp", None)
+
+    if not value:
+        return _OLDEST
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=_UTC)
+
+    return value
+
+
+def _replaces(policy, old, new):
+    if policy == POLICY_UPDATE:
+        return True
+
+    if policy == POLICY_KEEP:
+        return False
+
+    return _timestamp(new) > _timestamp(old)
+
+
+def _collection(package, name):
+    """Returns the top-level collection `name` of `package`, creating it if
+    it does not exist.
+
+    """
+    collection = getattr(package, name, None)
+
+    if collection is None:
+        field = type(package).typed_fields_with_attrnames()
+        collection = dict(field)[name].type_()
+        setattr(package, name, collection)
+
+    return collection
+
+
+def _index(package):
+    """Returns a dictionary mapping the id of each top-level component of
+    `package` to a ``(list, position)`` tuple.
+
+    """
+    index = {}
+
+    for name in COLLECTIONS:
+        collection = getattr(package, name, None)
+
+        if not collection:
+            continue
+
+        inner = collection._inner
+        for pos, component in enumerate(inner):
+            if component.id_:
+                index[component.id_] = (inner, pos)
+
+    return index
+
+
+def merge_packages(base, *updates, **kwargs):
+    """Merges the top-level components of `updates` into the `base` package.
+
+    Components with ids that are not in `base` are added. Components with
+    ids that are in `base` replace the existing component according to the
+    merge `policy`. Components without an id are always added.
+
+    The ids in `base` are indexed once, so merging is linear in the total
+    number of components.
+
+    Note:
+        `base` is modified in place. Components are moved, not copied, from
+        `updates` into `base`.
+
+    Args:
+        base: The :class:`.STIXPackage` to merge into.
+        *updates: :class:`.STIXPackage` objects, in the order they are
+            merged.
+        policy: One of :data:`POLICY_NEWEST` (default), :data:`POLICY_UPDATE`
+            or :data:`POLICY_KEEP`.
+
+    Returns:
+        A :class:`MergeReport` describing the changes made to `base`.
+
+    Raises:
+        ValueError: If `policy` is not a known merge policy.
+
+    """
+    policy = kwargs.pop("policy", POLICY_NEWEST)
+
+    if kwargs:
+        raise TypeError("Unexpected keyword arguments: %s" % ", ".join(kwargs))
+
+    if policy not in POLICIES:
+        raise ValueError("Unknown merge policy: %s" % policy)
+
+    index = _index(base)
+    report = MergeReport()
+
+    for update in updates:
+        for name in COLLECTIONS:
+            collection = getattr(update, name, None)
+
+            if not collection:
+                continue
+
+            for component in collection:
+                id_ = component.id_
+                found = index.get(id_) if id_ else None
+
+                if found is None:
+                    inner = _collection(base, name)._inner
+                    inner.append(component)
+
+                    if id_:
+                        index[id_] = (inner, len(inner) - 1)
+                        report.added.append(id_)
+                    continue
+
+                inner, pos = found
+
+                if _replaces(policy, inner[pos], component):
+                    inner[pos] = component
+                    report.replaced.append(id_)
+                else:
+                    report.skipped.append(id_)
+
+    return report
@@ -9,6 +9,8 @@ import mixbox.parser
 from mixbox.parser import (UnknownVersionError, UnsupportedVersionError,
                            UnsupportedRootElementError)
 
+from . import compression
+
 # Alias for backwards compatibility
 UnsupportedRootElement = UnsupportedRootElementError
 
@@ -26,3 +28,45 @@ class EntityParser(mixbox.parser.EntityParser):
 
     def get_entity_class(self, tag=TAG_STIX_PACKAGE):
         return stix.core.STIXPackage
+
+    def parse_xml_to_obj(self, xml_file, check_version=True, check_root=True,
+                         encoding=None):
+        """Creates a STIX binding object from the supplied xml file.
+
+        gzip, bz2 and xz compressed input is decompressed as it is parsed.
+        See :mod:`stix.utils.compression`.
+
+        """
+        with compression.decompressed(xml_file) as source:
+            return super(EntityParser, self).parse_xml_to_obj(
+                source,
+                check_version=check_version,
+                check_root=check_root,
+                encoding=encoding
+            )
+
+    def parse_xml(self, xml_file, check_version=True, check_root=True,
+                  encoding=None, mmap=False):
+        """Creates a python-stix STIXPackage object from the supplied
+        xml_file.
+
+        gzip, bz2 and xz compressed input is decompressed as it is parsed.
+        See :mod:`stix.utils.compression`.
+
+        If `mmap` is ``True``, `xml_file` must be a filename. The file is
+        memory-mapped and parsed from the mapping. See
+        :mod:`stix.utils.mapped`, which requires lxml 3.3 or later.
+
+        """
+        if mmap:
+            # stix.utils.mapped imports stix.core, which imports this module.
+            from .mapped import parse_file
+            xml_file = parse_file(xml_file, encoding=encoding)
+
+        with compression.decompressed(xml_file) as source:
+            return super(EntityParser, self).parse_xml(
+                source,
+                check_version=check_version,
+                check_root=check_root,
+                encoding=encoding
+            )
@@ -0,0 +1,156 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Passthrough parsing of embedded foreign XML documents.
+
+Several extensions embed documents from other languages: OpenIOC and OVAL
+test mechanisms, CVRF vulnerability instances, CIQ identity specifications
+and MAEC malware instances. By default these are parsed (and, for CIQ and
+MAEC, converted into Python objects) and re-serialized on export.
+
+While passthrough parsing is enabled, embedded documents are instead kept as
+the serialized bytes of their element (a :class:`.RawXML`), which are
+written back out verbatim on export. A document is only parsed if its typed
+accessor (e.g., ``OpenIOCTestMechanism.ioc`` or ``MAECInstance.maec``) is
+read, so forwarding packages costs close to a byte copy of the embedded
+documents.
+
+Example:
+    >>> from stix.utils.passthrough import passthrough
+    >>> with passthrough():
+    ...     package = STIXPackage.from_xml("feed.xml")
+    >>> forward(package.to_xml())
+
+"""
+
+# stdlib
+import contextlib
+
+# external
+from mixbox import fields
+from mixbox.datautils import resolve_class
+
+# internal
+from stix.bindings import RawXML, is_passthrough, set_passthrough  # noqa
+
+
+@contextlib.contextmanager
+def passthrough(enabled=True):
+    """Enables (or disables) passthrough parsing in the current thread for
+    the duration of the ``with`` block. Other threads are not affected.
+
+    """
+    previous = is_passthrough()
+    set_passthrough(enabled)
+
+    try:
+        yield
+    finally:
+        set_passthrough(previous)
+
+
+class _RawTransformer(object):
+    """Passes :class:`.RawXML` values through ``from_obj()`` unchanged.
+
+    The field's transformer (and so its ``type_``, which may name a class in
+    an optional library such as ``maec``) is only resolved for other values.
+
+    """
+    def __init__(self, field):
+        self.field = field
+
+    @property
+    def transformer(self):
+        return self.field.factory or self.field.resolve_type()
+
+    def from_obj(self, obj):
+        if isinstance(obj, RawXML):
+            return obj
+
+        return self.transformer.from_obj(obj)
+
+    def from_dict(self, d):
+        return self.transformer.from_dict(d)
+
+
+class RawXMLField(fields.TypedField):
+    """A field which may hold a :class:`.RawXML` value. The value is parsed
+    the first time it is read.
+
+    Args:
+        binding: The binding class (or its dotted name) the parsed element is
+            built into before it is converted with the field's ``type_``. If
+            ``None``, the field value is the parsed ``lxml`` element.
+
+    """
+    def __init__(self, *args, **kwargs):
+        self._binding = kwargs.pop("binding", None)
+        super(RawXMLField, self).__init__(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        value = super(RawXMLField, self).__get__(instance, owner)
+
+        if isinstance(value, RawXML):
+            value = self.parse(value)
+            instance._fields[self] = value
+
+        return value
+
+    @property
+    def type_(self):
+        # mixbox reads the type of every field value on export. RawXML values
+        # are exported without it, so a type in a library which is not
+        # installed (e.g., maec) is treated as no type here. Assignments and
+        # parses resolve it with resolve_type().
+        try:
+            return self.resolve_type()
+        except ImportError:
+            return None
+
+    @type_.setter
+    def type_(self, value):
+        self._resolved_type = value
+
+    def resolve_type(self):
+        """Returns the field's ``type_``.
+
+        Raises:
+            ImportError: If the type is in a library which is not installed.
+
+        """
+        return fields.TypedField.type_.fget(self)
+
+    def _clean(self, value):
+        if isinstance(value, RawXML):
+            return value
+
+        if value is not None:
+            self.resolve_type()
+
+        return super(RawXMLField, self)._clean(value)
+
+    @property
+    def transformer(self):
+        if self._unresolved_factory is None and self._unresolved_type is None:
+            return None
+
+        return _RawTransformer(self)
+
+    def parse(self, raw):
+        """Returns the field value for the :class:`.RawXML` `raw`."""
+        if self._binding is None:
+            return raw.element
+
+        obj = resolve_class(self._binding).factory()
+        obj.build(raw.element)
+        return self.resolve_type().from_obj(obj)
+
+
+def raw_value(entity, field):
+    """Returns the :class:`.RawXML` value of `field` on `entity`, or ``None``
+    if the value has been parsed or is not a :class:`.RawXML`.
+
+    """
+    value = entity._fields.get(field)
+    return value if isinstance(value, RawXML) else None
@@ -0,0 +1,239 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+An incremental parser which returns the top-level components of a STIX
+package as soon as they have been read.
+
+:class:`EntityPullParser` is fed the bytes of a document as they become
+available (e.g., from a network connection) and returns each top-level
+component (``Indicator``, ``TTP``, ``Observable``, ...) once its end tag has
+been read. Parsed elements are released as soon as they are converted, so
+memory use is bounded by the size of the largest component rather than the
+size of the document.
+
+See :mod:`stix.aio` for an ``asyncio`` interface.
+
+This module requires lxml 3.3 or later. Importing it with an older version
+raises ``ImportError``.
+
+Example:
+    >>> from stix.utils.pull import EntityPullParser
+    >>> parser = EntityPullParser()
+    >>> for chunk in chunks:
+    ...     for entity in parser.feed(chunk):
+    ...         print(entity.id_)
+    >>> parser.close()
+
+"""
+
+# external
+import lxml.etree
+
+# internal
+import stix.bindings.stix_core as stix_core_binding
+from stix.core import STIXHeader
+from stix.core.writer import COLLECTIONS
+
+# relative
+from . import compression
+from .nsparser import NS_STIX_OBJECT
+
+if not hasattr(lxml.etree, "XMLPullParser"):
+    raise ImportError("stix.utils.pull requires lxml 3.3 or later.")
+
+
+TAG_STIX_HEADER = "{%s}STIX_Header" % NS_STIX_OBJECT.name
+
+#: The default number of bytes read at a time by :func:`iter_entities`.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _container_tag(name):
+    return "{%s}%s" % (NS_STIX_OBJECT.name, name)
+
+
+# Container tag -> (component element name, collection class). Components
+# are in several namespaces (e.g., cybox:Observable, stixCommon:Exploit_Target)
+# so they are matched by local name.
+_CONTAINERS = dict(
+    (_container_tag(x[1]), (x[2], x[4])) for x in COLLECTIONS
+)
+
+
+class _Pending(object):
+    """A top-level component which has been built into a binding object but
+    not yet converted into an entity.
+
+    """
+    __slots__ = ("transformer", "obj")
+
+    def __init__(self, transformer, obj):
+        self.transformer = transformer
+        self.obj = obj
+
+    def convert(self):
+        return self.transformer.from_obj(self.obj)
+
+
+def _convert_all(pending):
+    return [x.convert() for x in pending]
+
+
+def _build(node, container, bindings):
+    """Returns a :class:`_Pending` component for the component element
+    `node`. `container` is the ``(component element name, collection
+    class)`` tuple of its collection, and `bindings` is a dictionary which
+    caches a collection binding object per collection class.
+
+    """
+    name, klass = container
+    binding = bindings.get(klass)
+
+    if binding is None:
+        binding = bindings[klass] = klass._binding_class.factory()
+
+    # Let the collection binding resolve the xsi:type of the component.
+    binding.buildChildren(node, node, name)
+    obj = getattr(binding, name).pop()
+
+    return _Pending(klass._multiple_field().transformer, obj)
+
+
+def _release(node):
+    """Clears `node` and deletes the already processed preceding siblings."""
+    node.clear()
+    parent = node.getparent()
+
+    while node.getprevious() is not None:
+        del parent[0]
+
+
+class EntityPullParser(object):
+    """Incrementally parses a STIX package document.
+
+    Attributes:
+        id_: The ``id`` of the ``STIX_Package``, once its start tag has been
+            read.
+        version: The ``version`` of the ``STIX_Package``, once its start tag
+            has been read.
+        stix_header: The :class:`.STIXHeader` of the package, once it has
+            been read.
+
+    """
+    def __init__(self):
+        self.id_ = None
+        self.version = None
+        self.stix_header = None
+
+        # The options of mixbox.xml.get_xml_parser().
+        self._parser = lxml.etree.XMLPullParser(
+            events=("start", "end"),
+            remove_comments=True,
+            huge_tree=True,
+            resolve_entities=False,
+            strip_cdata=False,
+            remove_blank_text=True
+        )
+        self._depth = 0
+        self._bindings = {}
+
+    def feed(self, data):
+        """Parses the bytes `data`.
+
+        Returns:
+            A list of the top-level components completed by `data`.
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the document is malformed.
+
+        """
+        return _convert_all(self._feed(data))
+
+    def close(self):
+        """Finishes parsing the document.
+
+        Returns:
+            A list of any remaining top-level components.
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the document is incomplete.
+
+        """
+        return _convert_all(self._close())
+
+    def _feed(self, data):
+        self._parser.feed(data)
+        return self._read_events()
+
+    def _close(self):
+        self._parser.close()
+        return self._read_events()
+
+    def _read_events(self):
+        """Returns a list of :class:`_Pending` components for the parser
+        events read so far.
+
+        """
+        pending = []
+
+        for event, node in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+
+                if self._depth == 1:
+                    self.id_ = node.get("id")
+                    self.version = node.get("version")
+
+                continue
+
+            self._depth -= 1
+
+            if self._depth == 1:
+                if node.tag == TAG_STIX_HEADER:
+                    obj = stix_core_binding.STIXHeaderType.factory()
+                    obj.build(node)
+                    self.stix_header = STIXHeader.from_obj(obj)
+
+                _release(node)
+
+            elif self._depth == 2:
+                container = _CONTAINERS.get(node.getparent().tag)
+
+                if container is None:
+                    # Part of the STIX_Header or Related_Packages.
+                    continue
+
+                if lxml.etree.QName(node).localname == container[0]:
+                    pending.append(self._build(node, container))
+
+                _release(node)
+
+        return pending
+
+    def _build(self, node, container):
+        return _build(node, container, self._bindings)
+
+
+def iter_entities(fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns a generator of the top-level components of the STIX package
+    read from the file-like object `fileobj`.
+
+    gzip, bz2 and xz compressed input is decompressed as it is read. See
+    :mod:`stix.utils.compression`.
+
+    """
+    parser = EntityPullParser()
+
+    with compression.decompressed(fileobj) as source:
+        while True:
+            data = source.read(chunk_size)
+
+            if not data:
+                break
+
+            for entity in parser.feed(data):
+                yield entity
+
+    for entity in parser.close():
+        yield entity
@@ -0,0 +1,272 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for producing recipient-specific copies of a STIX document, with
+the top-level components each recipient may not receive removed.
+
+A document is parsed and its data markings are resolved once (see
+:mod:`stix.utils.marking`), regardless of the number of recipients. Each
+top-level component (e.g., an ``Indicator`` under ``Indicators``) is then
+kept or dropped for a recipient by comparing its effective TLP color and AIS
+consent with the :class:`Recipient` clearance.
+
+Example:
+    >>> from stix.utils import redact
+    >>> partners = redact.Recipient("partners.xml", tlp="GREEN")
+    >>> govt = redact.Recipient("govt.xml", tlp="AMBER", ais_consent="USG")
+    >>> redact.filter_package("package.xml", [partners, govt])
+
+This module requires lxml 3.1 or later. Importing it with an older version
+raises ``ImportError``.
+
+"""
+
+# stdlib
+import collections
+
+# external
+import lxml.etree
+from mixbox.vendor.six import BytesIO, iteritems, string_types
+import mixbox.xml
+
+# relative
+from . import marking
+from .nsparser import NS_STIX_OBJECT
+
+# Documents are written with lxml.etree.xmlfile, added in lxml 3.1.
+if not hasattr(lxml.etree, "xmlfile"):
+    raise ImportError("stix.utils.redact requires lxml 3.1 or later.")
+
+
+#: TLP colors, from least to most restrictive.
+TLP_COLORS = ("WHITE", "GREEN", "AMBER", "RED")
+
+#: AIS consent values, from least to most restrictive.
+AIS_CONSENT = ("EVERYONE", "USG", "NONE")
+
+TAG_STIX_HEADER = "{%s}STIX_Header" % NS_STIX_OBJECT.name
+TAG_RELATED_PACKAGES = "{%s}Related_Packages" % NS_STIX_OBJECT.name
+TAG_KILL_CHAINS = "{%s}Kill_Chains" % NS_STIX_OBJECT.name
+
+# Package and collection children which are not top-level components, and
+# are copied to every recipient.
+_UNFILTERED = (TAG_STIX_HEADER, TAG_RELATED_PACKAGES, TAG_KILL_CHAINS)
+
+
+def _rank(levels, value):
+    """Returns the index of `value` in `levels`.
+
+    Raises:
+        ValueError: If `value` is not found in `levels`.
+
+    """
+    try:
+        return levels.index(value.upper())
+    except (AttributeError, ValueError):
+        error = "Value must be one of {0}. Received '{1}'"
+        raise ValueError(error.format(levels, value))
+
+
+class Recipient(object):
+    """A recipient of a filtered STIX document.
+
+    Args:
+        output: A filename or binary file-like object that the filtered
+            document is written to.
+        tlp: The most restrictive TLP color the recipient may receive.
+            Default is ``"WHITE"``.
+        ais_consent: The most restrictive AIS consent the recipient may
+            receive. Default is ``"EVERYONE"``.
+        name: An optional name for the recipient.
+
+    """
+    def __init__(self, output, tlp="WHITE", ais_consent="EVERYONE",
+                 name=None):
+        self.output = output
+        self.tlp = tlp
+        self.ais_consent = ais_consent
+        self.name = name
+
+    @property
+    def clearance(self):
+        """A ``(tlp rank, ais consent rank)`` tuple."""
+        return (_rank(TLP_COLORS, self.tlp),
+                _rank(AIS_CONSENT, self.ais_consent))
+
+
+def _ais_restrictions(structure):
+    """Returns a ``(tlp color, consent)`` tuple for the AIS marking
+    `structure`. Either value may be ``None``.
+
+    """
+    proprietary = structure.is_proprietary or structure.not_proprietary
+
+    if proprietary is None:
+        return None, None
+
+    color = getattr(proprietary.tlp_marking, "color", None)
+    consent = getattr(proprietary.ais_consent, "consent", None)
+    return color, consent
+
+
+def restrictions(structures, default_tlp=None):
+    """Returns the most restrictive TLP color and AIS consent found in the
+    marking `structures` as a ``(tlp rank, ais consent rank)`` tuple.
+
+    Args:
+        structures: An iterable of :class:`.MarkingStructure` instances.
+        default_tlp: The TLP color assumed when none of the `structures`
+            carries one. If ``None``, unmarked content is unrestricted.
+
+    """
+    tlp = _rank(TLP_COLORS, default_tlp) if default_tlp else 0
+    consent = 0
+    marked = False
+
+    for structure in structures:
+        if hasattr(structure, "color"):
+            color, ais = structure.color, None
+        elif hasattr(structure, "is_proprietary"):
+            color, ais = _ais_restrictions(structure)
+        else:
+            continue
+
+        if color:
+            rank = _rank(TLP_COLORS, color)
+            tlp = rank if not marked else max(tlp, rank)
+            marked = True
+
+        if ais:
+            consent = max(consent, _rank(AIS_CONSENT, ais))
+
+    return tlp, consent
+
+
+def _permits(clearance, restriction):
+    return (restriction[0] <= clearance[0]) and (restriction[1] <= clearance[1])
+
+
+def _write(node, children, output):
+    """Writes a copy of the `node` package element containing only the
+    top-level components in `children` to `output`.
+
+    Args:
+        node: The ``stix:STIX_Package`` etree element.
+        children: A list of ``(child element, [kept children])`` tuples. If
+            the list is ``None`` the child is copied in full.
+        output: A binary file-like object.
+
+    """
+    with lxml.etree.xmlfile(output, encoding="utf-8") as xf:
+        xf.write_declaration()
+
+        with xf.element(node.tag, attrib=dict(node.attrib), nsmap=node.nsmap):
+            for child, components in children:
+                if components is None:
+                    xf.write(child)
+                    continue
+
+                if not components:
+                    continue
+
+                with xf.element(child.tag, attrib=dict(child.attrib)):
+                    for component in components:
+                        xf.write(component)
+
+
+def filter_package(doc, recipients, default_tlp=None):
+    """Writes a copy of the STIX document `doc` to the output of each of the
+    `recipients`, leaving out the top-level components each recipient is
+    not cleared to receive.
+
+    The document is parsed and its markings are resolved once. Recipients
+    with the same clearance share a single serialized document.
+
+    Note:
+        The ``STIX_Header``, ``Related_Packages`` and the ``Kill_Chains`` of
+        the ``TTPs`` are copied to every recipient. References to removed
+        components are not rewritten.
+
+    Args:
+        doc: A filename, file-like object, ``etree._Element`` or
+            ``etree._ElementTree`` containing a ``STIX_Package``.
+        recipients: An iterable of :class:`Recipient` instances.
+        default_tlp: The TLP color assumed for components which carry no TLP
+            marking. If ``None``, unmarked components are sent to everyone.
+
+    Returns:
+        A dictionary mapping each :class:`Recipient` to the number of
+        top-level components written to its output.
+
+    Raises:
+        ValueError: If a recipient or marking has an unknown TLP color or AIS
+            consent value.
+
+    """
+    root = mixbox.xml.get_etree_root(doc)
+    markings = marking.resolve_xml(root)
+
+    # Compute the restrictions of each top-level component. Unfiltered
+    # collection children have no restrictions (None).
+    layout = []
+    for child in root.iterchildren(tag=lxml.etree.Element):
+        if child.tag in _UNFILTERED:
+            layout.append((child, None))
+            continue
+
+        components = []
+        for x in child.iterchildren(tag=lxml.etree.Element):
+            if x.tag in _UNFILTERED:
+                components.append((x, None))
+            else:
+                components.append((x, restrictions(markings.get(x, ()), default_tlp)))
+
+        layout.append((child, components))
+
+    # Recipients with the same clearance receive the same document.
+    groups = collections.defaultdict(list)
+    for recipient in recipients:
+        groups[recipient.clearance].append(recipient)
+
+    counts = {}
+    for clearance, members in iteritems(groups):
+        children = []
+        count = 0
+
+        for child, components in layout:
+            if components is None:
+                children.append((child, None))
+                continue
+
+            kept = []
+            for x, r in components:
+                if r is None:
+                    kept.append(x)
+                elif _permits(clearance, r):
+                    kept.append(x)
+                    count += 1
+
+            children.append((child, kept))
+
+        buf = BytesIO()
+        _write(root, children, buf)
+        data = buf.getvalue()
+
+        for recipient in members:
+            _copy(data, recipient.output)
+            counts[recipient] = count
+
+    return counts
+
+
+def _copy(data, output):
+    """Writes the `data` bytes to the `output` filename or file-like
+    object.
+
+    """
+    if isinstance(output, string_types):
+        with open(output, "wb") as f:
+            f.write(data)
+    else:
+        output.write(data)
@@ -0,0 +1,404 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Streaming extraction of detection rules from Indicator test mechanisms.
+
+:func:`extract_rules` reads a STIX document with ``lxml.etree.iterparse``
+and collects the content of Snort, YARA, OpenIOC and OVAL test mechanisms
+into one :class:`RuleBundle` per engine. Only ``Test_Mechanism`` elements
+are inspected: no entities or binding objects are built, and each top-level
+component is released as soon as it has been read, so memory use is bounded
+by the size of the largest component rather than the size of the document.
+
+Rules are deduplicated by content. Each rule keeps the ids of the
+Indicators whose test mechanisms contain it.
+
+This module requires lxml 3.0 or later. Importing it with an older version
+raises ``ImportError``.
+
+Example:
+    >>> from stix.utils.rules import extract_rules_many, write_bundles
+    >>> bundles = extract_rules_many(["a.xml", "b.xml"], processes=4)
+    >>> write_bundles(bundles, "rules/")
+    ['rules/snort.rules', 'rules/yara.yar', 'rules/index.json']
+
+"""
+
+# stdlib
+import base64
+import collections
+import hashlib
+import json
+import os
+
+# external
+import lxml.etree
+from mixbox.vendor.six import iteritems, text_type
+from mixbox.xml import TAG_XSI_TYPE
+
+# internal
+import stix.bindings.indicator as indicator_binding
+import stix.bindings.extensions.test_mechanism.open_ioc_2010 as openioc_binding
+import stix.bindings.extensions.test_mechanism.oval_5_10 as oval_binding
+import stix.bindings.extensions.test_mechanism.snort as snort_binding
+import stix.bindings.extensions.test_mechanism.yara as yara_binding
+from stix.core.writer import COLLECTIONS
+
+# relative
+from .nsparser import NS_STIX_OBJECT
+
+# iterparse() matches several tags, and "{*}" wildcards, since lxml 3.0.
+if lxml.etree.LXML_VERSION < (3, 0):
+    raise ImportError("stix.utils.rules requires lxml 3.0 or later.")
+
+
+SNORT = "snort"
+YARA = "yara"
+OPENIOC = "openioc"
+OVAL = "oval"
+
+#: The supported engines, in output order.
+ENGINES = (SNORT, YARA, OPENIOC, OVAL)
+
+TAG_TEST_MECHANISM = "{%s}Test_Mechanism" % indicator_binding.XML_NS
+
+# Test mechanism namespace -> engine.
+_ENGINES = {
+    snort_binding.XML_NS: SNORT,
+    yara_binding.XML_NS: YARA,
+    openioc_binding.XML_NS: OPENIOC,
+    oval_binding.XML_NS: OVAL,
+}
+
+# Engine -> the tags of the child elements which hold its rules.
+_RULE_TAGS = {
+    SNORT: frozenset(
+        "{%s}%s" % (snort_binding.XML_NS, x)
+        for x in ("Rule", "Event_Filter", "Rate_Filter", "Event_Suppression")
+    ),
+    YARA: frozenset(["{%s}Rule" % yara_binding.XML_NS]),
+    OPENIOC: frozenset(["{%s}ioc" % openioc_binding.XML_NS]),
+    OVAL: frozenset(
+        "{%s}%s" % (oval_binding.XML_NS, x)
+        for x in ("oval_definitions", "oval_variables")
+    ),
+}
+
+# Engines whose rules are standalone XML documents rather than lines of text.
+_DOCUMENT_ENGINES = (OPENIOC, OVAL)
+
+# Output file names of the text engines, and the comment prefix used for the
+# indicator back-references.
+_TEXT_FILES = {
+    SNORT: ("snort.rules", "#"),
+    YARA: ("yara.yar", "//"),
+}
+
+_CONTAINERS = frozenset("{%s}%s" % (NS_STIX_OBJECT.name, x[1]) for x in COLLECTIONS)
+
+# Top-level components are in several namespaces, so they are matched on
+# local name only.
+_COMPONENT_TAGS = ["{*}%s" % x[2] for x in COLLECTIONS]
+
+
+class RuleBundle(object):
+    """The deduplicated rules for one engine.
+
+    Rules are kept in the order they were first seen. Iterating over a
+    bundle yields ``(rule, indicator_ids)`` tuples.
+
+    Args:
+        engine: One of :data:`ENGINES`.
+
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self._rules = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._rules)
+
+    def __iter__(self):
+        return iter(self._rules.items())
+
+    def __contains__(self, rule):
+        return rule in self._rules
+
+    def add(self, rule, indicator_id=None):
+        """Adds `rule`, or records `indicator_id` against it if it has
+        already been added.
+
+        """
+        ids = self._rules.get(rule)
+
+        if ids is None:
+            ids = self._rules[rule] = []
+
+        if indicator_id and indicator_id not in ids:
+            ids.append(indicator_id)
+
+    def update(self, other):
+        """Adds the rules of `other`, a :class:`RuleBundle` or an iterable
+        of ``(rule, indicator_ids)`` tuples.
+
+        """
+        for rule, ids in other:
+            if not ids:
+                self.add(rule)
+
+            for id_ in ids:
+                self.add(rule, id_)
+
+    def indicators(self, rule):
+        """Returns the list of indicator ids recorded for `rule`."""
+        return list(self._rules[rule])
+
+
+def _new_bundles():
+    return collections.OrderedDict((x, RuleBundle(x)) for x in ENGINES)
+
+
+def _engine(node):
+    """Returns the engine of the ``Test_Mechanism`` element `node`, or
+    ``None`` if it is not supported.
+
+    """
+    xsi_type = node.get(TAG_XSI_TYPE)
+
+    if not xsi_type:
+        return None
+
+    prefix, _, _ = xsi_type.rpartition(":")
+    return _ENGINES.get(node.nsmap.get(prefix or None))
+
+
+def _text(node):
+    """Returns the (base64 decoded, if encoded) text of an
+    ``EncodedCDATAType`` element.
+
+    """
+    text = node.text or ""
+
+    if node.get("encoded") in ("true", "1"):
+        text = base64.b64decode(text).decode("utf-8")
+
+    return text.strip()
+
+
+def _document(node):
+    return lxml.etree.tostring(node, encoding="unicode", with_tail=False)
+
+
+def _indicator_id(node):
+    """Returns the id of the Indicator which contains the ``Test_Mechanism``
+    element `node`.
+
+    """
+    # Test_Mechanism -> Test_Mechanisms -> Indicator
+    parent = node.getparent()
+    indicator = parent.getparent() if parent is not None else None
+
+    if indicator is None:
+        return None
+
+    return indicator.get("id") or indicator.get("idref")
+
+
+def _rules(engine, node):
+    """Yields the rules held by the ``Test_Mechanism`` element `node`."""
+    tags = _RULE_TAGS[engine]
+    read = _document if engine in _DOCUMENT_ENGINES else _text
+
+    for child in node:
+        if child.tag in tags:
+            rule = read(child)
+
+            if rule:
+                yield rule
+
+
+def _release(node):
+    """Clears `node` and deletes the already processed preceding siblings."""
+    node.clear()
+    parent = node.getparent()
+
+    while node.getprevious() is not None:
+        del parent[0]
+
+
+def extract_rules(source, bundles=None):
+    """Extracts the test mechanism rules from a STIX document.
+
+    Args:
+        source: A filename or file-like object containing a STIX document.
+        bundles: An optional dictionary of engines to :class:`RuleBundle`
+            objects, as returned by a previous call, which the rules are
+            added to.
+
+    Returns:
+        An ordered dictionary of :data:`ENGINES` to :class:`RuleBundle`
+        objects.
+
+    """
+    if bundles is None:
+        bundles = _new_bundles()
+
+    tags = [TAG_TEST_MECHANISM] + _COMPONENT_TAGS
+
+    # The options of mixbox.xml.get_xml_parser().
+    events = lxml.etree.iterparse(
+        source,
+        events=("end",),
+        tag=tags,
+        remove_comments=True,
+        huge_tree=True,
+        resolve_entities=False,
+        strip_cdata=False,
+        remove_blank_text=True
+    )
+
+    for _, node in events:
+        if node.tag != TAG_TEST_MECHANISM:
+            parent = node.getparent()
+
+            # Nested components are released with their top-level ancestor.
+            if parent is not None and parent.tag in _CONTAINERS:
+                _release(node)
+
+            continue
+
+        engine = _engine(node)
+
+        if engine is not None:
+            bundle = bundles.get(engine)
+
+            if bundle is None:
+                bundle = bundles[engine] = RuleBundle(engine)
+
+            indicator_id = _indicator_id(node)
+
+            for rule in _rules(engine, node):
+                bundle.add(rule, indicator_id)
+
+        node.clear()
+
+    return bundles
+
+
+def _extract(source):
+    """Returns the rules of `source` as picklable ``(engine, [(rule,
+    indicator_ids), ...])`` tuples.
+
+    """
+    bundles = extract_rules(source)
+    return [(x.engine, list(x)) for x in bundles.values()]
+
+
+def extract_rules_many(sources, processes=None):
+    """Extracts the test mechanism rules from several STIX documents.
+
+    Args:
+        sources: An iterable of filenames.
+        processes: The number of worker processes. If ``None``, the number
+            of CPUs is used. If ``1``, the documents are read in this
+            process.
+
+    Returns:
+        An ordered dictionary of :data:`ENGINES` to :class:`RuleBundle`
+        objects. Rules are ordered as if the documents had been read in
+        the order of `sources`.
+
+    """
+    bundles = _new_bundles()
+
+    if processes == 1:
+        for source in sources:
+            extract_rules(source, bundles)
+
+        return bundles
+
+    import multiprocessing
+    pool = multiprocessing.Pool(processes)
+
+    try:
+        for result in pool.imap(_extract, sources):
+            for engine, rules in result:
+                bundles[engine].update(rules)
+    finally:
+        pool.close()
+        pool.join()
+
+    return bundles
+
+
+def _digest(rule):
+    return hashlib.sha1(rule.encode("utf-8")).hexdigest()
+
+
+def _write(path, text):
+    with open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+def write_bundles(bundles, directory):
+    """Writes `bundles` to `directory`.
+
+    Snort and YARA rules are written to ``snort.rules`` and ``yara.yar``,
+    each preceded by a comment listing the ids of the Indicators which
+    contain it. OpenIOC and OVAL documents are written to
+    ``openioc/<sha1>.ioc`` and ``oval/<sha1>.xml``. An ``index.json`` file
+    maps each engine to a list of ``{"file", "sha1", "indicators"}``
+    entries. Empty bundles are not written.
+
+    Returns:
+        A list of the paths of the files written.
+
+    """
+    paths = []
+    index = collections.OrderedDict()
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    for engine, bundle in iteritems(bundles):
+        if not len(bundle):
+            continue
+
+        entries = index[engine] = []
+
+        if engine in _TEXT_FILES:
+            filename, comment = _TEXT_FILES[engine]
+            lines = []
+
+            for rule, ids in bundle:
+                lines.append("%s indicators: %s" % (comment, " ".join(ids)))
+                lines.append(rule)
+                lines.append("")
+                entries.append({"file": filename, "sha1": _digest(rule), "indicators": ids})
+
+            path = os.path.join(directory, filename)
+            _write(path, "\n".join(lines))
+            paths.append(path)
+            continue
+
+        subdir = os.path.join(directory, engine)
+        extension = ".ioc" if engine == OPENIOC else ".xml"
+
+        if not os.path.isdir(subdir):
+            os.makedirs(subdir)
+
+        for rule, ids in bundle:
+            digest = _digest(rule)
+            filename = engine + "/" + digest + extension
+            path = os.path.join(directory, filename)
+
+            _write(path, rule)
+            paths.append(path)
+            entries.append({"file": filename, "sha1": digest, "indicators": ids})
+
+    path = os.path.join(directory, "index.json")
+    _write(path, text_type(json.dumps(index, indent=2)))
+    paths.append(path)
+
+    return paths
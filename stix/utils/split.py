@@ -0,0 +1,392 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Functions for splitting a large STIX document into several smaller,
+standalone STIX documents.
+
+The input is read incrementally with ``lxml.etree.iterparse`` and each
+top-level component (e.g., an ``Indicator`` under ``Indicators``) is
+serialized once and released, so memory use is bounded by the size of the
+grouping window rather than the size of the document.
+
+Example:
+    >>> from stix.utils.split import split_package
+    >>> for idx, doc in enumerate(split_package("big.xml", max_bytes=2**20)):
+    ...     with open("part-%d.xml" % idx, "wb") as f:
+    ...         f.write(doc)
+
+"""
+
+# stdlib
+import re
+
+# external
+import lxml.etree
+from mixbox import idgen
+from mixbox.namespaces import Namespace
+from mixbox.vendor.six import BytesIO, iteritems
+
+# relative
+from .nsparser import NS_STIX_OBJECT
+
+
+TAG_STIX_HEADER = "{%s}STIX_Header" % NS_STIX_OBJECT.name
+TAG_RELATED_PACKAGES = "{%s}Related_Packages" % NS_STIX_OBJECT.name
+TAG_KILL_CHAINS = "{%s}Kill_Chains" % NS_STIX_OBJECT.name
+
+_XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+_IDREF = re.compile(br'\bidref="([^"]+)"')
+_ID = re.compile(br'\bid="[^"]*"')
+
+
+class _Component(object):
+    """A serialized top-level component."""
+    __slots__ = ("container", "data", "id_", "idrefs")
+
+    def __init__(self, container, data, id_, idrefs):
+        self.container = container
+        self.data = data
+        self.id_ = id_
+        self.idrefs = idrefs
+
+
+class _Groups(object):
+    """A union-find structure over component ids."""
+
+    def __init__(self):
+        self._parent = {}
+
+    def find(self, key):
+        parent = self._parent.setdefault(key, key)
+
+        if parent == key:
+            return key
+
+        root = self.find(parent)
+        self._parent[key] = root
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+
+        if a != b:
+            self._parent[b] = a
+
+
+def _start_tag(node):
+    """Returns the serialized start tag and end tag of the `node` element,
+    including its attributes and namespace declarations.
+
+    """
+    shell = lxml.etree.Element(node.tag, attrib=dict(node.attrib), nsmap=node.nsmap)
+    empty = lxml.etree.tostring(shell)
+
+    name = empty[1:].split(None, 1)[0].rstrip(b"/>")
+    return empty[:-2] + b">", b"</" + name + b">"
+
+
+def _id_generator(node):
+    """Returns an ``IDGenerator`` which creates ids in the namespace of the
+    id of the `node` package element, or ``None`` if the id has no declared
+    namespace prefix.
+
+    """
+    prefix, colon, _ = (node.get("id") or "").partition(":")
+
+    if not colon or prefix not in node.nsmap:
+        return None
+
+    return idgen.IDGenerator(namespace=Namespace(node.nsmap[prefix], prefix))
+
+
+def _declarations(nsmap):
+    """Returns the namespace declaration attributes lxml emits for `nsmap`."""
+    decls = []
+
+    for prefix, ns in iteritems(nsmap):
+        ns = ns.encode("utf-8")
+
+        if prefix:
+            decls.append(b' xmlns:' + prefix.encode("utf-8") + b'="' + ns + b'"')
+        else:
+            decls.append(b' xmlns="' + ns + b'"')
+
+    return decls
+
+
+def _strip_declarations(data, decls):
+    """Removes the namespace declarations in `decls` from the start tag of
+    the serialized element `data`. These are already declared on the output
+    package root.
+
+    """
+    end = data.find(b">")
+    head = data[:end]
+
+    for decl in decls:
+        head = head.replace(decl, b"")
+
+    return head + data[end:]
+
+
+class _Writer(object):
+    """Packs components into size-bounded documents."""
+
+    def __init__(self, max_bytes, max_objects):
+        self.max_bytes = max_bytes
+        self.max_objects = max_objects
+
+        self.root = None            # (start tag, end tag) of the package
+        self.idgen = None           # creates ids in the package namespace
+        self.preamble = b""         # the serialized STIX_Header
+        self.trailer = {}           # container => [Kill_Chains]
+        self.related = b""          # the serialized Related_Packages
+        self.containers = {}        # container tag => (start tag, end tag)
+        self.order = []             # container tags in document order
+
+    def overhead(self):
+        size = len(_XML_DECLARATION) + len(self.preamble)
+        size += sum(len(x) for x in self.root)
+        size += sum(len(x) + len(y) for x, y in self.containers.values())
+        return size
+
+    def fits(self, chunk, size, group):
+        extra = sum(len(x.data) for x in group)
+
+        if self.max_objects and len(chunk) + len(group) > self.max_objects:
+            return False
+
+        if self.max_bytes and size + extra > self.max_bytes:
+            return False
+
+        return True
+
+    def pack(self, groups, final):
+        """Packs the component `groups` into chunks. Returns a tuple
+        containing the list of completed documents and the components left
+        over for the next chunk (unless `final` is ``True``).
+
+        """
+        docs = []
+        chunk = []
+        size = self.overhead()
+
+        for group in groups:
+            if chunk and not self.fits(chunk, size, group):
+                docs.append(self.render(chunk, final=False))
+                chunk = []
+                size = self.overhead()
+
+            for component in group:
+                # Split groups which are too large for a chunk of their own.
+                if chunk and not self.fits(chunk, size, [component]):
+                    docs.append(self.render(chunk, final=False))
+                    chunk = []
+                    size = self.overhead()
+
+                chunk.append(component)
+                size += len(component.data)
+
+        if final and (chunk or not docs):
+            docs.append(self.render(chunk, final=True))
+            chunk = []
+
+        return docs, chunk
+
+    def render(self, chunk, final):
+        by_container = {}
+        for component in chunk:
+            by_container.setdefault(component.container, []).append(component.data)
+
+        start, end = self.root
+
+        if self.idgen is not None:
+            new_id = self.idgen.create_id("Package").encode("utf-8")
+            start = _ID.sub(b'id="' + new_id + b'"', start, count=1)
+
+        out = BytesIO()
+        out.write(_XML_DECLARATION)
+        out.write(start)
+        out.write(self.preamble)
+
+        for container in self.order:
+            items = by_container.get(container, [])
+            trailer = self.trailer.get(container, []) if final else []
+
+            if not (items or trailer):
+                continue
+
+            open_, close = self.containers[container]
+            out.write(open_)
+            for data in items:
+                out.write(data)
+            for data in trailer:
+                out.write(data)
+            out.write(close)
+
+        if final:
+            out.write(self.related)
+
+        out.write(end)
+        return out.getvalue()
+
+
+def _group(buffered):
+    """Groups the `buffered` components that are connected by idrefs,
+    preserving document order of each group's first component.
+
+    """
+    groups = _Groups()
+    ids = set(x.id_ for x in buffered if x.id_)
+
+    for idx, component in enumerate(buffered):
+        key = component.id_ or idx
+        groups.find(key)
+
+        for idref in component.idrefs:
+            if idref in ids:
+                groups.union(key, idref)
+
+    ordered = {}
+    for idx, component in enumerate(buffered):
+        root = groups.find(component.id_ or idx)
+        ordered.setdefault(root, []).append(component)
+
+    position = dict((id(x), idx) for idx, x in enumerate(buffered))
+    return sorted(ordered.values(), key=lambda g: position[id(g[0])])
+
+
+def split_package(doc, max_bytes=None, max_objects=None, window=None):
+    """Splits the STIX document `doc` into several standalone STIX
+    documents.
+
+    Each output document contains a copy of the input ``STIX_Header``
+    (including package-level handling markings), and a subset of the
+    top-level components. Components which reference each other by
+    ``idref`` are kept in the same output document when they occur within
+    the same grouping `window` and fit within the limits together.
+
+    Note:
+        Each output document is given a new package ``id`` in the namespace
+        of the input package ``id``. Content that
+        follows the top-level components in the input (``Kill_Chains`` under
+        ``TTPs`` and ``Related_Packages``) is copied into the last output
+        document only.
+
+    Args:
+        doc: A filename, file-like object or :class:`.STIXPackage`.
+        max_bytes: The approximate maximum size of an output document.
+            A single component larger than this is emitted on its own.
+        max_objects: The maximum number of top-level components in an
+            output document.
+        window: The number of components buffered for grouping. Defaults to
+            four documents' worth of components.
+
+    Yields:
+        Serialized, UTF-8 encoded STIX documents (``bytes``).
+
+    Raises:
+        ValueError: If neither `max_bytes` nor `max_objects` is given.
+
+    """
+    if not (max_bytes or max_objects):
+        raise ValueError("At least one of max_bytes or max_objects is required.")
+
+    if hasattr(doc, "to_xml"):
+        doc = BytesIO(doc.to_xml())
+
+    writer = _Writer(max_bytes, max_objects)
+    buffered = []
+    buffered_bytes = 0
+    decls = []
+
+    def full():
+        if window:
+            return len(buffered) >= window
+        if max_objects and len(buffered) >= 4 * max_objects:
+            return True
+        return bool(max_bytes) and buffered_bytes >= 4 * max_bytes
+
+    skip = (TAG_STIX_HEADER, TAG_RELATED_PACKAGES)
+
+    depth = 0
+    # The options of mixbox.xml.get_xml_parser().
+    events = lxml.etree.iterparse(
+        doc,
+        events=("start", "end"),
+        remove_comments=True,
+        huge_tree=True,
+        resolve_entities=False,
+        strip_cdata=False,
+        remove_blank_text=True
+    )
+
+    for event, node in events:
+        if event == "start":
+            depth += 1
+
+            if depth == 1:
+                writer.root = _start_tag(node)
+                writer.idgen = _id_generator(node)
+                decls = _declarations(node.nsmap)
+            elif depth == 2 and node.tag not in skip:
+                if node.tag not in writer.containers:
+                    start, end = _start_tag(node)
+                    writer.containers[node.tag] = (_strip_declarations(start, decls), end)
+                    writer.order.append(node.tag)
+
+            continue
+
+        depth -= 1
+
+        if depth == 1:
+            data = _strip_declarations(_tostring(node), decls)
+
+            if node.tag == TAG_STIX_HEADER:
+                writer.preamble = data
+            elif node.tag == TAG_RELATED_PACKAGES:
+                writer.related = data
+
+            node.clear()
+            _release(node)
+
+        elif depth == 2 and node.getparent().tag not in skip:
+            container = node.getparent().tag
+            data = _strip_declarations(_tostring(node), decls)
+
+            if node.tag == TAG_KILL_CHAINS:
+                writer.trailer.setdefault(container, []).append(data)
+            else:
+                idrefs = set(x.decode("utf-8") for x in _IDREF.findall(data))
+                buffered.append(_Component(container, data, node.get("id"), idrefs))
+                buffered_bytes += len(data)
+
+            node.clear()
+            _release(node)
+
+            if full():
+                docs, leftover = writer.pack(_group(buffered), final=False)
+
+                for x in docs:
+                    yield x
+
+                buffered = leftover
+                buffered_bytes = sum(len(x.data) for x in leftover)
+
+    docs, _ = writer.pack(_group(buffered), final=True)
+
+    for x in docs:
+        yield x
+
+
+def _tostring(node):
+    return lxml.etree.tostring(node, encoding="utf-8", with_tail=False)
+
+
+def _release(node):
+    """Deletes the already processed preceding siblings of `node`."""
+    parent = node.getparent()
+
+    while node.getprevious() is not None:
+        del parent[0]